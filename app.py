@@ -12,7 +12,20 @@ from sqlalchemy import text
 # ================== Project Imports ================== #
 from config import Config, DevelopmentConfig, TestingConfig, ProductionConfig
 from utils.extensions import db, init_extensions
-from utils.scheduler_jobs import register_jobs
+from utils.db_engine import configure_engine_options
+from utils.scheduler_jobs import start_scheduler
+from utils.rollups import register_rollup_listeners
+from utils.data_version import register_data_version_listeners
+from utils.expense_stats import register_stats_listeners
+from utils.cli import register_commands
+from utils.instrumentation import init_instrumentation
+from utils.query_inspector import init_query_inspector
+from utils.auth_cache import configure_auth_cache
+from utils.passwords import configure_password_hasher
+from utils.response_cache import configure_response_cache
+from utils.forecast import configure_forecast_cache
+from utils.category_model import configure_category_model
+from utils.budget_alerts import configure_budget_alerts
 
 # Blueprints
 from routes.auth_routes import auth_bp
@@ -23,11 +36,15 @@ from routes.trends_routes import trends_bp
 from routes.home_routes import home_bp
 
 
-# ✅ Ensure UTF-8 logs (Windows safe)
-if sys.stdout and hasattr(sys.stdout, "buffer"):
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
-if sys.stderr and hasattr(sys.stderr, "buffer"):
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8")
+# ✅ Ensure UTF-8 logs (Windows safe). Reconfigure the stream in place where
+# possible: a second wrapper closes the shared buffer when it is collected
+# (e.g. pytest's capture file).
+for _name in ("stdout", "stderr"):
+    _stream = getattr(sys, _name)
+    if _stream and hasattr(_stream, "reconfigure"):
+        _stream.reconfigure(encoding="utf-8")
+    elif _stream and hasattr(_stream, "buffer"):
+        setattr(sys, _name, io.TextIOWrapper(_stream.buffer, encoding="utf-8"))
 
 
 # ---------------- APP FACTORY ---------------- #
@@ -44,8 +61,10 @@ def create_app(config_class: type[Config] = DevelopmentConfig) -> Flask:
     _initialize_extensions(app)
     _check_database_connection(app)
     _configure_cors(app)
+    _configure_instrumentation(app)
     _register_blueprints(app)
     _register_error_handlers(app)
+    _register_commands(app)
     _configure_scheduler(app)
 
     return app
@@ -107,7 +126,17 @@ def _normalize_and_log_db_uri(app: Flask) -> None:
 
 def _initialize_extensions(app: Flask) -> None:
     """Initialize extensions (DB, migrations, etc.)."""
+    configure_engine_options(app)
     init_extensions(app)
+    register_rollup_listeners()
+    register_data_version_listeners()
+    register_stats_listeners()
+    configure_auth_cache(app)
+    configure_password_hasher(app)
+    configure_response_cache(app)
+    configure_forecast_cache(app)
+    configure_category_model(app)
+    configure_budget_alerts(app)  # after the rollup listeners: reads their totals
 
     auto_create = app.config.get("AUTO_CREATE_TABLES", os.getenv("AUTO_CREATE_TABLES", "false"))
     if str(auto_create).lower() in ("1", "true", "yes"):
@@ -142,19 +171,27 @@ def _configure_cors(app: Flask) -> None:
         allowed_origins = default_origins
 
     allowed_origins = sorted(set(allowed_origins + default_origins))
+    app.config["CORS_ALLOWED_ORIGINS"] = allowed_origins  # reused by the ASGI read path
 
     CORS(
         app,
         resources={r"/*": {"origins": allowed_origins}},
         supports_credentials=True,
-        allow_headers=["Content-Type", "Authorization"],
+        allow_headers=["Content-Type", "Authorization", "If-None-Match"],
         methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-        expose_headers=["Content-Type", "Authorization"],
+        expose_headers=["Content-Type", "Authorization", "ETag", "Server-Timing"],
     )
 
     app.logger.info("🌍 CORS enabled for origins: %s", ", ".join(allowed_origins))
 
 
+def _configure_instrumentation(app: Flask) -> None:
+    """Per-request SQL/JSON/handler timing → Server-Timing, logs and /metrics."""
+    init_instrumentation(app)
+    app.logger.info("📈 Request instrumentation enabled")
+    init_query_inspector(app)
+
+
 def _register_blueprints(app: Flask) -> None:
     """Register all route blueprints."""
     app.register_blueprint(auth_bp, url_prefix="/auth")
@@ -179,12 +216,20 @@ def _register_error_handlers(app: Flask) -> None:
         return jsonify({"status": "error", "message": "Internal server error"}), 500
 
 
+def _register_commands(app: Flask) -> None:
+    """Register custom Flask CLI commands (e.g. `flask rollups rebuild`)."""
+    register_commands(app)
+
+
 def _configure_scheduler(app: Flask) -> None:
-    """Configure APScheduler and load jobs."""
+    """Configure APScheduler and load jobs (leader-elected across workers)."""
+    mode = str(app.config.get("SCHEDULER_MODE", "embedded")).lower()
+    if mode != "embedded":
+        app.logger.info("⏰ Embedded scheduler disabled (SCHEDULER_MODE=%s)", mode)
+        return
+
     try:
-        scheduler = BackgroundScheduler()
-        register_jobs(scheduler, app)
-        scheduler.start()
+        start_scheduler(app, BackgroundScheduler())
         app.logger.info("⏰ Scheduler started successfully")
     except Exception as e:
         app.logger.exception("⚠️ Failed to start scheduler: %s", e)
@@ -0,0 +1,28 @@
+"""
+Optional ASGI entry point.
+
+Serves GET /health, /trends/ and /budget/summary/<email> from async
+handlers on an async SQLAlchemy engine, and every other route through the
+regular Flask app (see utils/async_app.py). Needs the optional packages
+asgiref, uvicorn and aiosqlite (SQLite) or asyncpg (PostgreSQL):
+
+    gunicorn "asgi:create_asgi_app()" -k uvicorn.workers.UvicornWorker -b 0.0.0.0:$PORT --workers=4
+    uvicorn --factory asgi:create_asgi_app --port 5000
+"""
+import os
+
+from app import create_app
+from config import DevelopmentConfig, TestingConfig, ProductionConfig
+from utils.async_app import build_asgi_app
+
+
+def create_asgi_app(config_class=None):
+    """ASGI application factory (defaults to APP_ENV's config, like scheduler.py)."""
+    if config_class is None:
+        env = os.getenv("APP_ENV", "development").lower()
+        config_class = {
+            "production": ProductionConfig,
+            "testing": TestingConfig,
+            "development": DevelopmentConfig,
+        }.get(env, DevelopmentConfig)
+    return build_asgi_app(create_app(config_class))
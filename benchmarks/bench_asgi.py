@@ -0,0 +1,159 @@
+"""
+Benchmark: sync (gunicorn threads) vs ASGI (uvicorn worker) on dashboard polls.
+
+Starts each server with the same worker count on the same generated SQLite
+file, then holds --connections concurrent keep-alive connections, each
+polling /trends/ and /budget/summary/<email> as fast as it can for
+--duration seconds. Reports throughput and latency per mode.
+
+    python benchmarks/bench_asgi.py --connections 64 --workers 1 --threads 2
+    python benchmarks/bench_asgi.py --conditional   # clients send If-None-Match (304 path)
+
+Needs the optional ASGI packages (requirements-asgi.txt).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_endpoints import percentile  # noqa: E402
+from benchmarks.datagen import bench_emails, build_app, generate  # noqa: E402
+from benchmarks.loadtest import Client, free_port, login_all, stop, wait_until_ready  # noqa: E402
+
+
+def serve_sync(db_path, cache):
+    """gunicorn factory: the plain Flask app."""
+    return build_app(db_path, RESPONSE_CACHE_BACKEND=cache)
+
+
+def serve_asgi(db_path, cache):
+    """gunicorn factory for the uvicorn worker: the ASGI router around the same app."""
+    from utils.async_app import build_asgi_app
+
+    return build_asgi_app(build_app(db_path, RESPONSE_CACHE_BACKEND=cache))
+
+
+def start(mode, db, cache, port, workers, threads, log_path):
+    factory = "serve_asgi" if mode == "asgi" else "serve_sync"
+    cmd = [
+        sys.executable, "-m", "gunicorn", f"benchmarks.bench_asgi:{factory}({db!r}, {cache!r})",
+        "-b", f"127.0.0.1:{port}", f"--workers={workers}", "--timeout", "120",
+    ]
+    cmd += ["-k", "uvicorn.workers.UvicornWorker"] if mode == "asgi" else [f"--threads={threads}"]
+    log = open(log_path, "w")
+    return subprocess.Popen(cmd, cwd=ROOT, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+
+
+def poll(port, tokens, connections, duration, conditional):
+    """Closed loop: each connection issues its next request as soon as the last one returns."""
+    latencies, errors, not_modified = [], [0], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    emails = list(tokens)
+
+    def connection(n):
+        client = Client("127.0.0.1", port)
+        email = emails[n % len(emails)]
+        paths = ["/trends/", f"/budget/summary/{email}"]
+        etags = {}
+        local, i = [], 0
+        while time.perf_counter() < deadline:
+            path = paths[i % 2]
+            i += 1
+            headers = {"If-None-Match": etags[path]} if conditional and path in etags else None
+            t0 = time.perf_counter()
+            try:
+                status, _, etag = client.get(path, tokens[email], headers)
+            except OSError:
+                status, etag = 599, None
+            local.append(time.perf_counter() - t0)
+            if etag:
+                etags[path] = etag
+            with lock:
+                if status >= 400:
+                    errors[0] += 1
+                elif status == 304:
+                    not_modified[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=connection, args=(n,)) for n in range(connections)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors[0], not_modified[0], time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--expenses", type=int, default=500, help="expenses per user")
+    parser.add_argument("--connections", type=int, default=64, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=2, help="gunicorn threads for the sync mode")
+    parser.add_argument("--response-cache", default="none", choices=["none", "memory", "sqlite"])
+    parser.add_argument("--conditional", action="store_true", help="send If-None-Match after the first response")
+    parser.add_argument("--modes", nargs="*", default=["sync", "asgi"], choices=["sync", "asgi"])
+    parser.add_argument("--save", help="write results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "bench_asgi.db")
+        app = build_app(db)
+        generate(app, args.users, args.expenses)
+        emails = bench_emails(app, args.users)
+
+        for mode in args.modes:
+            port = free_port()
+            log_path = os.path.join(tmp, f"{mode}.log")
+            proc = start(mode, db, args.response_cache, port, args.workers, args.threads, log_path)
+            try:
+                client = Client("127.0.0.1", port)
+                wait_until_ready(client, proc)
+                tokens = login_all(client, emails)
+                latencies, errors, not_modified, wall = poll(
+                    port, tokens, args.connections, args.duration, args.conditional)
+            except Exception:
+                with open(log_path) as f:
+                    sys.stderr.write(f.read()[-4000:])
+                raise
+            finally:
+                stop(proc)
+
+            ordered = sorted(latencies)
+            results[mode] = {
+                "requests": len(ordered),
+                "errors": errors,
+                "not_modified": not_modified,
+                "rps": round(len(ordered) / wall, 1),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+            }
+
+    topology = f"workers={args.workers} (sync threads={args.threads})"
+    print(f"\n{args.connections} connections, {args.duration}s, {topology}, cache={args.response_cache}, "
+          f"conditional={args.conditional}")
+    print(f"{'mode':<6} {'reqs':>8} {'errors':>7} {'304s':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['requests']:>8} {r['errors']:>7} {r['not_modified']:>7} {r['rps']:>9.1f} "
+              f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark: hot endpoints through the Flask test client on SQLite.
+
+Generates a dataset with benchmarks/datagen.py, then drives each scenario
+for --requests requests spread over the generated users and reports
+p50/p95/p99 latency and throughput.
+
+    python benchmarks/bench_endpoints.py --users 50 --expenses 2000 --requests 500
+    python benchmarks/bench_endpoints.py --save baseline.json
+    python benchmarks/bench_endpoints.py --compare baseline.json --tolerance 0.15
+
+With --compare, exits non-zero when any scenario's p95 regressed by more
+than --tolerance against the saved baseline. The response cache is off by
+default so the numbers reflect the query path (--response-cache memory to
+measure hits instead).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datagen import DEFAULT_PASSWORD, bench_emails, build_app, generate  # noqa: E402
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], wall: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        "rps": round(len(ordered) / wall, 1) if wall else 0.0,
+    }
+
+
+def run_scenario(name: str, call: Callable[[int], object], count: int, warmup: int) -> Dict[str, float]:
+    for i in range(warmup):
+        with call(i) as response:
+            response.get_data()
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        t0 = time.perf_counter()
+        with call(i) as response:
+            body = response.get_data()  # drain streamed bodies (export) inside the timing
+        latencies.append(time.perf_counter() - t0)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name}: HTTP {response.status_code} {body[:200]!r}")
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def build_scenarios(client, emails: List[str], seed: int) -> Dict[str, Callable[[int], object]]:
+    tokens = {}
+    for email in emails:
+        body = client.post("/auth/login", json={"email": email, "password": DEFAULT_PASSWORD}).get_json()
+        tokens[email] = {"Authorization": f"Bearer {body['token']}"}
+
+    rng = random.Random(seed)
+    order = [rng.choice(emails) for _ in range(100_000)]
+
+    def pick(i):
+        return order[i % len(order)]
+
+    return {
+        "login": lambda i: client.post(
+            "/auth/login", json={"email": pick(i), "password": DEFAULT_PASSWORD}),
+        "trends": lambda i: client.get("/trends/", headers=tokens[pick(i)]),
+        "analytics": lambda i: client.get("/trends/analytics?days=180&window=30", headers=tokens[pick(i)]),
+        "budget_summary": lambda i: client.get(
+            f"/budget/summary/{pick(i)}", headers=tokens[pick(i)]),
+        "expense_post": lambda i: client.post(
+            "/expenses/", headers=tokens[pick(i)],
+            json={
+                "amount": round(rng.uniform(1, 200), 2),
+                "category": rng.choice(["Food", "Transport", "Bills"]),
+                "expense_date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            }),
+        "export_csv": lambda i: client.get("/expenses/export?format=csv", headers=tokens[pick(i)]),
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if before and before["p95_ms"] and stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.2f} → {stats['p95_ms']:.2f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--expenses", type=int, default=1000, help="expenses per user")
+    parser.add_argument("--salaries", type=int, default=12)
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="run only these scenarios")
+    parser.add_argument("--response-cache", default="none", choices=["none", "memory", "sqlite"])
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from a previous --save")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed p95 regression (fraction)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"), RESPONSE_CACHE_BACKEND=args.response_cache)
+        t0 = time.perf_counter()
+        generate(app, args.users, args.expenses, args.salaries, seed=args.seed)
+        print(f"dataset: {args.users} users × {args.expenses} expenses ({time.perf_counter() - t0:.1f}s)")
+
+        client = app.test_client()
+        scenarios = build_scenarios(client, bench_emails(app, args.users), args.seed)
+        if args.only:
+            scenarios = {k: v for k, v in scenarios.items() if k in args.only}
+
+        results = {}
+        print(f"{'scenario':<16} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'req/s':>9}")
+        for name, call in scenarios.items():
+            stats = run_scenario(name, call, args.requests, args.warmup)
+            results[name] = stats
+            print(f"{name:<16} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                  f"{stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f} {stats['rps']:>9.1f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"💾 saved → {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("❌ p95 regressions over {:.0%}:\n  ".format(args.tolerance) + "\n  ".join(regressions))
+            sys.exit(1)
+        print("✅ no p95 regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: ExpenseFrame (one raw query into NumPy columns) vs the per-object
+ORM loop for the same analytics.
+
+Each round computes, for one user, totals per month, per category and per
+weekday plus a trailing 30-day sum for every day of the history, first by
+loading Expense objects and accumulating floats attribute by attribute, then
+with utils/expense_frame.py. Results are cross-checked (to the cent) before
+timings are reported.
+
+    python benchmarks/bench_expense_frame.py --expenses 20000 --rounds 20
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_endpoints import percentile  # noqa: E402
+from benchmarks.datagen import build_app, generate  # noqa: E402
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+def orm_loop(user_id: int, window: int) -> Dict:
+    """The pre-frame approach: ORM objects, Python accumulation."""
+    from models.expense import Expense
+
+    by_month, by_category, by_weekday, by_day = (defaultdict(float) for _ in range(4))
+    for e in Expense.query.filter(Expense.user_id == user_id, Expense.date.isnot(None)).all():
+        amount = float(e.amount)
+        by_month[e.date.strftime("%Y-%m")] += amount
+        by_category[e.category] += amount
+        by_weekday[WEEKDAYS[e.date.weekday()]] += amount
+        by_day[e.date.date()] += amount
+
+    rolling = []
+    if by_day:
+        first, last = min(by_day), max(by_day)
+        day = first
+        while day <= last:
+            rolling.append(sum(by_day.get(day - timedelta(days=k), 0.0) for k in range(window)))
+            day += timedelta(days=1)
+    return {"month": dict(by_month), "category": dict(by_category),
+            "weekday": dict(by_weekday), "rolling": rolling}
+
+
+def frame_path(user_id: int, window: int) -> Dict:
+    from utils.expense_frame import ExpenseFrame
+
+    frame = ExpenseFrame.load(user_id)
+    rolling = []
+    if len(frame):
+        first, last = date.fromordinal(int(frame.days[0])), date.fromordinal(int(frame.days[-1]))
+        rolling = frame.rolling_sum(first, last, window).tolist()
+    return {"month": frame.by_month(), "category": frame.by_category(),
+            "weekday": frame.by_weekday(), "rolling": rolling}
+
+
+def check(orm: Dict, frame: Dict) -> None:
+    """Frame results are cents; the loop's float sums must agree to the cent."""
+    for key in ("month", "category", "weekday"):
+        expected = {k: round(v * 100) for k, v in orm[key].items() if k in frame[key] or v}
+        got = {k: v for k, v in frame[key].items() if v or k in expected}
+        if expected != got:
+            raise AssertionError(f"{key} mismatch: {expected} != {got}")
+    if [round(v * 100) for v in orm["rolling"]] != frame["rolling"]:
+        raise AssertionError("rolling sums mismatch")
+
+
+def timed(fn, rounds: int, *args):
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "min_ms": round(samples[0] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expenses", type=int, default=20000, help="expenses for the measured user")
+    parser.add_argument("--months", type=int, default=24, help="history length")
+    parser.add_argument("--window", type=int, default=30, help="rolling window in days")
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench_frame.db"))
+        generate(app, users=1, expenses=args.expenses, salaries=0, months=args.months, seed=args.seed)
+
+        with app.app_context():
+            check(orm_loop(1, args.window), frame_path(1, args.window))
+            results = {
+                "orm_loop": timed(orm_loop, args.rounds, 1, args.window),
+                "expense_frame": timed(frame_path, args.rounds, 1, args.window),
+            }
+
+    speedup = results["orm_loop"]["p50_ms"] / max(results["expense_frame"]["p50_ms"], 1e-9)
+    print(f"\n{args.expenses} expenses over {args.months} months, {args.window}-day window, {args.rounds} rounds")
+    print(f"{'path':<14} {'p50 ms':>9} {'p95 ms':>9} {'min ms':>9}")
+    for name, r in results.items():
+        print(f"{name:<14} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['min_ms']:>9.2f}")
+    print(f"speedup (p50): {speedup:.1f}×")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": vars(args), "results": results, "speedup_p50": round(speedup, 2)}, f, indent=2)
+        print(f"💾 saved → {args.save}")
+
+
+if __name__ == "__main__":
+    main()
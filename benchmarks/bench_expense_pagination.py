@@ -0,0 +1,108 @@
+"""
+Benchmark: keyset vs OFFSET pagination for GET /expenses/.
+
+Seeds one user with --rows expenses in a temporary SQLite file, walks
+every page through the Flask test client following `next_cursor`, and
+times the equivalent OFFSET query at the same depths for comparison.
+
+    python benchmarks/bench_expense_pagination.py --rows 100000 --limit 50
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig  # noqa: E402
+from utils.extensions import db  # noqa: E402
+
+
+def build_app(db_path):
+    from app import create_app
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        AUTO_CREATE_TABLES = "true"
+        SCHEDULER_MODE = "off"
+        LOG_DIR = tempfile.gettempdir()
+
+    return create_app(BenchConfig)
+
+
+def seed(app, rows):
+    from models.expense import Expense
+
+    client = app.test_client()
+    client.post("/auth/register", json={"email": "bench@example.com", "password": "bench"})
+    token = client.post("/auth/login", json={"email": "bench@example.com", "password": "bench"}).get_json()["token"]
+
+    rng = random.Random(42)
+    start = datetime(2015, 1, 1)
+    with app.app_context():
+        batch = []
+        for _ in range(rows):
+            batch.append({
+                "user_id": 1,
+                "amount": round(rng.uniform(1, 500), 2),
+                "category": rng.choice(["Food", "Rent", "Bills", "Travel", "Shopping"]),
+                "date": start + timedelta(minutes=rng.randrange(10 * 365 * 24 * 60)),
+            })
+            if len(batch) == 10_000:
+                db.session.execute(Expense.__table__.insert(), batch)
+                batch = []
+        if batch:
+            db.session.execute(Expense.__table__.insert(), batch)
+        db.session.commit()
+    return client, {"Authorization": f"Bearer {token}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    from sqlalchemy import text
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"))
+        client, headers = seed(app, args.rows)
+
+        keyset_ms, cursor = [], None
+        while True:
+            url = f"/expenses/?limit={args.limit}" + (f"&cursor={cursor}" if cursor else "")
+            t0 = time.perf_counter()
+            body = client.get(url, headers=headers).get_json()
+            keyset_ms.append((time.perf_counter() - t0) * 1000)
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+
+        pages = len(keyset_ms)
+        checkpoints = sorted({p for p in (1, 10, 100, 500, 1000, pages) if p <= pages})
+
+        print(f"rows={args.rows} limit={args.limit} pages={pages}")
+        print(f"{'page':>6} {'keyset ms (HTTP)':>18} {'offset ms (SQL)':>17}")
+        with app.app_context():
+            for page in checkpoints:
+                window = keyset_ms[max(page - 5, 0):page + 5]
+                t0 = time.perf_counter()
+                for _ in range(5):
+                    db.session.execute(
+                        text(
+                            "SELECT * FROM expenses WHERE user_id = 1 AND date IS NOT NULL "
+                            "ORDER BY date DESC, id DESC LIMIT :limit OFFSET :offset"
+                        ),
+                        {"limit": args.limit + 1, "offset": (page - 1) * args.limit},
+                    ).all()
+                offset_ms = (time.perf_counter() - t0) * 1000 / 5
+                print(f"{page:>6} {statistics.median(window):>18.2f} {offset_ms:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Deterministic synthetic data: N users × M expenses × K salaries.
+
+Categories follow a fixed weighted mix with per-category lognormal
+amounts; rent and bills land early in the month, everything else is
+spread over the days with a weekend bump. The same --seed always yields
+the same rows, so benchmark runs are comparable.
+
+    python benchmarks/datagen.py --db /tmp/bench.db --users 200 --expenses 2000 --salaries 24
+
+Users are bench{i}@example.com with password DEFAULT_PASSWORD.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig  # noqa: E402
+
+DEFAULT_PASSWORD = "bench-password"
+BATCH_SIZE = 10_000
+
+# category → (weight, lognormal median, sigma)
+CATEGORIES = {
+    "Food": (0.30, 25.0, 0.6),
+    "Transport": (0.15, 12.0, 0.5),
+    "Shopping": (0.14, 60.0, 0.9),
+    "Bills": (0.10, 90.0, 0.4),
+    "Entertainment": (0.09, 30.0, 0.7),
+    "Health": (0.06, 45.0, 0.8),
+    "Travel": (0.04, 400.0, 0.8),
+    "Rent": (0.04, 1500.0, 0.2),
+    "Education": (0.03, 150.0, 0.7),
+    "Miscellaneous": (0.05, 20.0, 1.0),
+}
+EARLY_MONTH = {"Rent", "Bills"}
+
+
+def user_email(i: int) -> str:
+    return f"bench{i}@example.com"
+
+
+def build_app(db_path, **overrides):
+    """
+    App on a SQLite file (or any SQLAlchemy URL) with the scheduler and
+    request logging off. Also used as the gunicorn factory by loadtest.py.
+    """
+    from app import create_app
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = db_path if "://" in db_path else f"sqlite:///{db_path}"
+        AUTO_CREATE_TABLES = "true"
+        SCHEDULER_MODE = "off"
+        REQUEST_LOG_ENABLED = False
+        SQL_INSPECT_ENABLED = "false"
+        DIAGNOSTICS_ENABLED = True  # loadtest.py reads /health/pool
+        LOG_DIR = tempfile.gettempdir()
+
+    for key, value in overrides.items():
+        setattr(BenchConfig, key, value)
+    return create_app(BenchConfig)
+
+
+def _expense_rows(rng, user_id, count, start, months):
+    names = list(CATEGORIES)
+    weights = np.array([CATEGORIES[c][0] for c in names])
+    picks = rng.choice(len(names), size=count, p=weights / weights.sum())
+
+    medians = np.array([CATEGORIES[c][1] for c in names])[picks]
+    sigmas = np.array([CATEGORIES[c][2] for c in names])[picks]
+    amounts = np.round(medians * np.exp(rng.normal(0.0, sigmas)), 2).clip(0.5)
+
+    month_offsets = rng.integers(0, months, size=count)
+    early = np.isin(np.array(names)[picks], list(EARLY_MONTH))
+    days = np.where(early, rng.integers(0, 5, size=count), rng.integers(0, 28, size=count))
+    minutes = rng.integers(8 * 60, 22 * 60, size=count)
+
+    rows = []
+    for pick, amount, month, day, minute in zip(picks, amounts, month_offsets, days, minutes):
+        year, mon = divmod(start.month - 1 + int(month), 12)
+        when = datetime(start.year + year, mon + 1, 1) + timedelta(days=int(day), minutes=int(minute))
+        if when.weekday() >= 5 and names[pick] in ("Food", "Entertainment"):
+            amount *= 1.3  # weekend bump
+        rows.append({
+            "user_id": user_id,
+            "amount": round(float(amount), 2),
+            "category": names[pick],
+            "description": f"{names[pick]} #{len(rows)}",
+            "date": when,
+        })
+    return rows
+
+
+def _salary_rows(rng, user_id, count, start, base):
+    rows, amount = [], base
+    for k in range(count):
+        year, mon = divmod(start.month - 1 + k, 12)
+        rows.append({
+            "user_id": user_id,
+            "amount": round(amount, 2),
+            "salary_date": datetime(start.year + year, mon + 1, 1).date(),
+        })
+        amount *= 1 + float(rng.normal(0.004, 0.002))
+    return rows
+
+
+def generate(app, users=50, expenses=1000, salaries=12, months=24, seed=42, start=datetime(2024, 1, 1)):
+    """
+    Insert `users` users, each with `expenses` expenses and `salaries` salaries,
+    then rebuild rollups. Returns the number of expenses written.
+    """
+    from werkzeug.security import generate_password_hash
+
+    from models.expense import Expense
+    from models.salary import Salary
+    from models.user import User
+    from utils.extensions import db
+    from utils.rollups import rebuild_rollups
+
+    rng = np.random.default_rng(seed)
+    password_hash = generate_password_hash(DEFAULT_PASSWORD)  # hashing per user would dominate
+
+    with app.app_context():
+        first_id = (db.session.query(db.func.max(User.id)).scalar() or 0) + 1
+        incomes = np.round(rng.lognormal(np.log(4000), 0.4, size=users), 2)
+        emails = [user_email(first_id + i) for i in range(users)]
+        db.session.execute(User.__table__.insert(), [
+            {
+                "email": emails[i],
+                "password_hash": password_hash,
+                "salary": float(incomes[i]),
+                "budget_limit": round(float(incomes[i]) * 0.7, 2),
+            }
+            for i in range(users)
+        ])
+
+        # Let the database assign ids (keeps Postgres sequences in step)
+        ids = dict(db.session.query(User.email, User.id).filter(User.email.in_(emails)).all())
+
+        written, batch, salary_batch = 0, [], []
+        for i in range(users):
+            user_id = ids[emails[i]]
+            batch.extend(_expense_rows(rng, user_id, expenses, start, months))
+            salary_batch.extend(_salary_rows(rng, user_id, salaries, start, float(incomes[i])))
+            if len(batch) >= BATCH_SIZE:
+                db.session.execute(Expense.__table__.insert(), batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            db.session.execute(Expense.__table__.insert(), batch)
+            written += len(batch)
+        if salary_batch:
+            db.session.execute(Salary.__table__.insert(), salary_batch)
+
+        rebuild_rollups()
+        db.session.commit()
+    return written
+
+
+def bench_emails(app, limit=None):
+    """
+    Emails of the bench users already in the database, oldest first; with
+    `limit`, only the `limit` most recently generated ones.
+    """
+    from models.user import User
+    from utils.extensions import db
+
+    with app.app_context():
+        query = (
+            db.session.query(User.email)
+            .filter(User.email.like(user_email("%")))
+            .order_by(User.id.desc())
+        )
+        if limit:
+            query = query.limit(limit)
+        return [email for email, in reversed(query.all())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="SQLite file (or SQLAlchemy URL) to create or extend")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--expenses", type=int, default=1000, help="expenses per user")
+    parser.add_argument("--salaries", type=int, default=12, help="salaries per user")
+    parser.add_argument("--months", type=int, default=24, help="months the expenses are spread over")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    app = build_app(args.db if "://" in args.db else os.path.abspath(args.db))
+    t0 = time.perf_counter()
+    rows = generate(app, args.users, args.expenses, args.salaries, args.months, args.seed)
+    print(f"✅ {args.users} users, {rows} expenses, {args.users * args.salaries} salaries "
+          f"in {time.perf_counter() - t0:.1f}s → {args.db}")
+
+
+if __name__ == "__main__":
+    main()
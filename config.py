@@ -40,6 +40,70 @@ class Config:
 
     SQLALCHEMY_DATABASE_URI = DATABASE_URL or "sqlite:///budget_dev.db"
 
+    # Connection pool (Postgres only; see utils/db_engine.py)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 2))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 3))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 280))  # < Neon idle timeout
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() in ("1", "true", "yes")
+    # Unsupported behind pgbouncer (set it on the role), so no default there
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0 if DB_PGBOUNCER else 30000))
+
+    # ASGI mode (asgi.py): async engine URL; derived from the sync URL when unset
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+    # Auth cache (per-process token claims + user snapshots)
+    AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", 30))
+    AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", 1024))
+
+    # Fitted spending-forecast models (per process, keyed by user data version)
+    FORECAST_CACHE_TTL = int(os.getenv("FORECAST_CACHE_TTL", 3600))
+    FORECAST_CACHE_MAX_SIZE = int(os.getenv("FORECAST_CACHE_MAX_SIZE", 1024))
+
+    # Anomaly flag on POST /expenses/ (per-category z-score / robust MAD score)
+    ANOMALY_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", 3.0))
+    ANOMALY_MAD_THRESHOLD = float(os.getenv("ANOMALY_MAD_THRESHOLD", 3.5))
+    ANOMALY_MIN_HISTORY = int(os.getenv("ANOMALY_MIN_HISTORY", 5))
+
+    # Category suggestions: hashed naive Bayes counts in a memory-mapped .npy
+    # (default: <instance>/category_model.npy; ":memory:" = per process)
+    CATEGORY_MODEL_PATH = os.getenv("CATEGORY_MODEL_PATH")
+    CATEGORY_MODEL_FEATURES = int(os.getenv("CATEGORY_MODEL_FEATURES", 2 ** 17))
+    CATEGORY_MODEL_MAX_CATEGORIES = int(os.getenv("CATEGORY_MODEL_MAX_CATEGORIES", 32))
+
+    # Budget alerts: percent-of-limit thresholds checked on every expense
+    # write; at most RATE_LIMIT mails per user per RATE_WINDOW seconds
+    BUDGET_ALERT_THRESHOLDS = os.getenv("BUDGET_ALERT_THRESHOLDS", "80,100")
+    BUDGET_ALERT_RATE_LIMIT = int(os.getenv("BUDGET_ALERT_RATE_LIMIT", 3))
+    BUDGET_ALERT_RATE_WINDOW = int(os.getenv("BUDGET_ALERT_RATE_WINDOW", 3600))
+
+    # Password hashing: werkzeug method string + per-process hashing pool (0 workers = inline)
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_SALT_LENGTH = int(os.getenv("PASSWORD_SALT_LENGTH", 16))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", 10))
+
+    # Response cache for summary/trends payloads: memory | sqlite | none
+    # ("sqlite" shares entries between gunicorn workers on one host)
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH")
+
+    # Request instrumentation (Server-Timing header, per-request log line, /metrics)
+    REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    REQUEST_LOG_ENABLED = os.getenv("REQUEST_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+    # JSON diagnostics under /health/* (cache and pool internals); off on the public API.
+    # The same numbers are exported on /metrics, which operators can firewall.
+    DIAGNOSTICS_ENABLED = os.getenv("DIAGNOSTICS_ENABLED", "false").lower() in ("1", "true", "yes")
+
+    # SQL inspector: N+1 warnings and slow-query EXPLAIN logging (unset = follow DEBUG)
+    SQL_INSPECT_ENABLED = os.getenv("SQL_INSPECT_ENABLED")
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 10))
+    SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", 200))
+    SQL_EXPLAIN_SLOW = os.getenv("SQL_EXPLAIN_SLOW", "true").lower() in ("1", "true", "yes")
+
     # Logging
     LOG_DIR = os.getenv("LOG_DIR", "logs")
     LOG_FILE = os.getenv("LOG_FILE", "budget_tracker.log")
@@ -58,6 +122,31 @@ class Config:
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
 
+    # Bulk expense import caps (POST /expenses/bulk)
+    BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", 10_000))
+    BULK_MAX_BYTES = int(os.getenv("BULK_MAX_BYTES", 5 * 1024 * 1024))
+    # Hard cap on any request body, enforced by Werkzeug while reading, so
+    # chunked uploads (no Content-Length) are bounded too
+    MAX_CONTENT_LENGTH = BULK_MAX_BYTES
+
+    # Scheduler: "embedded" runs APScheduler inside each web worker (one
+    # leader executes jobs); "off" leaves it to `python scheduler.py`
+    SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "embedded")
+    SCHEDULER_LOCK_TTL = int(os.getenv("SCHEDULER_LOCK_TTL", 30))
+    SCHEDULER_HEARTBEAT_SECONDS = int(os.getenv("SCHEDULER_HEARTBEAT_SECONDS", 10))
+
+    # Monthly report pipeline
+    REPORT_BATCH_SIZE = int(os.getenv("REPORT_BATCH_SIZE", 500))
+    REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", 4))
+    REPORT_SMTP_CONNECTIONS = int(os.getenv("REPORT_SMTP_CONNECTIONS", 2))
+
+    # Background jobs (`python worker.py`): threads per worker process, idle
+    # poll interval, and retry backoff (base·2^(attempt-1), capped)
+    JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", 4))
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1.0))
+    JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", 10))
+    JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", 3600))
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -68,6 +157,8 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     WTF_CSRF_ENABLED = False  # Disable CSRF for testing
+    PASSWORD_HASH_WORKERS = 0  # hash inline; no process pool in tests
+    CATEGORY_MODEL_PATH = ":memory:"
 
 
 class ProductionConfig(Config):
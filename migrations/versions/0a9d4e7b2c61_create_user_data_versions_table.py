@@ -0,0 +1,29 @@
+"""Create user_data_versions table
+
+Revision ID: 0a9d4e7b2c61
+Revises: f7c3a1e95d28
+Create Date: 2026-10-17 18:05:52.341978
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9d4e7b2c61'
+down_revision = 'f7c3a1e95d28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_data_versions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_data_versions')
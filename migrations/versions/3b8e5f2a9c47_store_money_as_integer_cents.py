@@ -0,0 +1,68 @@
+"""Store money columns as integer cents
+
+Revision ID: 3b8e5f2a9c47
+Revises: 0a9d4e7b2c61
+Create Date: 2026-10-17 21:14:08.517302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e5f2a9c47'
+down_revision = '0a9d4e7b2c61'
+branch_labels = None
+depends_on = None
+
+# salary and budgets predate the migration history (created by create_all),
+# so every table is converted only if it exists. Rollup totals are scaled
+# as-is; run `flask rollups rebuild` afterwards to re-derive them from the
+# rounded expense cents.
+MONEY_COLUMNS = {
+    'expenses': [('amount', False)],
+    'users': [('salary', True), ('budget_limit', False)],
+    'expense_rollups': [('total_amount', False), ('min_amount', True), ('max_amount', True)],
+    'salary': [('amount', False)],
+    'budgets': [('limit', False)],
+}
+
+
+def _existing_tables():
+    inspector = sa.inspect(op.get_bind())
+    return [t for t in MONEY_COLUMNS if inspector.has_table(t)]
+
+
+def upgrade():
+    for table in _existing_tables():
+        columns = MONEY_COLUMNS[table]
+        # Scale in place while still floating point, then narrow the type
+        op.execute(
+            sa.table(table, *[sa.column(name) for name, _ in columns]).update().values(
+                {name: sa.func.round(sa.column(name) * 100) for name, _ in columns}
+            )
+        )
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, nullable in columns:
+                batch_op.alter_column(name,
+                       existing_type=sa.Float(),
+                       type_=sa.BigInteger(),
+                       existing_nullable=nullable,
+                       postgresql_using=f'round("{name}")::bigint')
+
+
+def downgrade():
+    for table in _existing_tables():
+        columns = MONEY_COLUMNS[table]
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, nullable in columns:
+                batch_op.alter_column(name,
+                       existing_type=sa.BigInteger(),
+                       type_=sa.Float(),
+                       existing_nullable=nullable,
+                       postgresql_using=f'"{name}"::double precision')
+        op.execute(
+            sa.table(table, *[sa.column(name) for name, _ in columns]).update().values(
+                {name: sa.column(name) / 100.0 for name, _ in columns}
+            )
+        )
@@ -0,0 +1,27 @@
+"""Add category_suggested flag to expenses
+
+Revision ID: 5b9d1f3e7a24
+Revises: 4e7a2c9d1b53
+Create Date: 2026-10-18 09:12:47.301865
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b9d1f3e7a24'
+down_revision = '4e7a2c9d1b53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows were categorised by their users (or cannot be told apart)
+    with op.batch_alter_table('expenses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('category_suggested', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('expenses', schema=None) as batch_op:
+        batch_op.drop_column('category_suggested')
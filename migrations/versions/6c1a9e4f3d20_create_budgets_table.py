@@ -0,0 +1,45 @@
+"""Create budgets table with one limit per category
+
+Revision ID: 6c1a9e4f3d20
+Revises: 9f4c2d7e1a86
+Create Date: 2026-10-17 22:41:19.204583
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1a9e4f3d20'
+down_revision = '9f4c2d7e1a86'
+branch_labels = None
+depends_on = None
+
+
+# budgets predates the migration history (created by create_all), so it is
+# created here only when missing; otherwise duplicate categories are
+# collapsed (keeping the oldest row) before the unique constraint is added.
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('budgets'):
+        op.create_table('budgets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(length=100), nullable=False),
+        sa.Column('limit', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'category', name='uq_budgets_user_id_category')
+        )
+        return
+
+    budgets = sa.table('budgets', sa.column('id'), sa.column('user_id'), sa.column('category'))
+    keep = sa.select(sa.func.min(budgets.c.id)).group_by(budgets.c.user_id, budgets.c.category)
+    op.execute(budgets.delete().where(budgets.c.id.not_in(keep.scalar_subquery())))
+    with op.batch_alter_table('budgets', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_budgets_user_id_category', ['user_id', 'category'])
+
+
+def downgrade():
+    with op.batch_alter_table('budgets', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_budgets_user_id_category', type_='unique')
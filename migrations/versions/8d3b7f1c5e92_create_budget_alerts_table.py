@@ -0,0 +1,38 @@
+"""Create budget_alerts table
+
+Revision ID: 8d3b7f1c5e92
+Revises: 6c1a9e4f3d20
+Create Date: 2026-10-17 23:18:52.061447
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3b7f1c5e92'
+down_revision = '6c1a9e4f3d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('budget_alerts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('threshold', sa.Integer(), nullable=False),
+    sa.Column('spent', sa.BigInteger(), nullable=False),
+    sa.Column('limit', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'period', 'category', 'threshold', name='uq_budget_alerts_dedup')
+    )
+
+
+def downgrade():
+    op.drop_table('budget_alerts')
@@ -0,0 +1,51 @@
+"""Create category_stats table
+
+Revision ID: 9f4c2d7e1a86
+Revises: 3b8e5f2a9c47
+Create Date: 2026-10-17 22:02:41.730915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f4c2d7e1a86'
+down_revision = '3b8e5f2a9c47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('category_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.Column('mean_cents', sa.Float(), nullable=False),
+    sa.Column('m2', sa.Float(), nullable=False),
+    sa.Column('median_cents', sa.Float(), nullable=True),
+    sa.Column('mad_cents', sa.Float(), nullable=True),
+    sa.Column('rescored_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'category')
+    )
+
+    # Backfill count/mean/M2 from existing expenses so incremental updates
+    # start from full history. M2 is summed as squared deviations from the
+    # bucket mean (stable, unlike sum(x^2) - n*mean^2). Median/MAD are filled
+    # by `flask anomalies rescore`.
+    op.execute(
+        "INSERT INTO category_stats (user_id, category, count, mean_cents, m2) "
+        "SELECT e.user_id, e.category, COUNT(*), m.mean_cents, "
+        "SUM((CAST(e.amount AS DOUBLE PRECISION) - m.mean_cents) "
+        "* (CAST(e.amount AS DOUBLE PRECISION) - m.mean_cents)) "
+        "FROM expenses e JOIN ("
+        "SELECT user_id, category, AVG(CAST(amount AS DOUBLE PRECISION)) AS mean_cents "
+        "FROM expenses GROUP BY user_id, category"
+        ") m ON m.user_id = e.user_id AND m.category = e.category "
+        "GROUP BY e.user_id, e.category, m.mean_cents"
+    )
+
+
+def downgrade():
+    op.drop_table('category_stats')
@@ -0,0 +1,26 @@
+"""Add (user_id, date) index to expenses
+
+Revision ID: b4e1c9a07d2f
+Revises: 365fe8d43a1d
+Create Date: 2026-10-17 09:12:41.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e1c9a07d2f'
+down_revision = '365fe8d43a1d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('expenses', schema=None) as batch_op:
+        batch_op.create_index('ix_expenses_user_id_date', ['user_id', 'date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('expenses', schema=None) as batch_op:
+        batch_op.drop_index('ix_expenses_user_id_date')
@@ -0,0 +1,48 @@
+"""Create expense_rollups table
+
+Revision ID: c8d2f4b61e93
+Revises: b4e1c9a07d2f
+Create Date: 2026-10-17 11:03:27.904116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8d2f4b61e93'
+down_revision = 'b4e1c9a07d2f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('expense_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year_month', sa.String(length=7), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('expense_count', sa.Integer(), nullable=False),
+    sa.Column('min_amount', sa.Float(), nullable=True),
+    sa.Column('max_amount', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'year_month', 'category')
+    )
+
+    # Backfill from existing expenses
+    if op.get_bind().dialect.name == 'sqlite':
+        month = "strftime('%Y-%m', date)"
+    else:
+        month = "to_char(date, 'YYYY-MM')"
+    op.execute(
+        "INSERT INTO expense_rollups "
+        "(user_id, year_month, category, total_amount, expense_count, min_amount, max_amount) "
+        f"SELECT user_id, COALESCE({month}, 'Unknown'), COALESCE(category, 'Miscellaneous'), "
+        "COALESCE(SUM(amount), 0), COUNT(id), MIN(amount), MAX(amount) "
+        f"FROM expenses GROUP BY user_id, COALESCE({month}, 'Unknown'), "
+        "COALESCE(category, 'Miscellaneous')"
+    )
+
+
+def downgrade():
+    op.drop_table('expense_rollups')
@@ -0,0 +1,35 @@
+"""Create report_deliveries table
+
+Revision ID: d5a7e3c90b14
+Revises: c8d2f4b61e93
+Create Date: 2026-10-17 13:41:09.275830
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a7e3c90b14'
+down_revision = 'c8d2f4b61e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('report_deliveries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.String(length=255), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'period', name='uq_report_deliveries_user_period')
+    )
+
+
+def downgrade():
+    op.drop_table('report_deliveries')
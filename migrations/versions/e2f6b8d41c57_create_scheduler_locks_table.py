@@ -0,0 +1,29 @@
+"""Create scheduler_locks table
+
+Revision ID: e2f6b8d41c57
+Revises: d5a7e3c90b14
+Create Date: 2026-10-17 15:22:48.630417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f6b8d41c57'
+down_revision = 'd5a7e3c90b14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scheduler_locks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('holder', sa.String(length=120), nullable=False),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('scheduler_locks')
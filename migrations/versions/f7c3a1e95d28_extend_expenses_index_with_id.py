@@ -0,0 +1,29 @@
+"""Extend expenses (user_id, date) index with id for keyset pagination
+
+Revision ID: f7c3a1e95d28
+Revises: e2f6b8d41c57
+Create Date: 2026-10-17 16:48:13.557092
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7c3a1e95d28'
+down_revision = 'e2f6b8d41c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (user_id, date, id) keeps serving every (user_id, date) lookup
+    with op.batch_alter_table('expenses', schema=None) as batch_op:
+        batch_op.create_index('ix_expenses_user_id_date_id', ['user_id', 'date', 'id'], unique=False)
+        batch_op.drop_index('ix_expenses_user_id_date')
+
+
+def downgrade():
+    with op.batch_alter_table('expenses', schema=None) as batch_op:
+        batch_op.create_index('ix_expenses_user_id_date', ['user_id', 'date'], unique=False)
+        batch_op.drop_index('ix_expenses_user_id_date_id')
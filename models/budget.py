@@ -1,14 +1,24 @@
 from utils.extensions import db
+from utils.money import Money, to_money
 from datetime import datetime
 
+from sqlalchemy import case, delete, exists, insert, literal, select, union_all, update
+
+DEFAULT_CATEGORIES = ["Food", "Transport", "Entertainment", "Bills", "Miscellaneous"]
+
 
 class Budget(db.Model):
     __tablename__ = "budgets"
+    __table_args__ = (
+        # One limit per category; also serves the (user_id, category) join
+        # against expense_rollups in the spend-vs-limit report
+        db.UniqueConstraint("user_id", "category", name="uq_budgets_user_id_category"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     category = db.Column(db.String(100), nullable=False, default="Miscellaneous")
-    limit = db.Column(db.Float, nullable=False, default=0.0)
+    limit = db.Column(Money, nullable=False, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def __repr__(self):
@@ -16,51 +26,82 @@ class Budget(db.Model):
 
 
 # ================== Utility Functions ==================
+# Each helper is a single statement; they bypass the ORM flush, so the
+# user's data version is bumped by hand to invalidate ETags and caches.
+
+def _commit_bulk_write(user_id, changed):
+    if changed:
+        from utils.data_version import bump_data_versions  # data_version imports this module
+        bump_data_versions(db.session, [user_id])
+    db.session.commit()
+
 
 def reset_all_budgets(user_id):
     """Reset all budgets for a user back to zero."""
-    budgets = Budget.query.filter_by(user_id=user_id).all()
-    for budget in budgets:
-        budget.limit = 0.0
-    db.session.commit()
+    result = db.session.execute(
+        update(Budget).where(Budget.user_id == user_id).values(limit=to_money(0))
+        .execution_options(synchronize_session=False)
+    )
+    _commit_bulk_write(user_id, result.rowcount)
+    return result.rowcount
 
 
 def delete_all_budgets(user_id):
     """Delete all budgets for a user."""
-    budgets = Budget.query.filter_by(user_id=user_id).all()
-    for budget in budgets:  # ✅ changed from `for e in budgets`
-        db.session.delete(budget)
-    db.session.commit()
+    result = db.session.execute(
+        delete(Budget).where(Budget.user_id == user_id).execution_options(synchronize_session=False)
+    )
+    _commit_bulk_write(user_id, result.rowcount)
+    return result.rowcount
 
 
 def seed_default_budgets(user_id):
-    """Seed default categories if none exist."""
-    default_categories = ["Food", "Transport", "Entertainment", "Bills", "Miscellaneous"]
-
-    budgets = Budget.query.filter_by(user_id=user_id).all()
-    if not budgets:
-        for category in default_categories:  # ✅ meaningful name
-            db.session.add(Budget(user_id=user_id, category=category, limit=0.0))
-        db.session.commit()
+    """Seed default categories if none exist (one INSERT ... SELECT ... WHERE NOT EXISTS)."""
+    defaults = union_all(*[select(literal(name).label("category")) for name in DEFAULT_CATEGORIES]).subquery()
+    stmt = insert(Budget).from_select(
+        ["user_id", "category", "limit", "created_at"],
+        select(
+            literal(user_id), defaults.c.category,
+            literal(to_money(0), Money), literal(datetime.utcnow(), db.DateTime),
+        ).where(~exists().where(Budget.user_id == user_id)),
+    )
+    result = db.session.execute(stmt)
+    _commit_bulk_write(user_id, result.rowcount)
+    return result.rowcount
 
 
 def update_budget_limits(user_id, new_limits):
-    """Update budget limits from a dict {category: limit}."""
-    budgets = Budget.query.filter_by(user_id=user_id).all()
-
-    for budget in budgets:  # ✅ not `e`
-        if budget.category in new_limits:
-            budget.limit = float(new_limits[budget.category])
-
-    db.session.commit()
+    """
+    Update budget limits from a dict {category: limit} with one
+    UPDATE ... SET limit = CASE category WHEN ... END. Returns the
+    categories that were updated (unknown categories are ignored).
+    """
+    limits = {category: to_money(limit) for category, limit in new_limits.items()}
+    if not limits:
+        return []
+
+    stmt = (
+        update(Budget)
+        .where(Budget.user_id == user_id, Budget.category.in_(limits))
+        .values(limit=case(
+            {category: literal(limit, Money) for category, limit in limits.items()},
+            value=Budget.category,
+            else_=Budget.limit,
+        ))
+        .returning(Budget.category)
+        .execution_options(synchronize_session=False)
+    )
+    updated = db.session.execute(stmt).scalars().all()
+    _commit_bulk_write(user_id, updated)
+    return updated
 
 
 def remove_unused_categories(user_id, used_categories):
     """Remove categories that are not in use anymore."""
-    budgets = Budget.query.filter_by(user_id=user_id).all()
-
-    for budget in budgets:  # ✅
-        if budget.category not in used_categories:
-            db.session.delete(budget)
-
-    db.session.commit()
\ No newline at end of file
+    result = db.session.execute(
+        delete(Budget)
+        .where(Budget.user_id == user_id, Budget.category.not_in(list(used_categories)))
+        .execution_options(synchronize_session=False)
+    )
+    _commit_bulk_write(user_id, result.rowcount)
+    return result.rowcount
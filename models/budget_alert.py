@@ -0,0 +1,30 @@
+from utils.extensions import db
+from utils.money import Money
+from datetime import datetime
+
+OVERALL_SCOPE = "*"  # `category` value for alerts on User.budget_limit
+
+
+class BudgetAlert(db.Model):
+    """
+    One row per (user, month, category, threshold) ever crossed. The unique
+    constraint is the dedup: a threshold alerts at most once per month.
+    """
+    __tablename__ = "budget_alerts"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "period", "category", "threshold", name="uq_budget_alerts_dedup"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    period = db.Column(db.String(7), nullable=False)  # "YYYY-MM"
+    category = db.Column(db.String(100), nullable=False)  # or OVERALL_SCOPE
+    threshold = db.Column(db.Integer, nullable=False)  # percent of the limit
+    spent = db.Column(Money, nullable=False)
+    limit = db.Column(Money, nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # queued | sent | suppressed | failed
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<BudgetAlert {self.user_id} {self.period} {self.category} {self.threshold}% - {self.status}>"
@@ -0,0 +1,23 @@
+from utils.extensions import db
+
+
+class CategoryStats(db.Model):
+    """
+    Running moments of expense amounts (in cents) per (user, category).
+    count/mean_cents/m2 are updated incrementally on every insert
+    (Welford / Chan merge) by utils/expense_stats.py; median/MAD are
+    refreshed by the batch re-scoring command.
+    """
+    __tablename__ = "category_stats"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    category = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.BigInteger, nullable=False, default=0)
+    mean_cents = db.Column(db.Float, nullable=False, default=0.0)
+    m2 = db.Column(db.Float, nullable=False, default=0.0)  # sum of squared deviations from the mean
+    median_cents = db.Column(db.Float)
+    mad_cents = db.Column(db.Float)
+    rescored_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<CategoryStats {self.user_id} {self.category} - n={self.count}>"
@@ -1,16 +1,24 @@
 from utils.extensions import db
+from utils.money import Money
 from datetime import datetime
 
 
 class Expense(db.Model):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Serves per-user range scans, rollup rebuilds and (date, id)
+        # keyset pagination in GET /expenses/
+        db.Index("ix_expenses_user_id_date_id", "user_id", "date", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)
     category = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(255))
     date = db.Column(db.DateTime, default=datetime.utcnow)
+    # Category came from the suggestion model, not the user: never a training label
+    category_suggested = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
 
     def __repr__(self):
         return f"<Expense {self.category} - {self.amount}>"
\ No newline at end of file
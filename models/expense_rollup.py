@@ -0,0 +1,21 @@
+from utils.extensions import db
+from utils.money import Money
+
+
+class ExpenseRollup(db.Model):
+    """
+    Pre-aggregated expense totals per (user, month, category).
+    Maintained on every expense write by utils/rollups.py.
+    """
+    __tablename__ = "expense_rollups"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    year_month = db.Column(db.String(7), primary_key=True)  # "YYYY-MM" or "Unknown"
+    category = db.Column(db.String(100), primary_key=True)
+    total_amount = db.Column(Money, nullable=False, default=0)
+    expense_count = db.Column(db.Integer, nullable=False, default=0)
+    min_amount = db.Column(Money)
+    max_amount = db.Column(Money)
+
+    def __repr__(self):
+        return f"<ExpenseRollup {self.user_id} {self.year_month} {self.category} - {self.total_amount}>"
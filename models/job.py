@@ -0,0 +1,35 @@
+from utils.extensions import db
+from datetime import datetime
+
+
+class Job(db.Model):
+    """
+    A unit of background work, claimed by `python worker.py` processes.
+    See utils/job_queue.py for the claim / retry / lease protocol.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Serves the claim scan (status = 'queued' AND run_at <= now ORDER BY run_at)
+        # and the expired-lease sweep over running jobs
+        db.Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    key = db.Column(db.String(200), unique=True)  # optional dedup key
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued | running | done | failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    locked_by = db.Column(db.String(120))
+    locked_until = db.Column(db.DateTime)
+    last_error = db.Column(db.String(255))
+    wait_ms = db.Column(db.Float)  # run_at → started_at of the last attempt
+    run_ms = db.Column(db.Float)   # duration of the last attempt
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.name} - {self.status}>"
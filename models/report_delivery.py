@@ -0,0 +1,21 @@
+from utils.extensions import db
+from datetime import datetime
+
+
+class ReportDelivery(db.Model):
+    """Per-user progress record for a monthly report run (makes the job resumable)."""
+    __tablename__ = "report_deliveries"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "period", name="uq_report_deliveries_user_period"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    period = db.Column(db.String(7), nullable=False)  # "YYYY-MM" the report covers
+    status = db.Column(db.String(20), nullable=False)  # sent | empty | failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(255))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ReportDelivery {self.user_id} {self.period} - {self.status}>"
@@ -1,10 +1,11 @@
 from utils.extensions import db
+from utils.money import Money
 
 class Salary(db.Model):
     __tablename__ = "salary"
 
     id = db.Column(db.Integer, primary_key=True)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)
     salary_date = db.Column(db.Date)
 
     # FK → users.id
@@ -0,0 +1,13 @@
+from utils.extensions import db
+
+
+class SchedulerLock(db.Model):
+    """Lease row used for leader election between scheduler processes."""
+    __tablename__ = "scheduler_locks"
+
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(120), nullable=False)
+    heartbeat_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<SchedulerLock {self.name} - {self.holder}>"
@@ -1,5 +1,6 @@
 from utils.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.money import Money
+from utils.passwords import password_hasher
 
 
 class User(db.Model):
@@ -8,8 +9,8 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
-    salary = db.Column(db.Float, default=0.0)
-    budget_limit = db.Column(db.Float, default=0.0)
+    salary = db.Column(Money, default=0)
+    budget_limit = db.Column(Money, default=0)
 
     # Relationships
     expenses = db.relationship("Expense", backref="user", lazy=True, cascade="all, delete-orphan")
@@ -17,7 +18,7 @@ class User(db.Model):
 
     # Helper methods
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
\ No newline at end of file
+        return password_hasher.verify(self.password_hash, password)
\ No newline at end of file
@@ -0,0 +1,12 @@
+from utils.extensions import db
+
+
+class UserDataVersion(db.Model):
+    """Monotonic per-user counter bumped on every write that changes dashboard data."""
+    __tablename__ = "user_data_versions"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UserDataVersion {self.user_id} - v{self.version}>"
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify, current_app
-from werkzeug.security import generate_password_hash, check_password_hash
 from models.user import User
 from utils.extensions import db
+from utils.passwords import PasswordHasherBusy, login_attempts, password_hasher
 import jwt
 import datetime
 
@@ -21,8 +21,8 @@ def register():
         if User.query.filter_by(email=email).first():
             return jsonify({"error": "User already exists"}), 400
 
-        # Hash password
-        hashed_password = generate_password_hash(password)
+        # Hash password (in the bounded hashing pool, not on this thread)
+        hashed_password = password_hasher.hash(password)
 
         # Create new user
         new_user = User(
@@ -36,6 +36,10 @@ def register():
 
         return jsonify({"message": "User registered successfully"}), 201
 
+    except PasswordHasherBusy:
+        current_app.logger.warning("⚠️ Register rejected: password hashing pool saturated")
+        return jsonify({"error": "Server busy, please retry"}), 503, {"Retry-After": "1"}
+
     except Exception as e:
         current_app.logger.exception("❌ Register error")
         return jsonify({"error": str(e)}), 500
@@ -51,11 +55,24 @@ def login():
 
         user = User.query.filter_by(email=email).first()
         if not user:
+            login_attempts.inc(("unknown_user",))
             return jsonify({"error": "User not found"}), 404
 
-        if not check_password_hash(user.password_hash, password):
+        if not password_hasher.verify(user.password_hash, password):
+            login_attempts.inc(("invalid",))
             return jsonify({"error": "Invalid credentials"}), 401
 
+        # Upgrade hashes made with an older PASSWORD_HASH_METHOD / cost
+        if password_hasher.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = password_hasher.hash(password)
+                db.session.commit()
+                current_app.logger.info("🔐 Rehashed password for user %s", user.id)
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.warning("⚠️ Password rehash failed for user %s: %s", user.id, e)
+        login_attempts.inc(("success",))
+
         # Generate JWT
         token = jwt.encode(
             {
@@ -71,11 +88,16 @@ def login():
             "user": {
                 "id": user.id,
                 "email": user.email,
-                "salary": user.salary,
-                "budget_limit": user.budget_limit
+                "salary": float(user.salary or 0),
+                "budget_limit": float(user.budget_limit or 0)
             }
         }), 200
 
+    except PasswordHasherBusy:
+        login_attempts.inc(("busy",))
+        current_app.logger.warning("⚠️ Login rejected: password hashing pool saturated")
+        return jsonify({"error": "Server busy, please retry"}), 503, {"Retry-After": "1"}
+
     except Exception as e:
         current_app.logger.exception("❌ Login error")
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -1,7 +1,18 @@
-from flask import Blueprint, jsonify, current_app
+from datetime import datetime
+from decimal import InvalidOperation
 
-from models.expense import Expense
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy.exc import IntegrityError
+
+from utils.extensions import db
+from models.budget import Budget, seed_default_budgets, update_budget_limits
+from models.budget_alert import OVERALL_SCOPE, BudgetAlert
 from utils.decorators import token_required
+from utils.conditional import versioned_etag
+from utils.expense_queries import budget_report_query, expense_totals
+from utils.money import from_cents, to_money
+
+MAX_CATEGORY_LENGTH = 100
 
 # ================== Blueprint Setup ================== #
 budget_bp = Blueprint("budget", __name__)
@@ -9,32 +20,90 @@ budget_bp = Blueprint("budget", __name__)
 
 
 # ================== HELPER ================== #
-def build_summary(user, expenses):
-    """Reusable helper: build summary for a user’s budget and expenses."""
-    total_expenses = sum(float(exp.amount or 0) for exp in expenses)
-    salary = float(user.salary or 0)
-    budget_limit = float(user.budget_limit or 0)
+def build_summary(user, total_expenses, expense_count):
+    """Reusable helper: build summary for a user’s budget and expense totals."""
+    # Exact Decimal arithmetic; floats only in the JSON payload
+    total_expenses = to_money(total_expenses or 0)
+    salary = to_money(user.salary or 0)
+    budget_limit = to_money(user.budget_limit or 0)
+
+    return {
+        "salary": float(salary),
+        "budget_limit": float(budget_limit),
+        "total_expenses": float(total_expenses),
+        "remaining_budget": float(max(budget_limit - total_expenses, 0)),
+        "expense_count": expense_count,
+    }
+
+
+def serialize_budget(budget):
+    return {"id": budget.id, "category": budget.category, "limit": float(budget.limit or 0)}
+
+
+def current_month() -> str:
+    return datetime.utcnow().strftime("%Y-%m")
+
+
+def build_budget_report(rows):
+    """Spend vs. limit per category from budget_report_query rows (cents)."""
+    categories, total_limit, total_spent = [], 0, 0
+    for category, limit_cents, spent_cents, expense_count in rows:
+        spent_cents = int(spent_cents or 0)
+        total_spent += spent_cents
+        entry = {
+            "category": category,
+            "limit": None,
+            "spent": float(from_cents(spent_cents)),
+            "remaining": None,
+            "percent_used": None,
+            "expense_count": int(expense_count or 0),
+            "status": "unbudgeted",
+        }
+        if limit_cents is not None:
+            limit_cents = int(limit_cents)
+            total_limit += limit_cents
+            entry.update(
+                limit=float(from_cents(limit_cents)),
+                remaining=float(from_cents(limit_cents - spent_cents)),
+                percent_used=round(100 * spent_cents / limit_cents, 1) if limit_cents else None,
+                status="over" if spent_cents > limit_cents else "within",
+            )
+        categories.append(entry)
 
     return {
-        "salary": salary,
-        "budget_limit": budget_limit,
-        "total_expenses": total_expenses,
-        "remaining_budget": max(budget_limit - total_expenses, 0),
-        "expense_count": len(expenses),
+        "categories": categories,
+        "total_limit": float(from_cents(total_limit)),
+        "total_spent": float(from_cents(total_spent)),
+        "over_budget": [c["category"] for c in categories if c["status"] == "over"],
     }
 
 
+def _parse_limit(value):
+    """Non-negative money amount, or None when invalid."""
+    try:
+        limit = to_money(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return limit if limit >= 0 else None
+
+
+def _parse_category(value):
+    category = str(value or "").strip()
+    return category if 0 < len(category) <= MAX_CATEGORY_LENGTH else None
+
+
 # ================== ROUTES ================== #
 @budget_bp.route("/summary/<email>", methods=["GET"])
 @token_required
+@versioned_etag("summary")
 def get_budget_summary(current_user, email: str):
-    """Return budget summary for a given user (authorized)."""
+    """Return budget summary for a given user (authorized). Supports If-None-Match."""
     try:
         if current_user.email != email.lower().strip():
             return jsonify({"error": "Unauthorized access"}), 403
 
-        expenses = Expense.query.filter_by(user_id=current_user.id).all()
-        summary = build_summary(current_user, expenses)
+        total_expenses, expense_count = expense_totals(current_user.id)
+        summary = build_summary(current_user, total_expenses, expense_count)
 
         return jsonify({
             "email": current_user.email,
@@ -44,3 +113,213 @@ def get_budget_summary(current_user, email: str):
     except Exception as e:
         current_app.logger.exception("❌ Error in /budget/summary/<email>: %s", e)
         return jsonify({"error": "Internal server error"}), 500
+
+
+# ================== CATEGORY BUDGETS ================== #
+@budget_bp.route("/categories", methods=["GET"])
+@token_required
+@versioned_etag("budget-categories")
+def list_budget_categories(current_user):
+    """List the user's per-category limits."""
+    try:
+        budgets = (
+            Budget.query.filter_by(user_id=current_user.id)
+            .order_by(Budget.category)
+            .all()
+        )
+        return jsonify({"budgets": [serialize_budget(b) for b in budgets]}), 200
+
+    except Exception as e:
+        current_app.logger.exception("❌ Error in /budget/categories [GET]: %s", e)
+        return jsonify({"error": "Failed to fetch budgets"}), 500
+
+
+@budget_bp.route("/categories", methods=["POST"])
+@token_required
+def create_budget_category(current_user):
+    """Create a limit for one category (409 if the category already has one)."""
+    data = request.get_json(silent=True) or {}
+    missing = [f for f in ("category", "limit") if data.get(f) in (None, "")]
+    if missing:
+        return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
+
+    category, limit = _parse_category(data["category"]), _parse_limit(data["limit"])
+    if category is None:
+        return jsonify({"error": "Invalid category"}), 400
+    if limit is None:
+        return jsonify({"error": "Invalid limit"}), 400
+
+    try:
+        budget = Budget(user_id=current_user.id, category=category, limit=limit)
+        db.session.add(budget)
+        db.session.commit()
+        current_app.logger.info("✅ Budget for %s created for user %s", category, current_user.email)
+        return jsonify({"message": "Budget created", "budget": serialize_budget(budget)}), 201
+
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": f"A budget for {category} already exists"}), 409
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("❌ Error in /budget/categories [POST]: %s", e)
+        return jsonify({"error": "Failed to create budget"}), 500
+
+
+@budget_bp.route("/categories", methods=["PUT"])
+@token_required
+def update_budget_categories(current_user):
+    """
+    Bulk-update limits: {"limits": {"Food": 300, ...}}, applied with one
+    UPDATE ... CASE. Categories without a budget are reported, not created.
+    """
+    data = request.get_json(silent=True) or {}
+    limits = data.get("limits")
+    if not isinstance(limits, dict) or not limits:
+        return jsonify({"error": "Missing fields: limits"}), 400
+
+    parsed = {str(category).strip(): _parse_limit(value) for category, value in limits.items()}
+    invalid = sorted(category for category, value in parsed.items() if value is None)
+    if invalid:
+        return jsonify({"error": "Invalid limit", "categories": invalid}), 400
+
+    try:
+        updated = update_budget_limits(current_user.id, parsed)
+        return jsonify({
+            "message": "Budgets updated",
+            "updated": sorted(updated),
+            "not_found": sorted(set(parsed) - set(updated)),
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("❌ Error in /budget/categories [PUT]: %s", e)
+        return jsonify({"error": "Failed to update budgets"}), 500
+
+
+@budget_bp.route("/categories/seed", methods=["POST"])
+@token_required
+def seed_budget_categories(current_user):
+    """Create the default categories (zero limits) if the user has no budgets yet."""
+    try:
+        created = seed_default_budgets(current_user.id)
+        return jsonify({"message": "Default budgets created" if created else "Budgets already exist",
+                        "created": created}), 201 if created else 200
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("❌ Error in /budget/categories/seed: %s", e)
+        return jsonify({"error": "Failed to seed budgets"}), 500
+
+
+@budget_bp.route("/categories/<int:budget_id>", methods=["PATCH"])
+@token_required
+def update_budget_category(current_user, budget_id: int):
+    """Change one budget's limit and/or category name."""
+    data = request.get_json(silent=True) or {}
+    budget = db.session.get(Budget, budget_id)
+    if budget is None or budget.user_id != current_user.id:
+        return jsonify({"error": "Budget not found"}), 404
+
+    if "limit" in data:
+        limit = _parse_limit(data["limit"])
+        if limit is None:
+            return jsonify({"error": "Invalid limit"}), 400
+        budget.limit = limit
+    if "category" in data:
+        category = _parse_category(data["category"])
+        if category is None:
+            return jsonify({"error": "Invalid category"}), 400
+        budget.category = category
+
+    try:
+        db.session.commit()
+        return jsonify({"message": "Budget updated", "budget": serialize_budget(budget)}), 200
+
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": f"A budget for {data.get('category')} already exists"}), 409
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("❌ Error in /budget/categories/<id> [PATCH]: %s", e)
+        return jsonify({"error": "Failed to update budget"}), 500
+
+
+@budget_bp.route("/categories/<int:budget_id>", methods=["DELETE"])
+@token_required
+def delete_budget_category(current_user, budget_id: int):
+    """Delete one budget."""
+    budget = db.session.get(Budget, budget_id)
+    if budget is None or budget.user_id != current_user.id:
+        return jsonify({"error": "Budget not found"}), 404
+
+    try:
+        db.session.delete(budget)
+        db.session.commit()
+        return jsonify({"message": "Budget deleted"}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("❌ Error in /budget/categories/<id> [DELETE]: %s", e)
+        return jsonify({"error": "Failed to delete budget"}), 500
+
+
+@budget_bp.route("/categories/report", methods=["GET"])
+@token_required
+@versioned_etag("budget-report", vary=current_month)
+def budget_category_report(current_user):
+    """
+    Spend vs. limit per category for ?month=YYYY-MM (default: the current
+    month), from one joined aggregate over budgets and expense_rollups.
+    Supports If-None-Match.
+    """
+    month = request.args.get("month") or current_month()
+    try:
+        datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        return jsonify({"error": "Invalid month (expected YYYY-MM)"}), 400
+
+    try:
+        # Core execution: plain integer cents, no ORM result handling
+        rows = db.session.connection().execute(budget_report_query(current_user.id, month)).all()
+        return jsonify({"month": month, **build_budget_report(rows)}), 200
+
+    except Exception as e:
+        current_app.logger.exception("❌ Error in /budget/categories/report: %s", e)
+        return jsonify({"error": "Failed to build budget report"}), 500
+
+
+# ================== ALERTS ================== #
+@budget_bp.route("/alerts", methods=["GET"])
+@token_required
+def list_budget_alerts(current_user):
+    """Threshold alerts raised for ?month=YYYY-MM (default: the current month), newest first."""
+    month = request.args.get("month") or current_month()
+    try:
+        datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        return jsonify({"error": "Invalid month (expected YYYY-MM)"}), 400
+
+    try:
+        alerts = (
+            BudgetAlert.query.filter_by(user_id=current_user.id, period=month)
+            .order_by(BudgetAlert.created_at.desc(), BudgetAlert.threshold.desc())
+            .all()
+        )
+        return jsonify({
+            "month": month,
+            "alerts": [
+                {
+                    "category": None if a.category == OVERALL_SCOPE else a.category,
+                    "threshold": a.threshold,
+                    "spent": float(a.spent),
+                    "limit": float(a.limit),
+                    "status": a.status,
+                    "created_at": a.created_at.isoformat(),
+                }
+                for a in alerts
+            ],
+        }), 200
+
+    except Exception as e:
+        current_app.logger.exception("❌ Error in /budget/alerts: %s", e)
+        return jsonify({"error": "Failed to fetch alerts"}), 500
@@ -1,9 +1,23 @@
 from flask import Blueprint, request, jsonify, current_app
-from datetime import datetime
+from datetime import datetime, timedelta
+from decimal import InvalidOperation
+from sqlalchemy import tuple_
+from werkzeug.exceptions import RequestEntityTooLarge
 
 from utils.extensions import db
 from models.expense import Expense
 from utils.decorators import token_required
+from utils.money import to_money
+from utils.expense_stats import score_expense
+from utils.category_model import category_model
+from utils.rollups import DEFAULT_CATEGORY
+from utils.bulk_import import BulkImportError, frame_from_csv, frame_from_json, insert_expenses, validate_frame
+from utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from utils.report_utils import STREAM_FORMATS, stream_report
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_SUGGESTIONS = 10
 
 # ================== Blueprint Setup ================== #
 expense_bp = Blueprint("expenses", __name__)
@@ -14,27 +28,47 @@ expense_bp = Blueprint("expenses", __name__)
 @expense_bp.route("/", methods=["POST"])
 @token_required
 def add_expense(current_user):
-    """Add a new expense for the logged-in user."""
+    """
+    Add a new expense for the logged-in user. When `category` is omitted it
+    is suggested from `description` (falling back to Miscellaneous).
+    """
     data = request.get_json(silent=True) or {}
 
-    # Validate required fields
-    required = ["category", "amount", "expense_date"]
+    # Validate required fields (category is optional when a description is given)
+    required = ["amount", "expense_date"] + ([] if data.get("description") else ["category"])
     missing = [f for f in required if not data.get(f)]
     if missing:
         return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
 
     try:
+        description = str(data.get("description") or "").strip() or None
+        category = str(data.get("category") or "").strip()
+        suggested = not category
+        if suggested:
+            suggestions = category_model.suggest(current_user.id, description, top=1)
+            category = suggestions[0][0] if suggestions else DEFAULT_CATEGORY
+
         expense = Expense(
             user_id=current_user.id,
-            category=data["category"].strip(),
-            amount=float(data["amount"]),
+            category=category,
+            amount=to_money(data["amount"]),
             date=datetime.strptime(data["expense_date"], "%Y-%m-%d"),
+            description=description,
+            # Not a training label: learning from our own guesses would only reinforce them
+            category_suggested=suggested,
         )
+        # Scored against history before this expense is folded into the stats
+        anomaly = score_expense(current_user.id, expense.category, expense.amount, current_app.config)
 
         db.session.add(expense)
         db.session.commit()
 
         current_app.logger.info("✅ Expense added for user %s", current_user.email)
+        if anomaly.is_anomaly:
+            current_app.logger.info(
+                "🚨 Unusual expense for user %s: %s %s %s", current_user.email,
+                expense.category, expense.amount, anomaly.as_dict(),
+            )
         return jsonify({
             "message": "Expense added successfully",
             "expense": {
@@ -42,10 +76,200 @@ def add_expense(current_user):
                 "category": expense.category,
                 "amount": float(expense.amount),
                 "date": expense.date.strftime("%Y-%m-%d"),
-            }
+                "description": expense.description or "",
+            },
+            "category_suggested": suggested,
+            "anomaly": anomaly.as_dict(),
         }), 201
 
     except Exception as e:
         db.session.rollback()
         current_app.logger.exception("❌ Error in /expenses [POST]: %s", e)
         return jsonify({"error": "Failed to add expense"}), 500
+
+
+@expense_bp.route("/suggest-category", methods=["POST"])
+@token_required
+def suggest_category(current_user):
+    """
+    Suggest categories for a description.
+    Body: {"description": "...", "limit": 3}. Uses the shared hashed naive
+    Bayes model (global + the user's own history); no DB access.
+    """
+    data = request.get_json(silent=True) or {}
+    description = str(data.get("description") or "").strip()
+    if not description:
+        return jsonify({"error": "Missing fields: description"}), 400
+    try:
+        limit = min(max(int(data.get("limit", 3)), 1), MAX_SUGGESTIONS)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid limit"}), 400
+
+    try:
+        suggestions = category_model.suggest(current_user.id, description, top=limit)
+        return jsonify({
+            "description": description,
+            "category": suggestions[0][0] if suggestions else None,
+            "suggestions": [
+                {"category": name, "confidence": round(p, 4)} for name, p in suggestions
+            ],
+        }), 200
+
+    except Exception as e:
+        current_app.logger.exception("❌ Error in /expenses/suggest-category [POST]: %s", e)
+        return jsonify({"error": "Failed to suggest a category"}), 500
+
+
+@expense_bp.route("/bulk", methods=["POST"])
+@token_required
+def add_expenses_bulk(current_user):
+    """
+    Import many expenses in one request.
+
+    Body: a JSON array of {category, amount, expense_date, description?}
+    (or {"expenses": [...]}), or a multipart upload field `file` holding a
+    CSV with those columns. Valid rows are inserted in one transaction;
+    invalid rows are reported per row. With ?atomic=true any invalid row
+    rejects the whole batch.
+    """
+    max_rows = int(current_app.config.get("BULK_MAX_ROWS", 10_000))
+    max_bytes = int(current_app.config.get("BULK_MAX_BYTES", 5 * 1024 * 1024))
+    atomic = request.args.get("atomic", "false").lower() in ("1", "true", "yes")
+
+    too_large = jsonify({"error": f"Payload exceeds {max_bytes} bytes"}), 413
+    if request.content_length and request.content_length > max_bytes:
+        return too_large
+    # Chunked bodies have no Content-Length: cap the stream itself. Werkzeug
+    # stops reading at the cap without raising, so allow one byte more and
+    # treat reaching it as too large.
+    request.max_content_length = max_bytes + 1
+
+    try:
+        if request.mimetype == "multipart/form-data":
+            if "file" not in request.files:
+                raise BulkImportError("Expected a CSV upload in field `file`")
+            df = frame_from_csv(request.files["file"].stream)
+        else:
+            if len(request.get_data(cache=True)) > max_bytes:
+                return too_large
+            df = frame_from_json(request.get_json(silent=True))
+    except RequestEntityTooLarge:
+        return too_large
+    except BulkImportError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if df.empty:
+        return jsonify({"error": "No rows to import"}), 400
+    if len(df) > max_rows:
+        return jsonify({"error": f"Too many rows ({len(df)}); limit is {max_rows}"}), 413
+
+    clean, errors = validate_frame(df)
+    if errors and (atomic or clean.empty):
+        return jsonify({"error": "Validation failed", "inserted": 0, "errors": errors}), 400
+
+    try:
+        inserted = insert_expenses(current_user.id, clean)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("❌ Error in /expenses/bulk [POST]: %s", e)
+        return jsonify({"error": "Failed to import expenses"}), 500
+
+    current_app.logger.info(
+        "✅ Bulk import for user %s: %s inserted, %s rejected",
+        current_user.email, inserted, len(errors),
+    )
+    return jsonify({
+        "message": "Expenses imported",
+        "inserted": inserted,
+        "rejected": len(errors),
+        "errors": errors,
+    }), 201
+
+
+@expense_bp.route("/", methods=["GET"])
+@token_required
+def list_expenses(current_user):
+    """
+    List the logged-in user's expenses, newest first, with keyset pagination.
+
+    Query params (all optional):
+      - limit: page size (default 50, max 200)
+      - cursor: `next_cursor` from the previous page
+      - start_date / end_date: YYYY-MM-DD, inclusive
+      - category, min_amount, max_amount
+
+    Seeks on (date, id) via ix_expenses_user_id_date_id, so every page
+    costs the same regardless of depth. Undated expenses are not listed.
+    """
+    args = request.args
+    try:
+        limit = min(max(int(args.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        cursor = decode_cursor(args.get("cursor"))
+        start_date = datetime.strptime(args["start_date"], "%Y-%m-%d") if args.get("start_date") else None
+        end_date = datetime.strptime(args["end_date"], "%Y-%m-%d") if args.get("end_date") else None
+        min_amount = to_money(args["min_amount"]) if args.get("min_amount") else None
+        max_amount = to_money(args["max_amount"]) if args.get("max_amount") else None
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameter: {e}"}), 400
+    except InvalidOperation:  # amount is not a finite number (nan, inf, "abc")
+        return jsonify({"error": "Invalid query parameter: min_amount/max_amount must be finite numbers"}), 400
+
+    try:
+        query = Expense.query.filter(
+            Expense.user_id == current_user.id,
+            Expense.date.isnot(None),
+        )
+        if start_date:
+            query = query.filter(Expense.date >= start_date)
+        if end_date:
+            query = query.filter(Expense.date < end_date + timedelta(days=1))
+        if args.get("category"):
+            query = query.filter(Expense.category == args["category"].strip())
+        if min_amount is not None:
+            query = query.filter(Expense.amount >= min_amount)
+        if max_amount is not None:
+            query = query.filter(Expense.amount <= max_amount)
+        if cursor:
+            query = query.filter(tuple_(Expense.date, Expense.id) < tuple_(*cursor))
+
+        rows = (
+            query.order_by(Expense.date.desc(), Expense.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return jsonify({
+            "expenses": [
+                {
+                    "id": e.id,
+                    "category": e.category,
+                    "amount": float(e.amount),
+                    "description": e.description or "",
+                    "date": e.date.strftime("%Y-%m-%d"),
+                }
+                for e in rows
+            ],
+            "next_cursor": encode_cursor(rows[-1].date, rows[-1].id) if has_more else None,
+            "has_more": has_more,
+        }), 200
+
+    except Exception as e:
+        current_app.logger.exception("❌ Error in /expenses [GET]: %s", e)
+        return jsonify({"error": "Failed to fetch expenses"}), 500
+
+
+@expense_bp.route("/export", methods=["GET"])
+@token_required
+def export_expenses(current_user):
+    """Stream the logged-in user's expenses (?format=csv|ndjson)."""
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in STREAM_FORMATS:
+        return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+
+    current_app.logger.info("📤 Streaming %s export for user %s", fmt, current_user.email)
+    return stream_report(current_user.id, format=fmt)
@@ -1,6 +1,15 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify
 from datetime import datetime
 
+from utils.auth_cache import auth_cache_stats
+from utils.db_engine import pool_stats
+from utils.decorators import diagnostics_required
+from utils.extensions import db
+from utils.instrumentation import render_gauges, render_metrics
+from utils.job_queue import queue_depth
+from utils.passwords import password_hasher
+from utils.response_cache import response_cache
+
 # ================== Blueprint Setup ================== #
 home_bp = Blueprint("home", __name__)
 # ⚠️ No per-blueprint CORS here (handled globally in app.py)
@@ -32,4 +41,66 @@ def health():
         "service": API_NAME,
         "version": API_VERSION,
         "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
-    }), 200
\ No newline at end of file
+    }), 200
+
+
+# ================== Cache Stats ================== #
+@home_bp.route("/health/cache", methods=["GET"])
+@diagnostics_required
+def cache_stats():
+    """Per-worker auth and response cache counters (hits, misses, evictions)."""
+    return jsonify({
+        "auth_cache": auth_cache_stats(),
+        "response_cache": response_cache.stats(),
+    }), 200
+
+
+# ================== Pool Stats ================== #
+@home_bp.route("/health/pool", methods=["GET"])
+@diagnostics_required
+def db_pool_stats():
+    """This worker's DB pool: checked out, overflow and connection wait times."""
+    return jsonify(pool_stats(db.engine)), 200
+
+
+# ================== Prometheus Metrics ================== #
+@home_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """Per-endpoint request histograms plus cache and pool gauges (this worker only) and job queue depth."""
+    auth = auth_cache_stats()
+    cache = response_cache.stats()
+    pool = pool_stats(db.engine)
+
+    extra = []
+    extra += render_gauges(
+        "auth_cache_events", "Auth cache hits/misses since start.",
+        {(("cache", name), ("result", result)): stats[result]
+         for name, stats in auth.items() for result in ("hits", "misses")},
+    )
+    extra += render_gauges(
+        "response_cache_events", "Response cache hits/misses/evictions since start.",
+        {(("result", k),): cache[k] for k in ("hits", "misses", "evictions")},
+    )
+    extra += render_gauges(
+        "response_cache_bytes", "Bytes held by the response cache.", {(): cache.get("bytes", 0)},
+    )
+    extra += render_gauges(
+        "password_hash_in_flight", "Password hash/verify jobs running or queued.",
+        {(): password_hasher.stats()["in_flight"]},
+    )
+    extra += render_gauges(
+        "jobs", "Background jobs by status (whole queue, from the database).",
+        {(("status", k),): v for k, v in queue_depth().items()},
+    )
+    if "checked_out" in pool:
+        extra += render_gauges(
+            "db_pool_connections", "DB pool connections by state.",
+            {(("state", k),): pool[k] for k in ("checked_in", "checked_out", "overflow")},
+        )
+    if "wait" in pool:
+        extra += render_gauges(
+            "db_pool_wait_ms_total", "Total time spent waiting for a DB connection.",
+            {(): pool["wait"]["wait_ms_total"]},
+        )
+
+    return Response(render_metrics(extra), mimetype="text/plain; version=0.0.4")
@@ -4,6 +4,7 @@ from datetime import datetime
 from utils.extensions import db
 from models.salary import Salary
 from utils.decorators import token_required
+from utils.money import to_money
 
 # ================== Blueprint Setup ================== #
 salary_bp = Blueprint("salaries", __name__)
@@ -26,7 +27,7 @@ def add_salary(current_user):
     try:
         salary = Salary(
             user_id=current_user.id,
-            amount=float(data["amount"]),
+            amount=to_money(data["amount"]),
             salary_date=datetime.strptime(data["salary_date"], "%Y-%m-%d"),
         )
 
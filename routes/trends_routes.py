@@ -1,8 +1,17 @@
-from flask import Blueprint, jsonify, current_app
-from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from flask import Blueprint, jsonify, current_app, request
 
-from models.expense import Expense
 from utils.decorators import token_required
+from utils.conditional import versioned_etag
+from utils.expense_frame import ExpenseFrame, latest_expense_day
+from utils.expense_queries import category_totals, monthly_totals
+from utils.forecast import current_month_index, get_user_forecast, month_index, month_label
+
+DEFAULT_ANALYTICS_DAYS = 90
+MAX_ANALYTICS_DAYS = 730
+DEFAULT_ROLLING_WINDOW = 7
+MAX_ROLLING_WINDOW = 90
 
 # ================== Blueprint Setup ================== #
 trends_bp = Blueprint("trends", __name__)
@@ -12,37 +21,114 @@ trends_bp = Blueprint("trends", __name__)
 # ================== ROUTES ================== #
 @trends_bp.route("/", methods=["GET"])
 @token_required
+@versioned_etag("trends")
 def get_expense_trends(current_user):
     """
     Return expense trends for the logged-in user:
       - category_trends: total spent per category
       - monthly_trends: total spent per month (YYYY-MM)
+    Supports If-None-Match (304 when the user's data is unchanged).
     """
     try:
-        # Fetch all expenses for the user
-        expenses = Expense.query.filter_by(user_id=current_user.id).all()
-
-        # Aggregate by category
-        category_totals = defaultdict(float)
-        for exp in expenses:
-            category = exp.category or "Miscellaneous"
-            category_totals[category] += float(exp.amount or 0)
-
-        # Aggregate by month
-        monthly_totals = defaultdict(float)
-        for exp in expenses:
-            if exp.date:
-                month = exp.date.strftime("%Y-%m")
-            else:
-                month = "Unknown"
-            monthly_totals[month] += float(exp.amount or 0)
+        # Both aggregations run as GROUP BY queries (no ORM rows loaded)
+        category_trends = category_totals(current_user.id)
+        monthly_trends = monthly_totals(current_user.id)
 
         return jsonify({
             "email": current_user.email,
-            "category_trends": dict(category_totals),
-            "monthly_trends": dict(monthly_totals),
+            "category_trends": category_trends,
+            "monthly_trends": monthly_trends,
         }), 200
 
     except Exception as e:
         current_app.logger.exception("❌ Error in /trends [GET]: %s", e)
-        return jsonify({"error": "Failed to fetch expense trends"}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to fetch expense trends"}), 500
+
+
+@trends_bp.route("/analytics", methods=["GET"])
+@token_required
+@versioned_etag("trends-analytics")
+def get_expense_analytics(current_user):
+    """
+    Spending patterns over a trailing period, computed on an ExpenseFrame:
+      - weekday_trends / category_trends: totals over the period
+      - daily: per-day total plus a trailing `window`-day average
+    Query: days (default 90), window (default 7), end_date (YYYY-MM-DD,
+    default: the most recent expense). Supports If-None-Match.
+    """
+    args = request.args
+    try:
+        days = min(max(int(args.get("days", DEFAULT_ANALYTICS_DAYS)), 1), MAX_ANALYTICS_DAYS)
+        window = min(max(int(args.get("window", DEFAULT_ROLLING_WINDOW)), 1), MAX_ROLLING_WINDOW)
+        end = datetime.strptime(args["end_date"], "%Y-%m-%d").date() if args.get("end_date") else None
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameter: {e}"}), 400
+
+    try:
+        end = end or latest_expense_day(current_user.id) or datetime.utcnow().date()
+        start = end - timedelta(days=days - 1)
+        # Load window-1 extra days so the first rolling average is complete
+        frame = ExpenseFrame.load(current_user.id, start - timedelta(days=window - 1), end)
+        period = frame.between(start, end)
+
+        totals = frame.daily(start, end)
+        rolling = frame.rolling_sum(start, end, window)
+        first = start.toordinal()
+
+        return jsonify({
+            "email": current_user.email,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "window": window,
+            "total": period.total() / 100,
+            "weekday_trends": {k: v / 100 for k, v in period.by_weekday().items()},
+            "category_trends": {k: v / 100 for k, v in period.by_category().items()},
+            "daily": [
+                {
+                    "date": date.fromordinal(first + i).isoformat(),
+                    "total": t / 100,
+                    "rolling_avg": round(r / window / 100, 2),
+                }
+                for i, (t, r) in enumerate(zip(totals.tolist(), rolling.tolist()))
+            ],
+        }), 200
+
+    except Exception as e:
+        current_app.logger.exception("❌ Error in /trends/analytics [GET]: %s", e)
+        return jsonify({"error": "Failed to compute expense analytics"}), 500
+
+
+@trends_bp.route("/forecast", methods=["GET"])
+@token_required
+def get_spending_forecast(current_user):
+    """
+    Forecast spend per category for `month` (YYYY-MM, default: next month),
+    trained on complete months before min(month, current month). Fitted
+    models are cached per data version, so repeat calls skip the fit.
+    """
+    current = current_month_index()
+    try:
+        month = datetime.strptime(request.args["month"], "%Y-%m") if request.args.get("month") else None
+    except ValueError:
+        return jsonify({"error": "Invalid month (expected YYYY-MM)"}), 400
+    target = month_index(month.strftime("%Y-%m")) if month else current + 1
+
+    try:
+        fitted = get_user_forecast(current_user.id, min(target, current))
+        forecast = fitted.predict(target)
+
+        return jsonify({
+            "email": current_user.email,
+            "month": month_label(target),
+            "trained_through": month_label(fitted.last_month) if fitted.history_months else None,
+            "history_months": fitted.history_months,
+            "total": sum(cents for cents, _ in forecast.values()) / 100,
+            "forecast": {
+                category: {"amount": cents / 100, "model": model}
+                for category, (cents, model) in forecast.items()
+            },
+        }), 200
+
+    except Exception as e:
+        current_app.logger.exception("❌ Error in /trends/forecast [GET]: %s", e)
+        return jsonify({"error": "Failed to compute spending forecast"}), 500
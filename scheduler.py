@@ -0,0 +1,41 @@
+"""
+Standalone scheduler entry point.
+
+Runs the scheduled jobs in a dedicated process instead of inside the
+gunicorn web workers. Set SCHEDULER_MODE=off on the web service, then:
+
+    python scheduler.py
+
+Leader election still applies, so running more than one copy is safe.
+"""
+import os
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from app import create_app
+from config import DevelopmentConfig, TestingConfig, ProductionConfig
+from utils.scheduler_jobs import start_scheduler
+
+
+def main() -> None:
+    env = os.getenv("APP_ENV", "development").lower()
+    config_class = {
+        "production": ProductionConfig,
+        "testing": TestingConfig,
+        "development": DevelopmentConfig,
+    }.get(env, DevelopmentConfig)
+
+    class SchedulerConfig(config_class):
+        SCHEDULER_MODE = "off"  # don't also start the embedded one
+
+    app = create_app(SchedulerConfig)
+    app.logger.info("⏰ Starting standalone scheduler")
+
+    try:
+        start_scheduler(app, BlockingScheduler())
+    except (KeyboardInterrupt, SystemExit):
+        app.logger.info("👋 Scheduler shutting down gracefully...")
+
+
+if __name__ == "__main__":
+    main()
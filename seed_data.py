@@ -2,6 +2,8 @@ from utils.extensions import db
 from models.user import User
 from models.expense import Expense
 from models.salary import Salary
+from utils.rollups import rebuild_rollups
+from utils.data_version import bump_data_versions
 from app import create_app
 from datetime import datetime
 from werkzeug.security import generate_password_hash
@@ -17,7 +19,7 @@ with app.app_context():
     if not user:
         user = User(
             email="testuser@example.com",
-            password=generate_password_hash("Bala123")
+            password_hash=generate_password_hash("Bala123")
         )
         db.session.add(user)
         db.session.commit()
@@ -34,18 +36,18 @@ with app.app_context():
     # ✅ Insert salaries (Jan–Dec 2025)
     if Salary.query.filter_by(user_id=user.id).count() == 0:
         salaries = [
-            Salary(user_id=user.id, amount=5000, received_date=datetime(2025, 1, 1)),
-            Salary(user_id=user.id, amount=5050, received_date=datetime(2025, 2, 1)),
-            Salary(user_id=user.id, amount=5100, received_date=datetime(2025, 3, 1)),
-            Salary(user_id=user.id, amount=5200, received_date=datetime(2025, 4, 1)),
-            Salary(user_id=user.id, amount=5250, received_date=datetime(2025, 5, 1)),
-            Salary(user_id=user.id, amount=5300, received_date=datetime(2025, 6, 1)),
-            Salary(user_id=user.id, amount=5400, received_date=datetime(2025, 7, 1)),
-            Salary(user_id=user.id, amount=5450, received_date=datetime(2025, 8, 1)),
-            Salary(user_id=user.id, amount=5500, received_date=datetime(2025, 9, 1)),
-            Salary(user_id=user.id, amount=5600, received_date=datetime(2025, 10, 1)),
-            Salary(user_id=user.id, amount=5650, received_date=datetime(2025, 11, 1)),
-            Salary(user_id=user.id, amount=5700, received_date=datetime(2025, 12, 1)),
+            Salary(user_id=user.id, amount=5000, salary_date=datetime(2025, 1, 1)),
+            Salary(user_id=user.id, amount=5050, salary_date=datetime(2025, 2, 1)),
+            Salary(user_id=user.id, amount=5100, salary_date=datetime(2025, 3, 1)),
+            Salary(user_id=user.id, amount=5200, salary_date=datetime(2025, 4, 1)),
+            Salary(user_id=user.id, amount=5250, salary_date=datetime(2025, 5, 1)),
+            Salary(user_id=user.id, amount=5300, salary_date=datetime(2025, 6, 1)),
+            Salary(user_id=user.id, amount=5400, salary_date=datetime(2025, 7, 1)),
+            Salary(user_id=user.id, amount=5450, salary_date=datetime(2025, 8, 1)),
+            Salary(user_id=user.id, amount=5500, salary_date=datetime(2025, 9, 1)),
+            Salary(user_id=user.id, amount=5600, salary_date=datetime(2025, 10, 1)),
+            Salary(user_id=user.id, amount=5650, salary_date=datetime(2025, 11, 1)),
+            Salary(user_id=user.id, amount=5700, salary_date=datetime(2025, 12, 1)),
         ]
         db.session.bulk_save_objects(salaries)
         db.session.commit()
@@ -106,4 +108,10 @@ with app.app_context():
         ]
         db.session.bulk_save_objects(expenses)
         db.session.commit()
-        print("✅ Inserted sample expenses for all 12 months.")
\ No newline at end of file
+        print("✅ Inserted sample expenses for all 12 months.")
+
+    # ✅ Bulk writes skip the session hooks: resync rollups and the data version
+    rebuild_rollups(user.id)
+    bump_data_versions(db.session, [user.id])
+    db.session.commit()
+    print("✅ Expense rollups rebuilt.")
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig  # noqa: E402
+
+pytest_plugins = ["utils.pytest_plugin", "pytester"]
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """App factory on a per-test SQLite file; keyword arguments override config."""
+    from app import create_app
+
+    def make(**overrides):
+        class TestConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+            AUTO_CREATE_TABLES = "true"
+            SCHEDULER_MODE = "off"
+            REQUEST_LOG_ENABLED = False
+            SQL_INSPECT_ENABLED = "false"
+            LOG_DIR = str(tmp_path)
+
+        for key, value in overrides.items():
+            setattr(TestConfig, key, value)
+        return create_app(TestConfig)
+
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    user = {"email": "test@example.com", "password": "secret", "salary": 3000, "budget_limit": 1000}
+    client.post("/auth/register", json=user)
+    token = client.post("/auth/login", json=user).get_json()["token"]
+    return {"Authorization": f"Bearer {token}"}
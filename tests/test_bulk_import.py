@@ -0,0 +1,62 @@
+import http.client
+import json
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+MAX_BYTES = 2000
+ROW = {"category": "Food", "amount": 1, "expense_date": "2026-01-01"}
+
+
+@pytest.fixture
+def server(make_app):
+    """The app on a real HTTP server: the test client always sends Content-Length."""
+    app = make_app(BULK_MAX_BYTES=MAX_BYTES)
+    srv = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield app, srv.server_port
+    srv.shutdown()
+
+
+@pytest.fixture
+def token(server):
+    app, _ = server
+    client = app.test_client()
+    user = {"email": "bulk@example.com", "password": "secret"}
+    client.post("/auth/register", json=user)
+    return client.post("/auth/login", json=user).get_json()["token"]
+
+
+def post_chunked(port, token, body: bytes, content_type="application/json"):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    chunks = iter([body[i:i + 500] for i in range(0, len(body), 500)])
+    conn.request("POST", "/expenses/bulk", body=chunks, encode_chunked=True,
+                 headers={"Authorization": f"Bearer {token}", "Content-Type": content_type})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def json_body(size: int) -> bytes:
+    """A JSON array of rows padded with whitespace to exactly `size` bytes."""
+    body = json.dumps([ROW] * 5).encode()
+    return body[:-1] + b" " * (size - len(body)) + b"]"
+
+
+def test_chunked_json_within_the_cap_is_imported(server, token):
+    status, body = post_chunked(server[1], token, json_body(MAX_BYTES))
+    assert status == 201 and body["inserted"] == 5
+
+
+def test_chunked_json_over_the_cap_is_rejected(server, token):
+    status, body = post_chunked(server[1], token, json_body(MAX_BYTES + 1))
+    assert status == 413 and body["error"] == f"Payload exceeds {MAX_BYTES} bytes"
+
+
+def test_chunked_csv_over_the_cap_is_rejected(server, token):
+    csv = b"category,amount,expense_date\n" + b"Food,1,2026-01-01\n" * 200
+    body = (b'--XX\r\nContent-Disposition: form-data; name="file"; filename="a.csv"\r\n'
+            b"Content-Type: text/csv\r\n\r\n" + csv + b"\r\n--XX--\r\n")
+    status, _ = post_chunked(server[1], token, body, "multipart/form-data; boundary=XX")
+    assert status == 413
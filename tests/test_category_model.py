@@ -0,0 +1,20 @@
+from models.expense import Expense
+
+
+def add_expense(client, headers, **fields):
+    body = {"amount": 5, "expense_date": "2026-01-01", **fields}
+    return client.post("/expenses/", headers=headers, json=body).get_json()
+
+
+def test_suggested_categories_are_not_training_labels(app, client, auth_headers):
+    for i in range(4):
+        add_expense(client, auth_headers, category="Food" if i % 2 else "Transport", description=f"item {i}")
+    response = add_expense(client, auth_headers, description="item 1")
+    assert response["category_suggested"] is True
+
+    with app.app_context():
+        flags = [e.category_suggested for e in Expense.query.order_by(Expense.id)]
+    assert flags == [False] * 4 + [True]
+
+    result = app.test_cli_runner().invoke(args=["categories", "train", "--reset"])
+    assert "Trained on 4 expense description(s)" in result.output
@@ -0,0 +1,14 @@
+import numpy as np
+
+from utils.forecast import MIN_SEASONAL_MONTHS, SEASONAL, fit_components
+
+
+def test_seasonal_model_is_chosen_from_24_months():
+    rng = np.random.default_rng(0)
+    months = np.arange(MIN_SEASONAL_MONTHS)
+    series = (1000 + 400 * np.sin(2 * np.pi * months / 12) + rng.normal(0, 10, len(months)))[None, :]
+
+    models, fitted = fit_components(series, first_month=0)
+
+    assert models.tolist() == [SEASONAL]
+    assert np.isfinite(fitted.seasonal).all()
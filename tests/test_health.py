@@ -0,0 +1,16 @@
+import pytest
+
+
+def test_health_is_public(client):
+    assert client.get("/health").status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/health/cache", "/health/pool"])
+def test_diagnostics_are_hidden_by_default(client, path):
+    assert client.get(path).status_code == 404
+
+
+@pytest.mark.parametrize("path", ["/health/cache", "/health/pool"])
+def test_diagnostics_can_be_enabled(make_app, path):
+    client = make_app(DIAGNOSTICS_ENABLED=True).test_client()
+    assert client.get(path).status_code == 200
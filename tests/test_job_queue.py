@@ -0,0 +1,165 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from utils.extensions import db
+from utils.job_queue import (
+    ClaimedJob, Worker, _claim_statement, claim_jobs, enqueue, job, purge_jobs, renew_leases,
+    requeue_expired,
+)
+from models.job import Job
+
+ran = []
+ran_lock = threading.Lock()
+failures = []
+
+
+@job("test.record", timeout=60)
+def record(n):
+    with ran_lock:
+        ran.append(n)
+
+
+@job("test.lease", max_attempts=2, timeout=60)
+def lease():
+    pass
+
+
+@job("test.broken", max_attempts=2, on_failure=lambda tag: failures.append(tag))
+def broken(tag):
+    raise RuntimeError("always fails")
+
+
+@pytest.fixture
+def queue_app(make_app):
+    ran.clear()
+    failures.clear()
+    return make_app(JOB_RETRY_BASE_SECONDS=30, JOB_RETRY_MAX_SECONDS=60, JOB_POLL_INTERVAL=0.01)
+
+
+def get_job(job_id):
+    db.session.expire_all()
+    return db.session.get(Job, job_id)
+
+
+def test_enqueue_with_key_is_idempotent(queue_app):
+    with queue_app.app_context():
+        first = enqueue("test.record", {"n": 1}, key="once")
+        second = enqueue("test.record", {"n": 2}, key="once")
+        db.session.commit()
+
+        assert first is not None and second is None
+        assert db.session.scalar(select(func.count()).select_from(Job)) == 1
+
+
+def test_two_workers_claim_disjoint_jobs(queue_app):
+    with queue_app.app_context():
+        for n in range(40):
+            enqueue("test.record", {"n": n})
+        db.session.commit()
+
+    workers = [Worker(queue_app, concurrency=3) for _ in range(2)]
+    for i, worker in enumerate(workers):
+        worker.worker_id = f"worker-{i}"
+    threads = [threading.Thread(target=worker.run, kwargs={"burst": True}) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert sorted(ran) == list(range(40))  # every job ran exactly once
+    assert sum(worker.counts["done"] for worker in workers) == 40
+    with queue_app.app_context():
+        assert db.session.scalars(select(Job.status).distinct()).all() == ["done"]
+
+
+def test_claim_is_one_statement_with_skip_locked_on_postgres():
+    stmt = _claim_statement("w", 5, ["test.record"], datetime.utcnow())
+    pg = str(stmt.compile(dialect=postgresql.dialect()))
+    lite = str(stmt.compile(dialect=sqlite.dialect()))
+
+    assert "FOR UPDATE SKIP LOCKED" in pg and "RETURNING" in pg
+    # SQLite has no row locks; the database write lock serialises claims instead
+    assert "FOR UPDATE" not in lite and "RETURNING" in lite
+
+
+def test_expired_lease_is_retried_with_backoff_then_failed(queue_app):
+    with queue_app.app_context():
+        job_id = enqueue("test.lease", key="lease")
+        db.session.commit()
+
+        claim_jobs("dead-worker", 1, ["test.lease"])
+        db.session.commit()
+        later = datetime.utcnow() + timedelta(minutes=5)
+        assert requeue_expired(later) == 1
+        db.session.commit()
+
+        requeued = get_job(job_id)
+        assert requeued.status == "queued" and requeued.locked_by is None
+        assert timedelta(seconds=20) <= requeued.run_at - later <= timedelta(seconds=40)  # 30s ±25%
+        assert claim_jobs("other", 1, ["test.lease"]) == []  # not due yet
+
+        requeued.run_at = datetime.utcnow()
+        db.session.commit()
+        assert [c.attempts for c in claim_jobs("dead-worker", 1, ["test.lease"])] == [2]
+        db.session.commit()
+        assert requeue_expired(later) == 1
+        db.session.commit()
+
+        failed = get_job(job_id)
+        assert failed.status == "failed" and failed.finished_at == later
+        assert purge_jobs(later + timedelta(seconds=1)) == 1
+        assert enqueue("test.lease", key="lease") is not None  # key freed
+
+
+def test_renewed_lease_is_not_reclaimed(queue_app):
+    with queue_app.app_context():
+        job_id = enqueue("test.lease")
+        db.session.commit()
+        claimed = claim_jobs("busy-worker", 1, ["test.lease"])
+        db.session.commit()
+
+        # the job is still running when its first lease (60s) would have run out
+        renewal = datetime.utcnow() + timedelta(seconds=50)
+        assert renew_leases("busy-worker", claimed, renewal) == 1
+        assert renew_leases("someone-else", claimed, renewal) == 0
+        db.session.commit()
+
+        assert requeue_expired(datetime.utcnow() + timedelta(seconds=90)) == 0
+        assert claim_jobs("other", 1, ["test.lease"]) == []
+        running = get_job(job_id)
+        assert running.status == "running" and running.locked_by == "busy-worker"
+
+
+def test_on_failure_runs_once_attempts_are_exhausted(queue_app):
+    with queue_app.app_context():
+        queue_app.config["JOB_RETRY_BASE_SECONDS"] = 0
+        job_id = enqueue("test.broken", {"tag": "a"})
+        db.session.commit()
+
+    worker = Worker(queue_app, concurrency=1)
+    for _ in range(2):
+        worker.run(burst=True)
+
+    assert worker.counts["retry"] == 1 and worker.counts["failed"] == 1
+    assert failures == ["a"]
+    with queue_app.app_context():
+        failed = get_job(job_id)
+        assert failed.status == "failed" and failed.attempts == 2
+        assert "always fails" in failed.last_error
+
+
+def test_on_failure_runs_when_the_last_lease_expires(queue_app):
+    with queue_app.app_context():
+        enqueue("test.broken", {"tag": "b"})
+        db.session.execute(db.update(Job).values(max_attempts=1))
+        db.session.commit()
+        assert isinstance(claim_jobs("dead-worker", 1, ["test.broken"])[0], ClaimedJob)
+        db.session.commit()
+
+        assert requeue_expired(datetime.utcnow() + timedelta(hours=1)) == 1
+        db.session.commit()
+    assert failures == ["b"]
@@ -0,0 +1,72 @@
+import pytest
+
+from utils.query_inspector import QueryBudgetExceeded
+
+INNER_CONFTEST = """
+import pytest
+from sqlalchemy import MetaData, Table, Column, Integer, create_engine, text
+
+pytest_plugins = ["utils.pytest_plugin"]
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    for i in range(10):
+        Table(f"t{i}", metadata, Column("id", Integer, primary_key=True))
+    metadata.create_all(engine)
+    yield engine
+    metadata.drop_all(engine)
+"""
+
+
+def test_fixture_records_the_block(client, auth_headers, query_budget):
+    with query_budget(max_queries=10, max_repeats=3) as recorder:
+        response = client.get("/trends/", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert 0 < recorder.count <= 10
+
+
+def test_fixture_raises_when_over_budget(client, auth_headers, query_budget):
+    with pytest.raises(QueryBudgetExceeded, match=r"queries executed \(budget 1\)"):
+        with query_budget(max_queries=1):
+            client.get("/trends/", headers=auth_headers)
+
+
+@pytest.mark.query_budget(max_queries=10, max_repeats=3)
+def test_marker_counts_only_the_test_body(client, auth_headers):
+    # app setup (create_all), register and login run far more than 10 statements
+    assert client.get("/trends/", headers=auth_headers).status_code == 200
+
+
+def test_marker_ignores_fixture_setup_and_teardown(pytester):
+    pytester.makeconftest(INNER_CONFTEST)
+    pytester.makepyfile("""
+        import pytest
+        from sqlalchemy import text
+
+        @pytest.mark.query_budget(max_queries=2)
+        def test_one_query(engine):
+            with engine.connect() as conn:
+                conn.execute(text("select 1"))
+    """)
+    pytester.runpytest().assert_outcomes(passed=1)
+
+
+def test_marker_violation_fails_the_test_not_teardown(pytester):
+    pytester.makeconftest(INNER_CONFTEST)
+    pytester.makepyfile("""
+        import pytest
+        from sqlalchemy import text
+
+        @pytest.mark.query_budget(max_queries=2)
+        def test_three_queries(engine):
+            with engine.connect() as conn:
+                for _ in range(3):
+                    conn.execute(text("select 1"))
+    """)
+    result = pytester.runpytest()
+    result.assert_outcomes(failed=1, errors=0)
+    result.stdout.fnmatch_lines(["*3 queries executed (budget 2)*"])
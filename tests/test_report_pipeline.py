@@ -0,0 +1,70 @@
+import pytest
+
+from models.report_delivery import ReportDelivery
+from utils import report_pipeline
+from utils.report_pipeline import run_monthly_reports
+from utils.smtp_sink import SMTPSink
+
+PERIOD = "2026-01"
+
+
+@pytest.fixture
+def sink():
+    with SMTPSink() as sink:
+        yield sink
+
+
+@pytest.fixture
+def mail_app(make_app, sink):
+    app = make_app(MAIL_SERVER=sink.host, MAIL_PORT=sink.port, MAIL_USE_TLS=False, MAIL_SUPPRESS_SEND=False)
+    client = app.test_client()
+    for i in range(5):
+        user = {"email": f"user{i}@example.com", "password": "secret"}
+        client.post("/auth/register", json=user)
+        if i < 3:  # users 3 and 4 spent nothing in the period
+            token = client.post("/auth/login", json=user).get_json()["token"]
+            client.post("/expenses/", headers={"Authorization": f"Bearer {token}"},
+                        json={"amount": 10 + i, "category": "Food", "expense_date": f"{PERIOD}-15"})
+    return app
+
+
+def statuses(app):
+    with app.app_context():
+        return sorted(d.status for d in ReportDelivery.query.filter_by(period=PERIOD))
+
+
+def test_reports_are_sent_once(mail_app, sink):
+    with mail_app.app_context():
+        assert run_monthly_reports(mail_app, period=PERIOD) == {"sent": 3, "empty": 2, "failed": 0}
+        assert run_monthly_reports(mail_app, period=PERIOD) == {"sent": 0, "empty": 0, "failed": 0}
+
+    assert len(sink.messages) == 3
+    assert sorted(m["To"] for m in sink.messages) == [f"user{i}@example.com" for i in range(3)]
+    assert all(m["Subject"] == "Monthly Report - January 2026" for m in sink.messages)
+    assert statuses(mail_app) == ["empty", "empty", "sent", "sent", "sent"]
+
+
+def test_sent_report_is_not_failed_when_recording_fails(mail_app, sink, monkeypatch):
+    record = report_pipeline._record
+
+    def flaky_record(user_id, period, status, error=None):
+        if status == "sent":
+            raise RuntimeError("database went away")
+        record(user_id, period, status, error)
+
+    monkeypatch.setattr(report_pipeline, "_record", flaky_record)
+    with mail_app.app_context():
+        counts = run_monthly_reports(mail_app, period=PERIOD, smtp_connections=1)
+
+    assert counts == {"sent": 3, "empty": 2, "failed": 0}
+    assert len(sink.messages) == 3
+    assert "failed" not in statuses(mail_app)
+
+
+def test_send_errors_are_recorded_as_failed(mail_app, sink):
+    sink.stop()  # nothing listens any more: every connect fails
+    with mail_app.app_context():
+        counts = run_monthly_reports(mail_app, period=PERIOD)
+
+    assert counts == {"sent": 0, "empty": 2, "failed": 3}
+    assert statuses(mail_app) == ["empty", "empty", "failed", "failed", "failed"]
@@ -0,0 +1,323 @@
+"""
+Optional ASGI serving mode (see asgi.py).
+
+A raw ASGI router answers the polled read endpoints natively with an async
+SQLAlchemy engine:
+
+    GET /health
+    GET /trends/
+    GET /budget/summary/<email>
+
+Everything else (writes, auth, exports, metrics, CORS preflight) falls
+through to the unchanged Flask app via asgiref's WsgiToAsgi. The async
+handlers reproduce the sync contract: same JSON bodies, the same ETag /
+If-None-Match / 304 behaviour and the same shared response cache and
+auth caches, so the two paths can serve the same clients interchangeably.
+
+Requires the optional packages `asgiref`, an ASGI server (uvicorn) and an
+async driver: `aiosqlite` for SQLite, `asyncpg` for PostgreSQL.
+"""
+import asyncio
+import contextvars
+import re
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import jwt
+from flask import Flask
+from sqlalchemy.engine import make_url
+from werkzeug.http import parse_etags
+
+from routes.budget_routes import build_summary
+from routes.home_routes import API_NAME, API_VERSION
+from utils.auth_cache import UserSnapshot, user_cache, user_snapshot_query
+from utils.conditional import build_etag
+from utils.data_version import data_version_query
+from utils.db_engine import _flag
+from utils.decorators import _decode_token
+from utils.expense_queries import category_totals_query, expense_totals_query, monthly_totals_query
+from utils.extensions import db
+from utils.instrumentation import request_duration, requests_total
+from utils.response_cache import response_cache
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+_LIBPQ_ONLY_PARAMS = ("sslmode", "gssencmode", "channel_binding")
+
+
+# ================== Async Engine ================== #
+def async_database_url(sync_url) -> str:
+    """Map the app's sync database URL onto its async driver (aiosqlite / asyncpg)."""
+    url = make_url(sync_url)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver mapping for database backend {backend!r}")
+
+    query = {k: v for k, v in url.query.items() if k not in _LIBPQ_ONLY_PARAMS}
+    if backend == "postgresql" and url.query.get("sslmode") not in (None, "disable"):
+        query["ssl"] = "require"  # asyncpg spells libpq's sslmode=require this way
+    return url.set(drivername=_ASYNC_DRIVERS[backend], query=query).render_as_string(hide_password=False)
+
+
+def build_async_engine_options(config, url: str) -> Dict:
+    """Pool settings mirroring utils.db_engine.build_engine_options for the async engine."""
+    if url.startswith("sqlite"):
+        return {}
+
+    from sqlalchemy.pool import NullPool
+
+    if _flag(config.get("DB_PGBOUNCER", False)):
+        # Transaction pooling breaks asyncpg's prepared statement cache
+        return {"poolclass": NullPool, "connect_args": {"statement_cache_size": 0}}
+
+    options = {
+        "pool_size": int(config.get("DB_POOL_SIZE", 2)),
+        "max_overflow": int(config.get("DB_MAX_OVERFLOW", 3)),
+        "pool_timeout": float(config.get("DB_POOL_TIMEOUT", 10)),
+        "pool_recycle": int(config.get("DB_POOL_RECYCLE", 280)),
+        "pool_pre_ping": _flag(config.get("DB_POOL_PRE_PING", True)),
+    }
+    statement_timeout = int(config.get("DB_STATEMENT_TIMEOUT_MS") or 0)
+    if statement_timeout:
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(statement_timeout)}}
+    return options
+
+
+def create_async_db_engine(app: Flask):
+    """Async engine for the same database the Flask app uses (or ASYNC_DATABASE_URL)."""
+    try:
+        from sqlalchemy.ext.asyncio import create_async_engine
+    except ImportError as e:  # greenlet missing
+        raise RuntimeError("ASGI mode needs SQLAlchemy's asyncio extra (greenlet)") from e
+
+    url = app.config.get("ASYNC_DATABASE_URL")
+    if not url:
+        with app.app_context():
+            url = async_database_url(db.engine.url)  # resolved URL (instance-relative SQLite paths)
+    return create_async_engine(url, **build_async_engine_options(app.config, url))
+
+
+# ================== Request / Response ================== #
+class AsyncRequest:
+    """The parts of an ASGI HTTP scope the read handlers need."""
+
+    def __init__(self, scope: Dict, path_params: Dict[str, str]):
+        self.scope = scope
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.query_string = scope.get("query_string", b"").decode("latin-1")
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        self.path_params = path_params
+
+
+Response = Tuple[int, bytes, List[Tuple[str, str]]]
+
+
+def _json(app: Flask, payload, status: int = 200, headers: Optional[List[Tuple[str, str]]] = None) -> Response:
+    # Same serializer settings as jsonify, so cached bodies match the sync path byte for byte
+    body = app.json.response(payload).get_data()
+    return status, body, [("Content-Type", "application/json")] + (headers or [])
+
+
+# ================== Handlers ================== #
+class ReadHandlers:
+    """Async equivalents of the sync read routes."""
+
+    def __init__(self, app: Flask, engine):
+        self.app = app
+        self.engine = engine
+        self.secret_key = app.config["SECRET_KEY"]
+        self.logger = app.logger.getChild("asgi")
+
+    async def health(self, request: AsyncRequest) -> Response:
+        return _json(self.app, {
+            "status": "healthy",
+            "service": API_NAME,
+            "version": API_VERSION,
+            "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
+        })
+
+    async def trends(self, request: AsyncRequest) -> Response:
+        async def render(conn, user):
+            categories = (await conn.execute(category_totals_query(user.id))).all()
+            months = (await conn.execute(monthly_totals_query(user.id))).all()
+            return {
+                "email": user.email,
+                "category_trends": {name: float(total or 0) for name, total in categories},
+                "monthly_trends": {name: float(total or 0) for name, total in months},
+            }
+
+        return await self._versioned(request, "trends", render, "Failed to fetch expense trends")
+
+    async def budget_summary(self, request: AsyncRequest) -> Response:
+        async def render(conn, user):
+            total, count = (await conn.execute(expense_totals_query(user.id))).one()
+            return {"email": user.email, "summary": build_summary(user, total, int(count))}
+
+        email = request.path_params["email"]
+
+        def authorize(user) -> Optional[Response]:
+            if user.email != email.lower().strip():
+                return _json(self.app, {"error": "Unauthorized access"}, 403)
+            return None
+
+        return await self._versioned(request, "summary", render, "Internal server error", authorize)
+
+    # ---------------- shared plumbing ---------------- #
+    async def _snapshot(self, conn, user_id, refresh: bool = False) -> Optional[UserSnapshot]:
+        snapshot = None if refresh else user_cache.get(user_id)
+        if snapshot is None:
+            row = (await conn.execute(user_snapshot_query(user_id))).first()
+            if row is None:
+                return None
+            snapshot = UserSnapshot(**row._mapping)
+            user_cache.set(user_id, snapshot)
+        return snapshot
+
+    def _claims(self, request: AsyncRequest):
+        """(claims, None) or (None, 401 response) — same messages as token_required."""
+        auth_header = request.headers.get("authorization", "")
+        token = auth_header.split(" ")[1] if auth_header.startswith("Bearer ") else None
+        if not token:
+            return None, _json(self.app, {"error": "Token is missing"}, 401)
+        try:
+            return _decode_token(token, self.secret_key), None
+        except jwt.ExpiredSignatureError:
+            return None, _json(self.app, {"error": "Token has expired"}, 401)
+        except jwt.InvalidTokenError:
+            return None, _json(self.app, {"error": "Invalid token"}, 401)
+
+    async def _versioned(self, request, namespace, render, error_message, authorize=None) -> Response:
+        """token_required + versioned_etag, on one pooled async connection."""
+        claims, failure = self._claims(request)
+        if failure:
+            return failure
+
+        try:
+            async with self.engine.connect() as conn:
+                user = await self._snapshot(conn, claims.get("id", claims.get("user_id")))
+                if not user:
+                    return _json(self.app, {"error": "Invalid token user"}, 401)
+
+                version = (await conn.execute(data_version_query(user.id))).scalar() or 0
+                params = request.path_params
+                etag = build_etag(namespace, user.id, version,
+                                  *[params[k] for k in sorted(params)], request.query_string)
+                headers = [("ETag", f'"{etag}"'), ("Cache-Control", "private, no-cache")]
+
+                if parse_etags(request.headers.get("if-none-match")).contains(etag):
+                    return 304, b"", headers
+                if (cached := response_cache.get(user.id, etag)) is not None:
+                    return 200, cached, [("Content-Type", "application/json")] + headers
+
+                user = await self._snapshot(conn, user.id, refresh=True) or user
+                if authorize and (denied := authorize(user)):
+                    return denied
+                status, body, content_headers = _json(self.app, await render(conn, user))
+                response_cache.set(user.id, etag, body)
+                return status, body, content_headers + headers
+
+        except Exception as e:
+            self.logger.exception("❌ Error in async %s %s: %s", request.method, request.path, e)
+            return _json(self.app, {"error": error_message}, 500)
+
+
+# ================== Router ================== #
+Handler = Callable[[AsyncRequest], Awaitable[Response]]
+
+
+class AsyncRouter:
+    """
+    Raw ASGI app: native async handlers for a few GET routes, everything
+    else delegated to the Flask app through WsgiToAsgi.
+    """
+
+    def __init__(self, app: Flask, engine, fallback):
+        self.app = app
+        self.engine = engine
+        self.fallback = fallback
+        self.allowed_origins = set(app.config.get("CORS_ALLOWED_ORIGINS") or ())
+        handlers = ReadHandlers(app, engine)
+        self.routes: List[Tuple[re.Pattern, str, Handler]] = [
+            (re.compile(r"^/health$"), "/health", handlers.health),
+            (re.compile(r"^/trends/$"), "/trends/", handlers.trends),
+            (re.compile(r"^/budget/summary/(?P<email>[^/]+)$"), "/budget/summary/<email>", handlers.budget_summary),
+        ]
+
+    def match(self, scope) -> Optional[Tuple[str, Handler, Dict[str, str]]]:
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        for pattern, rule, handler in self.routes:
+            found = pattern.match(scope["path"])
+            if found:
+                return rule, handler, found.groupdict()
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+
+        matched = self.match(scope) if scope["type"] == "http" else None
+        if matched is None:
+            # Run the WSGI bridge in a fresh context: uvicorn may start the next
+            # keep-alive request from inside the previous response's send(), which
+            # would otherwise inherit asgiref's already-finished thread executor.
+            task = asyncio.get_running_loop().create_task(
+                self.fallback(scope, receive, send), context=contextvars.Context()
+            )
+            return await task
+
+        rule, handler, params = matched
+        start = time.perf_counter()
+        request = AsyncRequest(scope, params)
+        status, body, headers = await handler(request)
+        headers = headers + self._cors_headers(request)
+
+        elapsed = time.perf_counter() - start
+        request_duration.observe((request.method, rule), elapsed)
+        requests_total.inc((request.method, rule, status))
+        headers.append(("Server-Timing", f"app;dur={elapsed * 1000:.2f}"))
+
+        if scope["method"] == "HEAD":
+            body = b""
+        headers.append(("Content-Length", str(len(body))))
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def _cors_headers(self, request: AsyncRequest) -> List[Tuple[str, str]]:
+        """What flask-cors would add for these simple GETs (preflights go to Flask)."""
+        origin = request.headers.get("origin")
+        if not origin or origin not in self.allowed_origins:
+            return []
+        return [
+            ("Access-Control-Allow-Origin", origin),
+            ("Access-Control-Allow-Credentials", "true"),
+            ("Access-Control-Expose-Headers", "Authorization, Content-Type, ETag, Server-Timing"),
+            ("Vary", "Origin"),
+        ]
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def build_asgi_app(app: Flask) -> AsyncRouter:
+    """Wrap a configured Flask app for ASGI serving (imports optional deps lazily)."""
+    try:
+        from asgiref.wsgi import WsgiToAsgi
+    except ImportError as e:
+        raise RuntimeError("ASGI mode needs the optional 'asgiref' package (pip install asgiref uvicorn)") from e
+
+    engine = create_async_db_engine(app)
+    app.logger.info("⚡ ASGI mode: async read routes on %s", engine.url.render_as_string(hide_password=True))
+    return AsyncRouter(app, engine, WsgiToAsgi(app))
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy import event, select
+
+from utils.extensions import db
+from models.user import User
+
+
+# ================== TTL + LRU Cache ================== #
+class TTLCache:
+    """
+    Small thread-safe LRU cache with per-entry expiry.
+    Per-process only: each gunicorn worker keeps its own copy.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def configure(self, maxsize: int, ttl: float) -> None:
+        with self._lock:
+            self.maxsize, self.ttl = maxsize, ttl
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+# ================== User Snapshot ================== #
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Detached, read-only view of a User row passed to protected routes."""
+    id: int
+    email: str
+    salary: Optional[Decimal]
+    budget_limit: Optional[Decimal]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            salary=user.salary,
+            budget_limit=user.budget_limit,
+        )
+
+
+# ================== Module Caches ================== #
+token_cache = TTLCache()  # token → decoded claims
+user_cache = TTLCache()   # user id → UserSnapshot
+
+
+def configure_auth_cache(app) -> None:
+    """Size both caches from config (AUTH_CACHE_MAX_SIZE / AUTH_CACHE_TTL)."""
+    maxsize = int(app.config.get("AUTH_CACHE_MAX_SIZE", 1024))
+    ttl = float(app.config.get("AUTH_CACHE_TTL", 30))
+    token_cache.configure(maxsize, ttl)
+    user_cache.configure(maxsize, ttl)
+
+
+def user_snapshot_query(user_id: int):
+    """Columns of a UserSnapshot (used by the async read path)."""
+    return select(User.id, User.email, User.salary, User.budget_limit).where(User.id == user_id)
+
+
+def get_user_snapshot(user_id, refresh: bool = False) -> Optional[UserSnapshot]:
+    """Fetch a user snapshot, hitting the DB only on cache miss (or when `refresh`)."""
+    if user_id is None:
+        return None
+
+    snapshot = None if refresh else user_cache.get(user_id)
+    if snapshot is None:
+        user = db.session.get(User, user_id)
+        if not user:
+            return None
+        snapshot = UserSnapshot.from_user(user)
+        user_cache.set(user_id, snapshot)
+    return snapshot
+
+
+def auth_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters for the token and user caches."""
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+
+# ================== Invalidation ================== #
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_user(mapper, connection, target) -> None:
+    """Drop the cached snapshot whenever the user row is written."""
+    user_cache.pop(target.id)
@@ -0,0 +1,241 @@
+"""
+Budget threshold alerts, evaluated on every expense write.
+
+The rollup hook has already folded the write into expense_rollups, so the
+check reads the current month's running totals (one range scan on the
+expense_rollups primary key, joined to budgets and the user's
+budget_limit) and compares them with what this flush added: a threshold
+is crossed when  spent - added < threshold × limit <= spent.  History is
+never re-summed.
+
+Crossed thresholds are inserted into budget_alerts with ON CONFLICT DO
+NOTHING, so each (user, month, category, threshold) alerts once. Only the
+highest new threshold per scope is mailed, and at most
+BUDGET_ALERT_RATE_LIMIT mails go to a user per BUDGET_ALERT_RATE_WINDOW
+seconds; the rest are stored as "suppressed". Each mail is a job
+enqueued in the same transaction (utils/job_queue.py), so requests never
+wait on SMTP and an alert is mailed exactly when its write commits. If
+that job runs out of attempts the alert is marked "failed", which no
+longer counts towards the rate limit.
+
+Only the current (UTC) month is evaluated; back-dated expenses do not alert.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import BigInteger, and_, event, func, select, type_coerce, update
+
+from utils.extensions import db, mail
+from utils.job_queue import enqueue, job
+from utils.money import from_cents, to_cents
+from utils.rollups import bucket_key
+from utils.sql_compat import upsert_dialect
+from models.budget import Budget
+from models.budget_alert import OVERALL_SCOPE, BudgetAlert
+from models.expense import Expense
+from models.expense_rollup import ExpenseRollup
+from models.user import User
+
+ALERT_SENDER = "noreply@budgettracker.com"
+NOTIFIED_STATUSES = ("queued", "sent")  # count towards the rate limit (failed mails do not)
+
+ScopeKey = Tuple[int, str]  # (user_id, category)
+
+
+# ================== Threshold Checks ================== #
+def parse_thresholds(value) -> Tuple[int, ...]:
+    """"80,100" → (80, 100)."""
+    if isinstance(value, str):
+        value = value.split(",")
+    return tuple(sorted({int(v) for v in value if str(v).strip()}))
+
+
+def crossed_thresholds(spent: int, added: Optional[int], limit: Optional[int],
+                       thresholds: Iterable[int]) -> List[int]:
+    """
+    Thresholds (percent of `limit`) that `spent` reaches but `spent - added`
+    did not. With `added` unknown (an edited expense) every reached one counts.
+    """
+    if not limit or limit <= 0:
+        return []
+    before = None if added is None else spent - added
+    return [
+        t for t in thresholds
+        if spent * 100 >= t * limit and (before is None or before * 100 < t * limit)
+    ]
+
+
+def _month_totals_query(user_id: int, month: str):
+    """(category, spent cents, budget limit cents, user budget_limit cents) for one month."""
+    user_limit = select(type_coerce(User.budget_limit, BigInteger)).where(User.id == user_id).scalar_subquery()
+    return (
+        select(
+            ExpenseRollup.category,
+            type_coerce(ExpenseRollup.total_amount, BigInteger),
+            type_coerce(Budget.limit, BigInteger),
+            user_limit,
+        )
+        .select_from(ExpenseRollup)
+        .outerjoin(Budget, and_(Budget.user_id == ExpenseRollup.user_id, Budget.category == ExpenseRollup.category))
+        .where(ExpenseRollup.user_id == user_id, ExpenseRollup.year_month == month)
+    )
+
+
+# ================== Evaluation ================== #
+def evaluate_alerts(connection, month: str, added: Dict[ScopeKey, int],
+                    edited: Iterable[ScopeKey] = (), config=None) -> List[int]:
+    """
+    Record crossed thresholds for the given month and return the ids of
+    alerts that should be mailed. `added` maps (user, category) → cents
+    inserted by this write; `edited` buckets changed in place. Runs inside
+    the writing transaction, after expense_rollups has been updated.
+    """
+    config = config if config is not None else current_app.config
+    thresholds = parse_thresholds(config.get("BUDGET_ALERT_THRESHOLDS", "80,100"))
+    if not thresholds:
+        return []
+
+    by_user: Dict[int, Dict[str, Optional[int]]] = defaultdict(dict)
+    for (user_id, category), cents in added.items():
+        by_user[user_id][category] = cents
+    for user_id, category in edited:
+        by_user[user_id][category] = None  # prior total unknown
+
+    queued = []
+    for user_id, changes in by_user.items():
+        rows = connection.execute(_month_totals_query(user_id, month)).all()
+        if not rows:
+            continue
+        spent = {category: int(total or 0) for category, total, _, _ in rows}
+        limits = {category: limit for category, _, limit, _ in rows}
+        overall_added = None if None in changes.values() else sum(changes.values())
+
+        candidates = [(OVERALL_SCOPE, sum(spent.values()), overall_added, rows[0][3])]
+        candidates += [(c, spent.get(c, 0), changes[c], limits.get(c)) for c in changes]
+        crossed = [
+            (scope, total, limit, hits) for scope, total, change, limit in candidates
+            if (hits := crossed_thresholds(total, change, limit, thresholds))
+        ]
+        if crossed:
+            queued += _record_alerts(connection, user_id, month, crossed, config)
+    return queued
+
+
+def _record_alerts(connection, user_id: int, month: str, crossed, config) -> List[int]:
+    """Insert crossed thresholds (dedup) and decide which ones get mailed (rate limit)."""
+    now = datetime.utcnow()
+    window = timedelta(seconds=float(config.get("BUDGET_ALERT_RATE_WINDOW", 3600)))
+    recent = connection.execute(
+        select(func.count()).select_from(BudgetAlert).where(
+            BudgetAlert.user_id == user_id,
+            BudgetAlert.status.in_(NOTIFIED_STATUSES),
+            BudgetAlert.created_at >= now - window,
+        )
+    ).scalar()
+    allowance = int(config.get("BUDGET_ALERT_RATE_LIMIT", 3)) - int(recent or 0)
+
+    insert, _, _ = upsert_dialect(connection)
+    queued = []
+    for scope, spent, limit, hits in crossed:
+        # Highest first: lower thresholds crossed by the same write are only recorded
+        for rank, threshold in enumerate(sorted(hits, reverse=True)):
+            notify = rank == 0 and allowance > 0
+            stmt = insert(BudgetAlert).values(
+                user_id=user_id, period=month, category=scope, threshold=threshold,
+                spent=from_cents(spent), limit=from_cents(limit),
+                status="queued" if notify else "suppressed", created_at=now,
+            ).on_conflict_do_nothing(
+                index_elements=["user_id", "period", "category", "threshold"],
+            ).returning(BudgetAlert.id)
+            alert_id = connection.execute(stmt).scalar()
+            if alert_id is not None and notify:
+                queued.append(alert_id)
+                allowance -= 1
+    return queued
+
+
+# ================== Delivery ================== #
+def build_alert_message(alert: BudgetAlert, email: str) -> Message:
+    label = datetime.strptime(alert.period, "%Y-%m").strftime("%B %Y")
+    scope = "overall" if alert.category == OVERALL_SCOPE else alert.category
+    percent = round(100 * alert.spent / alert.limit) if alert.limit else 0
+    msg = Message(
+        subject=f"Budget alert: {scope} spending at {alert.threshold}% of your limit",
+        sender=ALERT_SENDER,
+        recipients=[email],
+    )
+    msg.body = (
+        f"Hello {email},\n\n"
+        f"You have spent {alert.spent:.2f} of your {alert.limit:.2f} {scope} budget "
+        f"for {label} ({percent}%).\n\n"
+        f"- Budget Tracker Team"
+    )
+    return msg
+
+
+def mark_alert_failed(alert_id: int) -> None:
+    """on_failure hook: the mail job ran out of attempts, so the alert is no longer pending."""
+    db.session.execute(
+        update(BudgetAlert)
+        .where(BudgetAlert.id == alert_id, BudgetAlert.status == "queued")
+        .values(status="failed")
+        .execution_options(synchronize_session=False)
+    )
+
+
+@job("budget_alerts.send", timeout=60, on_failure=mark_alert_failed)
+def deliver_alert(alert_id: int) -> str:
+    """Mail one queued alert (a job; SMTP errors propagate so the queue retries)."""
+    alert = db.session.get(BudgetAlert, alert_id)
+    if alert is None or alert.status != "queued":
+        return alert.status if alert else "missing"
+    email = db.session.execute(select(User.email).where(User.id == alert.user_id)).scalar()
+    mail.send(build_alert_message(alert, email))
+    alert.status, alert.sent_at = "sent", datetime.utcnow()
+    return alert.status
+
+
+# ================== Session Hooks ================== #
+def current_month() -> str:
+    return datetime.utcnow().strftime("%Y-%m")
+
+
+def queue_alerts(session, alert_ids: Iterable[int]) -> None:
+    """Enqueue a mail job per alert in the writing transaction (sent only if it commits)."""
+    for alert_id in alert_ids:
+        enqueue("budget_alerts.send", {"alert_id": alert_id}, session=session)
+
+
+def _after_flush(session, flush_context) -> None:
+    """Evaluate thresholds for current-month expense inserts and edits (after the rollup hook)."""
+    month = current_month()
+    added: Dict[ScopeKey, int] = defaultdict(int)
+    edited = set()
+
+    for obj in session.new:
+        if isinstance(obj, Expense) and obj.amount is not None:
+            user_id, bucket_month, category = bucket_key(obj.user_id, obj.date, obj.category)
+            if bucket_month == month:
+                added[(user_id, category)] += to_cents(obj.amount)
+
+    for obj in session.dirty:
+        if isinstance(obj, Expense) and session.is_modified(obj, include_collections=False):
+            user_id, bucket_month, category = bucket_key(obj.user_id, obj.date, obj.category)
+            if bucket_month == month:
+                edited.add((user_id, category))
+
+    edited -= set(added)
+    if added or edited:
+        queue_alerts(session, evaluate_alerts(session.connection(), month, added, edited))
+
+
+def configure_budget_alerts(app) -> None:
+    """
+    Start evaluating alerts on expense writes. Register after the rollup
+    listeners: the check reads the totals they have just updated.
+    """
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
@@ -0,0 +1,132 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+
+from utils.extensions import db
+from utils.rollups import apply_rollup_deltas
+from utils.data_version import bump_data_versions
+from utils.money import cents_array, from_cents, to_cents
+from utils.expense_stats import apply_stat_deltas
+from utils.category_model import queue_examples
+from utils.budget_alerts import current_month, evaluate_alerts, queue_alerts
+from models.expense import Expense
+
+BULK_COLUMNS = ["category", "amount", "expense_date", "description"]
+MAX_AMOUNT = 10 ** 13  # keeps cents (and their sums) well inside int64
+
+
+class BulkImportError(ValueError):
+    """Raised when a bulk payload cannot be parsed at all."""
+
+
+# ================== Parsing ================== #
+def frame_from_json(payload) -> pd.DataFrame:
+    """Accept a JSON array of rows, or {"expenses": [...]}."""
+    if isinstance(payload, dict):
+        payload = payload.get("expenses")
+    if not isinstance(payload, list) or not all(isinstance(r, dict) for r in payload):
+        raise BulkImportError("Expected a JSON array of expense objects")
+    return pd.DataFrame.from_records(payload, columns=BULK_COLUMNS)
+
+
+def frame_from_csv(stream) -> pd.DataFrame:
+    """Parse an uploaded CSV with a header row (extra columns are ignored)."""
+    try:
+        df = pd.read_csv(stream, dtype=str, keep_default_na=False)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise BulkImportError(f"Unreadable CSV: {e}") from e
+    return df.reindex(columns=BULK_COLUMNS)
+
+
+# ================== Validation ================== #
+def validate_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict]]:
+    """
+    Column-wise validation of every row at once.
+    Returns (clean rows, [{"row": i, "errors": [...]}, ...]) with 0-based row numbers.
+    """
+    category = df["category"].fillna("").astype(str).str.strip()
+    description = df["description"].fillna("").astype(str).str.strip()
+    amount = pd.to_numeric(df["amount"], errors="coerce")
+    date = pd.to_datetime(df["expense_date"].astype(str), format="%Y-%m-%d", errors="coerce")
+
+    checks = [
+        (category.eq(""), "Missing category"),
+        (category.str.len().gt(100), "category longer than 100 characters"),
+        (amount.isna() | ~np.isfinite(amount), "Invalid amount"),
+        (amount.abs().ge(MAX_AMOUNT), "amount out of range"),
+        (date.isna(), "Invalid expense_date (expected YYYY-MM-DD)"),
+        (description.str.len().gt(255), "description longer than 255 characters"),
+    ]
+
+    bad = np.zeros(len(df), dtype=bool)
+    for mask, _ in checks:
+        bad |= mask.to_numpy()
+
+    errors = [
+        {"row": int(i), "errors": [msg for mask, msg in checks if mask.iat[i]]}
+        for i in np.flatnonzero(bad)
+    ]
+
+    clean = pd.DataFrame({
+        "category": category,
+        "amount": amount,
+        "date": date,
+        "description": description,
+    })[~bad]
+    return clean, errors
+
+
+# ================== Insert ================== #
+def insert_expenses(user_id: int, clean: pd.DataFrame) -> int:
+    """
+    Insert validated rows with a single executemany, fold them into
+    expense_rollups and category_stats, check budget alert thresholds and
+    bump the user's data version, all in the same transaction. Caller
+    commits. Amounts are converted to int64 cents once, so the per-bucket
+    sums below are exact.
+    """
+    if clean.empty:
+        return 0
+
+    dates = clean["date"].array.to_pydatetime()
+    cents = cents_array(clean["amount"])
+    amounts = [from_cents(c) for c in cents.tolist()]
+    categories = clean["category"].tolist()
+    descriptions = clean["description"].tolist()
+
+    rows = [
+        {"user_id": user_id, "amount": a, "category": c, "date": d, "description": desc or None}
+        for a, c, d, desc in zip(amounts, categories, dates, descriptions)
+    ]
+    db.session.execute(insert(Expense), rows)
+
+    grouped = pd.Series(cents, index=clean.index).groupby(
+        [clean["date"].dt.strftime("%Y-%m"), clean["category"]]
+    )
+    deltas = {
+        (user_id, month, category): [from_cents(total), int(count), from_cents(low), from_cents(high)]
+        for (month, category), total, count, low, high in grouped.agg(
+            ["sum", "count", "min", "max"]
+        ).itertuples()
+    }
+    apply_rollup_deltas(db.session.connection(), deltas)
+    month = current_month()
+    queue_alerts(db.session, evaluate_alerts(db.session.connection(), month, {
+        (user_id, category): to_cents(total)
+        for (_, bucket_month, category), (total, _, _, _) in deltas.items() if bucket_month == month
+    }))
+
+    # Batch moments per category for the anomaly statistics (M2 = n·population variance)
+    moments = pd.Series(cents, index=clean.index, dtype="float64").groupby(clean["category"]).agg(["count", "mean", "var"])
+    apply_stat_deltas(db.session.connection(), {
+        (user_id, category): (int(count), float(mean), float(var) * (count - 1) if count > 1 else 0.0)
+        for category, count, mean, var in moments.itertuples()
+    })
+    bump_data_versions(db.session, [user_id])
+    queue_examples(db.session, [
+        (user_id, desc, c) for c, desc in zip(categories, descriptions) if desc
+    ])
+
+    return len(rows)
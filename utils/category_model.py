@@ -0,0 +1,334 @@
+"""
+Category suggestions from expense descriptions.
+
+A multinomial naive Bayes over hashed features: word unigrams, bigrams
+and character trigrams of the lower-cased description. Each training
+example adds counts twice, once under global features and once under the
+same features keyed by user id (the feature-hashing trick for
+personalisation), so a single count matrix holds the global model and
+every user's model:
+
+    counts[feature, category]   float32, FEATURES rows + 2 total rows
+    counts[-2, category]        global feature total per category
+    counts[-1, category]        global document count per category
+
+A user's own feature/document totals are hashed rows like any other
+feature. Suggestions add the user's naive Bayes log-posterior to the
+global one once the user has labelled history.
+
+The matrix lives in a .npy file opened with np.load(mmap_mode="r+"), so
+every gunicorn worker maps the same pages (MAP_SHARED) without loading or
+retraining anything; writes from incremental training are visible to the
+other workers immediately. Category names (column slots) are kept in a
+JSON sidecar. Writers serialise on a lock file: flock() on POSIX,
+msvcrt.locking() on Windows.
+
+CATEGORY_MODEL_PATH=":memory:" keeps a private in-process matrix (tests).
+"""
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import event
+
+from utils.extensions import db
+from models.expense import Expense
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_WORD = re.compile(r"[a-z0-9]+")
+MAX_WORDS = 32
+ALPHA = 0.1            # Laplace smoothing
+PERSONAL_WEIGHT = 1.0  # weight of the per-user term relative to the global one
+FLUSH_INTERVAL = 5.0   # seconds between msync()s of the mapped counts
+
+Example = Tuple[int, str, str]  # (user_id, description, category)
+
+
+# ================== File Lock ================== #
+def _lock_file(handle) -> None:
+    """Block until this process holds an exclusive lock on `handle`."""
+    if fcntl is not None:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        return
+    handle.seek(0)
+    while True:
+        try:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)  # retries for ~10s, then raises
+            return
+        except OSError:
+            continue
+
+
+def _unlock_file(handle) -> None:
+    if fcntl is not None:
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        return
+    handle.seek(0)
+    msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# ================== Features ================== #
+def tokens(text: str) -> List[str]:
+    """Word unigrams, bigrams and boundary-marked character trigrams."""
+    words = _WORD.findall((text or "").lower())[:MAX_WORDS]
+    grams = list(words)
+    grams += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        grams += [f"#{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return grams
+
+
+def _bucket(key: str, features: int) -> int:
+    # crc32 is stable across processes (str hash() is salted per interpreter)
+    return zlib.crc32(key.encode("utf-8")) % features
+
+
+def feature_rows(user_id: Optional[int], text: str, features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(global rows, personal rows) for a description."""
+    grams = tokens(text)
+    shared = np.fromiter((_bucket(g, features) for g in grams), dtype=np.int64, count=len(grams))
+    if user_id is None:
+        return shared, np.empty(0, dtype=np.int64)
+    personal = np.fromiter((_bucket(f"{user_id}\x1f{g}", features) for g in grams), dtype=np.int64, count=len(grams))
+    return shared, personal
+
+
+def personal_total_rows(user_id: int, features: int) -> Tuple[int, int]:
+    """Hashed rows holding a user's (feature total, document count) per category."""
+    return _bucket(f"{user_id}\x1f\x00total", features), _bucket(f"{user_id}\x1f\x00docs", features)
+
+
+# ================== Model ================== #
+class CategoryModel:
+    """Hashed naive Bayes shared between processes through a memory-mapped file."""
+
+    def __init__(self):
+        self.path: Optional[str] = None  # None / ":memory:" → in-process only
+        self.features = 2 ** 17
+        self.max_categories = 32
+        self._counts: Optional[np.ndarray] = None
+        self._pid: Optional[int] = None
+        self._categories: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._meta_mtime = 0.0
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, path: Optional[str], features: int, max_categories: int) -> None:
+        with self._lock:
+            self.path = None if path in (None, "", ":memory:") else path
+            self.features = int(features)
+            self.max_categories = int(max_categories)
+            self._counts, self._pid = None, None
+            self._categories, self._slots, self._meta_mtime = [], {}, 0.0
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.splitext(self.path)[0] + ".json"
+
+    # ---------- storage ----------
+    def _matrix(self) -> np.ndarray:
+        """The count matrix, (re)mapped lazily in each process."""
+        if self._counts is not None and self._pid == os.getpid():
+            return self._counts
+        shape = (self.features + 2, self.max_categories)
+        if self.path is None:
+            self._counts = np.zeros(shape, dtype=np.float32)
+        else:
+            with self._file_lock():
+                if not os.path.exists(self.path):
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    np.lib.format.open_memmap(self.path, mode="w+", dtype=np.float32, shape=shape).flush()
+                    self._write_meta([])
+            counts = np.load(self.path, mmap_mode="r+")
+            if counts.shape != shape:
+                raise ValueError(
+                    f"{self.path} has shape {counts.shape}, expected {shape}; "
+                    "retrain with `flask categories train --reset`"
+                )
+            self._counts = counts
+            self._reload_meta(force=True)
+        self._pid = os.getpid()
+        return self._counts
+
+    @contextmanager
+    def _file_lock(self):
+        if self.path is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".lock", "w") as handle:
+            _lock_file(handle)
+            try:
+                yield
+            finally:
+                _unlock_file(handle)
+
+    def _write_meta(self, categories: Sequence[str]) -> None:
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"features": self.features, "categories": list(categories)}, f)
+        os.replace(tmp, self._meta_path)
+
+    def _reload_meta(self, force: bool = False) -> None:
+        """Pick up category slots added by other workers (one stat() per call)."""
+        if self.path is None:
+            return
+        try:
+            mtime = os.stat(self._meta_path).st_mtime
+        except FileNotFoundError:
+            return
+        if force or mtime != self._meta_mtime:
+            with open(self._meta_path) as f:
+                self._categories = json.load(f)["categories"]
+            self._slots = {name: i for i, name in enumerate(self._categories)}
+            self._meta_mtime = mtime
+
+    def _slot(self, category: str) -> Optional[int]:
+        """Column for a category, allocating one (under the file lock) if needed."""
+        if category in self._slots:
+            return self._slots[category]
+        self._reload_meta(force=True)
+        if category not in self._slots and len(self._categories) < self.max_categories:
+            self._categories.append(category)
+            self._slots[category] = len(self._categories) - 1
+            if self.path is not None:
+                self._write_meta(self._categories)
+                self._meta_mtime = os.stat(self._meta_path).st_mtime
+        return self._slots.get(category)
+
+    # ---------- training ----------
+    def learn_many(self, examples: Iterable[Example]) -> int:
+        """Add (user_id, description, category) examples; returns how many were used."""
+        used = 0
+        counts = self._matrix()
+        with self._lock, self._file_lock():
+            for user_id, description, category in examples:
+                if not description or not category:
+                    continue
+                slot = self._slot(category)
+                if slot is None:
+                    continue  # category table full
+                shared, personal = feature_rows(user_id, description, self.features)
+                if not len(shared):
+                    continue
+                np.add.at(counts, (shared, slot), 1.0)
+                counts[-2, slot] += len(shared)
+                counts[-1, slot] += 1
+                np.add.at(counts, (personal, slot), 1.0)
+                if user_id is not None:
+                    total_row, docs_row = personal_total_rows(user_id, self.features)
+                    counts[total_row, slot] += len(personal)
+                    counts[docs_row, slot] += 1
+                used += 1
+            if used and self.path is not None and time.monotonic() - self._last_flush > FLUSH_INTERVAL:
+                counts.flush()
+                self._last_flush = time.monotonic()
+        return used
+
+    def reset(self) -> None:
+        counts = self._matrix()
+        with self._lock, self._file_lock():
+            counts[:] = 0
+            self._categories, self._slots = [], {}
+            if self.path is not None:
+                counts.flush()
+                self._write_meta([])
+
+    def flush(self) -> None:
+        if self._counts is not None and self.path is not None and self._pid == os.getpid():
+            self._counts.flush()
+
+    # ---------- inference ----------
+    def suggest(self, user_id: Optional[int], description: str, top: int = 3) -> List[Tuple[str, float]]:
+        """Most likely categories with posterior probabilities (empty when nothing is known)."""
+        counts = self._matrix()
+        self._reload_meta()
+        classes = len(self._categories)
+        shared, personal = feature_rows(user_id, description, self.features)
+        if not classes or not len(shared):
+            return []
+
+        docs = counts[-1, :classes]
+        if not docs.any():
+            return []
+        scores = self._log_posterior(counts[shared, :classes], counts[-2, :classes], docs)
+
+        if user_id is not None:
+            total_row, docs_row = personal_total_rows(user_id, self.features)
+            personal_docs = counts[docs_row, :classes]
+            if personal_docs.any():
+                scores += PERSONAL_WEIGHT * self._log_posterior(
+                    counts[personal, :classes], counts[total_row, :classes], personal_docs)
+
+        probabilities = np.exp(scores - scores.max())
+        probabilities /= probabilities.sum()
+        order = np.argsort(-probabilities)[:top]
+        return [(self._categories[i], float(probabilities[i])) for i in order]
+
+    def _log_posterior(self, feature_counts, feature_totals, doc_counts) -> np.ndarray:
+        """
+        Multinomial NB log-posterior per category, with the likelihood
+        averaged per feature: overlapping n-grams are far from independent,
+        and summing them makes every answer look ~100% certain.
+        """
+        likelihood = np.log(feature_counts.astype(np.float64) + ALPHA).mean(axis=0)
+        likelihood -= np.log(feature_totals.astype(np.float64) + ALPHA * self.features)
+        return np.log(doc_counts.astype(np.float64) + ALPHA) + likelihood
+
+
+category_model = CategoryModel()
+
+
+# ================== Incremental Training ================== #
+def queue_examples(session, examples: Iterable[Example]) -> None:
+    """Remember examples written in this transaction; they are learned on commit."""
+    session.info.setdefault("category_examples", []).extend(examples)
+
+
+def _after_flush(session, flush_context) -> None:
+    queue_examples(session, [
+        (obj.user_id, obj.description, obj.category)
+        for obj in session.new
+        if isinstance(obj, Expense) and obj.description and not obj.category_suggested
+    ])
+
+
+def _after_commit(session) -> None:
+    examples = session.info.pop("category_examples", None)
+    if examples:
+        try:
+            category_model.learn_many(examples)
+        except Exception as e:  # training must never fail a committed write
+            current_app.logger.warning("⚠️ Category model update failed: %s", e)
+
+
+def _after_rollback(session) -> None:
+    session.info.pop("category_examples", None)
+
+
+def configure_category_model(app) -> None:
+    """Point the shared model at CATEGORY_MODEL_PATH and learn from committed expenses."""
+    path = app.config.get("CATEGORY_MODEL_PATH") or os.path.join(app.instance_path, "category_model.npy")
+    category_model.configure(
+        path,
+        features=int(app.config.get("CATEGORY_MODEL_FEATURES", 2 ** 17)),
+        max_categories=int(app.config.get("CATEGORY_MODEL_MAX_CATEGORIES", 32)),
+    )
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
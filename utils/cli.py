@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+
+import click
+import numpy as np
+from flask import Flask, current_app
+from flask.cli import AppGroup
+from sqlalchemy import select
+
+from utils.extensions import db
+from models.expense import Expense
+from utils.rollups import rebuild_rollups
+from utils.report_pipeline import run_monthly_reports
+from utils.expense_stats import rescore_expenses
+from utils.category_model import category_model
+from utils.job_queue import Worker, enqueue, job_stats, purge_jobs, queue_depth
+
+# ================== Command Groups ================== #
+rollups_cli = AppGroup("rollups", help="Maintain the expense_rollups table.")
+reports_cli = AppGroup("reports", help="Monthly email reports.")
+anomalies_cli = AppGroup("anomalies", help="Per-category expense statistics and anomaly scores.")
+categories_cli = AppGroup("categories", help="Category suggestion model.")
+jobs_cli = AppGroup("jobs", help="Durable background job queue.")
+
+
+@rollups_cli.command("rebuild")
+@click.option("--user-id", type=int, default=None, help="Only rebuild this user's buckets.")
+def rebuild_rollups_command(user_id):
+    """Backfill expense_rollups from existing expenses."""
+    buckets = rebuild_rollups(user_id)
+    db.session.commit()
+    click.echo(f"✅ Rebuilt {buckets} rollup bucket(s)")
+
+
+@reports_cli.command("send-monthly")
+@click.option("--period", default=None, help="Month to report on (YYYY-MM); defaults to last month.")
+@click.option("--user-id", "user_ids", type=int, multiple=True, help="Restrict to these users.")
+@click.option("--enqueue", "queued", is_flag=True, help="Hand the run to the job workers instead of running it here.")
+def send_monthly_reports_command(period, user_ids, queued):
+    """Run (or resume) the monthly report pipeline."""
+    if queued:
+        job_id = enqueue("reports.monthly", {"period": period, "user_ids": list(user_ids) or None})
+        db.session.commit()
+        click.echo(f"✅ Queued job {job_id}")
+        return
+
+    counts = run_monthly_reports(
+        current_app._get_current_object(), period=period, user_ids=list(user_ids) or None
+    )
+    click.echo(f"✅ Reports sent={counts['sent']} empty={counts['empty']} failed={counts['failed']}")
+
+
+@anomalies_cli.command("rescore")
+@click.option("--user-id", type=int, default=None, help="Only rescore this user's expenses.")
+@click.option("--show", type=int, default=10, help="List this many of the most extreme flagged expenses.")
+def rescore_anomalies_command(user_id, show):
+    """Rebuild category_stats (moments, median, MAD) and rescore every expense."""
+    config = current_app.config
+    result = rescore_expenses(
+        user_id,
+        z_threshold=config["ANOMALY_Z_THRESHOLD"],
+        mad_threshold=config["ANOMALY_MAD_THRESHOLD"],
+        min_history=config["ANOMALY_MIN_HISTORY"],
+    )
+    db.session.commit()
+    click.echo(f"✅ Rescored {len(result.expense_ids)} expense(s) in {result.buckets} bucket(s); "
+               f"{int(result.flagged.sum())} flagged")
+
+    flagged = result.flagged.nonzero()[0]
+    extremity = np.fmax(np.abs(result.z_scores[flagged]), np.abs(result.robust_z[flagged]))
+    for i in flagged[np.argsort(-extremity)][:show]:
+        click.echo(f"  expense {result.expense_ids[i]}: z={result.z_scores[i]:.2f} robust z={result.robust_z[i]:.2f}")
+
+
+@categories_cli.command("train")
+@click.option("--reset", is_flag=True, help="Zero the model first (otherwise examples are added on top).")
+@click.option("--batch-size", type=int, default=5000, show_default=True)
+def train_categories_command(reset, batch_size):
+    """Train the suggestion model from existing (description, category) pairs."""
+    if reset:
+        category_model.reset()
+    stmt = (
+        select(Expense.user_id, Expense.description, Expense.category)
+        .where(
+            Expense.description.is_not(None),
+            Expense.description != "",
+            Expense.category_suggested.is_(False),  # user-supplied labels only
+        )
+        .execution_options(yield_per=batch_size)
+    )
+    learned = 0
+    for batch in db.session.execute(stmt).partitions():
+        learned += category_model.learn_many(batch)
+    category_model.flush()
+    click.echo(f"✅ Trained on {learned} expense description(s)")
+
+
+@jobs_cli.command("work")
+@click.option("--concurrency", type=int, default=None, help="Threads (defaults to JOB_WORKER_CONCURRENCY).")
+@click.option("--job", "names", multiple=True, help="Only run these job names.")
+@click.option("--burst", is_flag=True, help="Exit once no job is due instead of polling forever.")
+def work_jobs_command(concurrency, names, burst):
+    """Run a job worker in this process (see also `python worker.py`)."""
+    counts = Worker(current_app._get_current_object(), concurrency=concurrency, names=names or None).run(burst=burst)
+    click.echo("✅ " + " ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+@jobs_cli.command("stats")
+@click.option("--hours", type=float, default=24, show_default=True, help="Window of finished jobs to summarise.")
+def job_stats_command(hours):
+    """Queue depth, plus outcome counts and wait/run times per job name."""
+    depth = queue_depth()
+    click.echo("Queue: " + (", ".join(f"{k}={v}" for k, v in sorted(depth.items())) or "empty"))
+    for row in job_stats(datetime.utcnow() - timedelta(hours=hours)):
+        click.echo(
+            f"  {row['name']:<22} {row['status']:<7} n={row['count']:<6} attempts={row['attempts']:<6} "
+            f"wait avg={row['avg_wait_ms'] or 0:.0f}ms max={row['max_wait_ms'] or 0:.0f}ms  "
+            f"run avg={row['avg_run_ms'] or 0:.0f}ms max={row['max_run_ms'] or 0:.0f}ms"
+        )
+
+
+@jobs_cli.command("purge")
+@click.option("--days", type=float, default=7, show_default=True, help="Delete finished jobs older than this.")
+def purge_jobs_command(days):
+    """Delete old done/failed jobs (and free their dedup keys)."""
+    deleted = purge_jobs(datetime.utcnow() - timedelta(days=days))
+    db.session.commit()
+    click.echo(f"✅ Purged {deleted} job(s)")
+
+
+# ================== Registration ================== #
+def register_commands(app: Flask) -> None:
+    """Attach custom CLI command groups to the app."""
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(reports_cli)
+    app.cli.add_command(anomalies_cli)
+    app.cli.add_command(categories_cli)
+    app.cli.add_command(jobs_cli)
@@ -0,0 +1,59 @@
+from functools import wraps
+from typing import Callable, Optional
+
+from flask import current_app, make_response, request
+
+from utils.auth_cache import get_user_snapshot
+from utils.data_version import get_data_version
+from utils.response_cache import response_cache
+
+
+def build_etag(namespace: str, user_id: int, version: int, *parts) -> str:
+    """Strong ETag for a user-scoped resource at a given data version."""
+    suffix = "-".join(str(p) for p in parts if p not in (None, ""))
+    return f"{namespace}-{user_id}-v{version}" + (f"-{suffix}" if suffix else "")
+
+
+def versioned_etag(namespace: str, vary: Optional[Callable[[], str]] = None):
+    """
+    Conditional GET + server-side payload cache for routes decorated with
+    @token_required.
+
+    The ETag is derived from the user's data version (bumped on every
+    expense/salary/user/budget write), so an unchanged dashboard costs one PK
+    lookup and a 304, with no aggregation or JSON serialization. Clients
+    without a matching ETag are served from the response cache when the
+    same version was already computed (possibly by another worker).
+    `vary` adds a part the URL does not carry (e.g. the current month).
+    Place it below @token_required.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            version = get_data_version(current_user.id)
+            etag = build_etag(
+                namespace, current_user.id, version,
+                *[kwargs[k] for k in sorted(kwargs)], request.query_string.decode(),
+                vary() if vary else None,
+            )
+
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+            elif (cached := response_cache.get(current_user.id, etag)) is not None:
+                response = current_app.response_class(cached, mimetype="application/json")
+            else:
+                # The per-process user snapshot may predate this version; reload
+                # it so the body we tag with `etag` really reflects that version.
+                current_user = get_user_snapshot(current_user.id, refresh=True) or current_user
+                response = make_response(f(current_user, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response_cache.set(current_user.id, etag, response.get_data())
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,75 @@
+from typing import Iterable
+
+from sqlalchemy import event, select
+
+from utils.extensions import db
+from utils.sql_compat import upsert_dialect
+from models.budget import Budget
+from models.expense import Expense
+from models.salary import Salary
+from models.user import User
+from models.user_data_version import UserDataVersion
+
+# Models whose writes change what summary/trends return, and how to find the owner
+_VERSIONED_MODELS = {
+    Expense: lambda obj: obj.user_id,
+    Salary: lambda obj: obj.user_id,
+    User: lambda obj: obj.id,
+    Budget: lambda obj: obj.user_id,
+}
+
+
+def data_version_query(user_id: int):
+    return select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+
+
+def get_data_version(user_id: int) -> int:
+    """Current data version for a user (0 if never written). One PK lookup."""
+    version = db.session.execute(data_version_query(user_id)).scalar()
+    return version or 0
+
+
+def bump_data_versions(session, user_ids: Iterable[int]) -> None:
+    """
+    Increment the data version of each user, inside the session's transaction.
+    The ids are remembered in session.info so caches can be invalidated on commit.
+    """
+    user_ids = sorted(set(user_ids))
+    connection = session.connection()
+    insert, _, _ = upsert_dialect(connection)
+    session.info.setdefault("bumped_user_ids", set()).update(user_ids)
+    for user_id in user_ids:
+        stmt = insert(UserDataVersion).values(user_id=user_id, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={"version": UserDataVersion.version + 1},
+        )
+        connection.execute(stmt)
+
+
+def _after_flush(session, flush_context) -> None:
+    """Bump versions for every user whose versioned rows were written in this flush."""
+    owners, deleted_users = set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        owner_of = _VERSIONED_MODELS.get(type(obj))
+        if owner_of is None:
+            continue
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        if isinstance(obj, User) and obj in session.new:
+            continue  # a brand-new user starts at version 0
+        if isinstance(obj, User) and obj in session.deleted:
+            deleted_users.add(obj.id)
+            continue
+        owners.add(owner_of(obj))
+
+    owners -= deleted_users
+    owners.discard(None)
+    if owners:
+        bump_data_versions(session, owners)
+
+
+def register_data_version_listeners() -> None:
+    """Attach the version bump hook to the app session (idempotent)."""
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+def _flag(value) -> bool:
+    return str(value).lower() in ("1", "true", "yes")
+
+
+# ================== Instrumented Pool ================== #
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to acquire a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.acquisitions = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.acquisitions += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def wait_stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "acquisitions": self.acquisitions,
+                "wait_ms_total": round(self.wait_total * 1000, 3),
+                "wait_ms_avg": round(self.wait_total * 1000 / self.acquisitions, 3) if self.acquisitions else 0.0,
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+                "timeouts": self.timeouts,
+            }
+
+
+# ================== Engine Options ================== #
+def build_engine_options(config) -> Dict:
+    """
+    SQLAlchemy engine options from config (DB_POOL_* / DB_STATEMENT_TIMEOUT_MS /
+    DB_PGBOUNCER). SQLite keeps Flask-SQLAlchemy's defaults.
+
+    Defaults are sized for gunicorn's 2 threads per worker plus the scheduler
+    and report threads: 4 workers × (2 + 3 overflow) = 20 connections max.
+    pool_recycle stays under Neon's idle-connection cutoff, and pre-ping
+    replaces connections the server has already dropped.
+    """
+    uri = config.get("SQLALCHEMY_DATABASE_URI") or ""
+    if uri.startswith("sqlite"):
+        return {}
+
+    statement_timeout = int(config.get("DB_STATEMENT_TIMEOUT_MS") or 0)
+
+    if _flag(config.get("DB_PGBOUNCER", False)):
+        # Transaction-mode pgbouncer does the pooling and rejects the
+        # `options` startup parameter; set statement_timeout on the role.
+        return {"poolclass": NullPool}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(config.get("DB_POOL_SIZE", 2)),
+        "max_overflow": int(config.get("DB_MAX_OVERFLOW", 3)),
+        "pool_timeout": float(config.get("DB_POOL_TIMEOUT", 10)),
+        "pool_recycle": int(config.get("DB_POOL_RECYCLE", 280)),
+        "pool_pre_ping": _flag(config.get("DB_POOL_PRE_PING", True)),
+    }
+    if statement_timeout and uri.startswith("postgresql"):
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return options
+
+
+def configure_engine_options(app) -> None:
+    """Merge config-driven pool options under any explicit SQLALCHEMY_ENGINE_OPTIONS."""
+    options = build_engine_options(app.config)
+    options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    if _flag(app.config.get("DB_PGBOUNCER", False)) and app.config.get("DB_STATEMENT_TIMEOUT_MS"):
+        app.logger.warning(
+            "⚠️ DB_STATEMENT_TIMEOUT_MS is ignored in pgbouncer mode; "
+            "set statement_timeout on the database role instead"
+        )
+
+    shown = {k: (v.__name__ if isinstance(v, type) else v) for k, v in options.items() if k != "connect_args"}
+    app.logger.info("🔌 DB engine options: %s", shown or "driver defaults")
+
+
+# ================== Stats ================== #
+def pool_stats(engine) -> Dict:
+    """Snapshot of this worker's pool: size, checked out, overflow and wait times."""
+    pool = engine.pool
+    stats = {"pid": os.getpid(), "pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        })
+    else:
+        stats["status"] = pool.status()
+    if isinstance(pool, InstrumentedQueuePool):
+        stats["wait"] = pool.wait_stats()
+    return stats
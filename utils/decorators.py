@@ -1,15 +1,36 @@
+import time
 from functools import wraps
-from flask import request, jsonify, current_app
+from typing import Optional
+from flask import abort, request, jsonify, current_app
 import jwt
-from models.user import User
+from utils.auth_cache import get_user_snapshot, token_cache
+
+
+def _decode_token(token: str, secret_key: Optional[str] = None) -> dict:
+    """Decode a JWT, reusing previously verified claims until they expire."""
+    claims = token_cache.get(token)
+    if claims is not None:
+        if claims.get("exp", 0) <= time.time():
+            token_cache.pop(token)
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        return claims
+
+    claims = jwt.decode(
+        token,
+        secret_key or current_app.config["SECRET_KEY"],
+        algorithms=["HS256"]
+    )
+    remaining = claims.get("exp", 0) - time.time()
+    token_cache.set(token, claims, ttl=min(token_cache.ttl, remaining))
+    return claims
 
 
 def token_required(f):
     """
     JWT-based route protection.
     - Expects header: Authorization: Bearer <token>
-    - Decodes token, validates user
-    - Injects current_user into route
+    - Decodes token, validates user (both cached per process)
+    - Injects current_user (a read-only UserSnapshot) into route
     """
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -24,12 +45,9 @@ def token_required(f):
             return jsonify({"error": "Token is missing"}), 401
 
         try:
-            decoded = jwt.decode(
-                token,
-                current_app.config["SECRET_KEY"],
-                algorithms=["HS256"]
-            )
-            user = User.query.get(decoded.get("user_id"))
+            decoded = _decode_token(token)
+            # auth_routes.login encodes "id"; accept legacy "user_id" tokens too
+            user = get_user_snapshot(decoded.get("id", decoded.get("user_id")))
             if not user:
                 return jsonify({"error": "Invalid token user"}), 401
 
@@ -44,4 +62,15 @@ def token_required(f):
         # Pass current_user into the route
         return f(user, *args, **kwargs)
 
-    return decorated
\ No newline at end of file
+    return decorated
+
+
+def diagnostics_required(f):
+    """Serve an internal diagnostics endpoint only when DIAGNOSTICS_ENABLED (404 otherwise)."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not current_app.config.get("DIAGNOSTICS_ENABLED"):
+            abort(404)
+        return f(*args, **kwargs)
+
+    return decorated
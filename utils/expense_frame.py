@@ -0,0 +1,166 @@
+"""
+Columnar, NumPy-backed view of a user's expenses for analytics.
+
+ExpenseFrame.load() runs one query that returns plain integers (day
+ordinal, amount in cents) and category strings — no ORM objects, no
+Decimal per row — and packs them into three parallel arrays:
+
+    days   int64  date.toordinal() of each expense
+    cents  int64  amount in integer cents (exact sums)
+    codes  int32  index into `categories` (dictionary-encoded)
+
+Group-bys (month, category, weekday) and trailing-window sums are then
+vectorized over those arrays. Undated expenses are not included.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import BigInteger, func, select, type_coerce
+
+from utils.extensions import db
+from utils.expense_queries import day_ordinal
+from models.expense import Expense
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+# ================== Loading ================== #
+def _frame_query(user_id: int, start: Optional[date], end: Optional[date]):
+    day = day_ordinal(Expense.date)
+    # Read the BIGINT cents as-is instead of through the Money type
+    stmt = (
+        select(day, type_coerce(Expense.amount, BigInteger), Expense.category)
+        .where(Expense.user_id == user_id, Expense.date.is_not(None))
+        .order_by(Expense.date, Expense.id)
+    )
+    # Plain datetime bounds keep this a range scan on (user_id, date, id)
+    if start is not None:
+        stmt = stmt.where(Expense.date >= datetime.combine(start, time.min))
+    if end is not None:
+        stmt = stmt.where(Expense.date < datetime.combine(end + timedelta(days=1), time.min))
+    return stmt
+
+
+def latest_expense_day(user_id: int) -> Optional[date]:
+    """Date of the user's most recent dated expense (an index-only lookup)."""
+    ordinal = db.session.execute(
+        select(func.max(day_ordinal(Expense.date))).where(Expense.user_id == user_id)
+    ).scalar()
+    return date.fromordinal(int(ordinal)) if ordinal is not None else None
+
+
+# ================== Frame ================== #
+@dataclass(frozen=True)
+class ExpenseFrame:
+    days: np.ndarray
+    cents: np.ndarray
+    codes: np.ndarray
+    categories: Tuple[str, ...]
+
+    @classmethod
+    def from_columns(cls, days: Iterable[int], cents: Iterable[int], categories: Iterable[str]) -> "ExpenseFrame":
+        """Build a frame from parallel columns, dictionary-encoding the categories."""
+        index: Dict[str, int] = {}
+        codes = [index.setdefault(c, len(index)) for c in categories]
+        return cls(
+            days=np.asarray(days, dtype=np.int64),
+            cents=np.asarray(cents, dtype=np.int64),
+            codes=np.asarray(codes, dtype=np.int32),
+            categories=tuple(index),
+        )
+
+    @classmethod
+    def load(cls, user_id: int, start: Optional[date] = None, end: Optional[date] = None) -> "ExpenseFrame":
+        """One query for the user's dated expenses in [start, end], oldest first."""
+        # Core execution on the session's connection skips ORM result handling
+        rows = db.session.connection().execute(_frame_query(user_id, start, end)).all()
+        if not rows:
+            return cls.empty()
+        days, cents, categories = zip(*rows)
+        return cls.from_columns(days, cents, (c or "Miscellaneous" for c in categories))
+
+    @classmethod
+    def empty(cls) -> "ExpenseFrame":
+        return cls(
+            days=np.empty(0, dtype=np.int64),
+            cents=np.empty(0, dtype=np.int64),
+            codes=np.empty(0, dtype=np.int32),
+            categories=(),
+        )
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def select(self, mask: np.ndarray) -> "ExpenseFrame":
+        """Rows where `mask` is true (categories keep their codes)."""
+        return ExpenseFrame(self.days[mask], self.cents[mask], self.codes[mask], self.categories)
+
+    def between(self, start: date, end: date) -> "ExpenseFrame":
+        return self.select((self.days >= start.toordinal()) & (self.days <= end.toordinal()))
+
+    # ================== Keys ================== #
+    def month_keys(self) -> np.ndarray:
+        """Months since 1970-01 for every row."""
+        return (self.days - _EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+    def weekdays(self) -> np.ndarray:
+        """0 = Monday … 6 = Sunday (ordinal 1, 0001-01-01, was a Monday)."""
+        return (self.days - 1) % 7
+
+    # ================== Aggregations ================== #
+    def total(self) -> int:
+        return int(self.cents.sum())
+
+    def group_sum(self, keys: np.ndarray, size: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact int64 sum of cents per key. With `size`, keys must be codes in
+        [0, size) and the result is dense; otherwise returns (unique keys, sums).
+        """
+        if size is not None:
+            sums = np.zeros(size, dtype=np.int64)
+            np.add.at(sums, keys, self.cents)
+            return np.arange(size), sums
+        unique, inverse = np.unique(keys, return_inverse=True)
+        sums = np.zeros(len(unique), dtype=np.int64)
+        np.add.at(sums, inverse.reshape(-1), self.cents)
+        return unique, sums
+
+    def by_month(self) -> Dict[str, int]:
+        """Cents per "YYYY-MM", oldest first."""
+        months, sums = self.group_sum(self.month_keys())
+        labels = months.astype("datetime64[M]").astype(str)
+        return dict(zip(labels.tolist(), sums.tolist()))
+
+    def by_category(self) -> Dict[str, int]:
+        """Cents per category (categories with no rows in this frame are left out)."""
+        _, sums = self.group_sum(self.codes, len(self.categories))
+        counts = np.bincount(self.codes, minlength=len(self.categories))
+        return {name: total for name, total, n in zip(self.categories, sums.tolist(), counts) if n}
+
+    def by_weekday(self) -> Dict[str, int]:
+        """Cents per weekday, Monday first; all seven days are present."""
+        _, sums = self.group_sum(self.weekdays(), 7)
+        return dict(zip(WEEKDAYS, sums.tolist()))
+
+    # ================== Windows ================== #
+    def daily(self, start: date, end: date) -> np.ndarray:
+        """Dense cents per day for every day in [start, end] (zeros for empty days)."""
+        first, last = start.toordinal(), end.toordinal()
+        totals = np.zeros(max(last - first + 1, 0), dtype=np.int64)
+        inside = (self.days >= first) & (self.days <= last)
+        np.add.at(totals, self.days[inside] - first, self.cents[inside])
+        return totals
+
+    def rolling_sum(self, start: date, end: date, window: int) -> np.ndarray:
+        """
+        Trailing `window`-day sum for each day in [start, end]. Days before
+        `start` are read from the frame, so load it `window - 1` days early
+        for complete leading windows.
+        """
+        lead = window - 1
+        series = self.daily(date.fromordinal(start.toordinal() - lead), end)
+        cumulative = np.concatenate(([0], np.cumsum(series)))
+        return cumulative[window:] - cumulative[:-window]
@@ -0,0 +1,140 @@
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import BigInteger, Select, String, and_, exists, func, null, select, type_coerce, union_all
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from utils.extensions import db
+from models.budget import Budget
+from models.expense_rollup import ExpenseRollup
+
+
+# ================== SQL Constructs ================== #
+class year_month(FunctionElement):
+    """
+    Portable `YYYY-MM` bucket for a date/datetime column.
+    Compiles to strftime() on SQLite and to_char() on PostgreSQL.
+    """
+    type = String()
+    inherit_cache = True
+    name = "year_month"
+
+
+@compiles(year_month)
+def _year_month_default(element, compiler, **kw):
+    return "to_char(%s, 'YYYY-MM')" % compiler.process(element.clauses, **kw)
+
+
+@compiles(year_month, "sqlite")
+def _year_month_sqlite(element, compiler, **kw):
+    return "strftime('%%Y-%%m', %s)" % compiler.process(element.clauses, **kw)
+
+
+class day_ordinal(FunctionElement):
+    """
+    Proleptic Gregorian day number of a date/datetime column, equal to
+    Python's date.toordinal(), so rows can be bucketed by day as integers.
+    """
+    type = BigInteger()
+    inherit_cache = True
+    name = "day_ordinal"
+
+
+@compiles(day_ordinal)
+def _day_ordinal_default(element, compiler, **kw):
+    return "(CAST(%s AS DATE) - DATE '0001-01-01' + 1)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(day_ordinal, "sqlite")
+def _day_ordinal_sqlite(element, compiler, **kw):
+    return "CAST(julianday(date(%s)) - 1721424.5 AS INTEGER)" % compiler.process(element.clauses, **kw)
+
+
+# ================== Aggregations ================== #
+# Reads come from expense_rollups, so cost is O(months × categories)
+# rather than O(expenses). See utils/rollups.py for maintenance.
+# The *_query builders are shared with the async read path (utils/async_app.py).
+# Amounts are BIGINT cents, so every SUM here is an exact integer sum; the
+# Money column type hands results back as Decimal.
+def category_totals_query(user_id: int) -> Select:
+    return (
+        select(ExpenseRollup.category, func.sum(ExpenseRollup.total_amount))
+        .where(ExpenseRollup.user_id == user_id)
+        .group_by(ExpenseRollup.category)
+    )
+
+
+def monthly_totals_query(user_id: int) -> Select:
+    return (
+        select(ExpenseRollup.year_month, func.sum(ExpenseRollup.total_amount))
+        .where(ExpenseRollup.user_id == user_id)
+        .group_by(ExpenseRollup.year_month)
+        .order_by(ExpenseRollup.year_month)
+    )
+
+
+def monthly_category_totals_query(user_id: int, before_month: Optional[str] = None) -> Select:
+    """(YYYY-MM, category, cents) rows for dated months, optionally only months before `before_month`."""
+    stmt = (
+        select(ExpenseRollup.year_month, ExpenseRollup.category, type_coerce(ExpenseRollup.total_amount, BigInteger))
+        .where(ExpenseRollup.user_id == user_id, ExpenseRollup.year_month != "Unknown")  # rollups.UNKNOWN_MONTH
+        .order_by(ExpenseRollup.year_month)
+    )
+    if before_month is not None:
+        stmt = stmt.where(ExpenseRollup.year_month < before_month)
+    return stmt
+
+
+def budget_report_query(user_id: int, month: str) -> Select:
+    """
+    (category, limit cents or None, spent cents, expense count) for one
+    month: every budgeted category LEFT JOINed to its rollup bucket (a PK
+    lookup on expense_rollups), plus categories with spend but no budget.
+    """
+    spent = type_coerce(ExpenseRollup.total_amount, BigInteger)
+    in_month = and_(ExpenseRollup.user_id == user_id, ExpenseRollup.year_month == month)
+    budgeted = (
+        select(
+            Budget.category,
+            type_coerce(Budget.limit, BigInteger).label("limit_cents"),
+            func.coalesce(func.sum(spent), 0).label("spent_cents"),
+            func.coalesce(func.sum(ExpenseRollup.expense_count), 0).label("expense_count"),
+        )
+        .select_from(Budget)
+        .outerjoin(ExpenseRollup, and_(in_month, ExpenseRollup.category == Budget.category))
+        .where(Budget.user_id == user_id)
+        .group_by(Budget.category, Budget.limit)
+    )
+    unbudgeted = (
+        select(ExpenseRollup.category, null(), spent, ExpenseRollup.expense_count)
+        .where(in_month)
+        .where(~exists().where(Budget.user_id == user_id, Budget.category == ExpenseRollup.category))
+    )
+    report = union_all(budgeted, unbudgeted).subquery()
+    return select(report).order_by(report.c.category)
+
+
+def expense_totals_query(user_id: int) -> Select:
+    return select(
+        func.coalesce(func.sum(ExpenseRollup.total_amount), 0),
+        func.coalesce(func.sum(ExpenseRollup.expense_count), 0),
+    ).where(ExpenseRollup.user_id == user_id)
+
+
+def category_totals(user_id: int) -> Dict[str, float]:
+    """Total spent per category."""
+    rows = db.session.execute(category_totals_query(user_id)).all()
+    return {name: float(total or 0) for name, total in rows}
+
+
+def monthly_totals(user_id: int) -> Dict[str, float]:
+    """Total spent per month (YYYY-MM). Undated expenses are bucketed as "Unknown"."""
+    rows = db.session.execute(monthly_totals_query(user_id)).all()
+    return {name: float(total or 0) for name, total in rows}
+
+
+def expense_totals(user_id: int) -> Tuple[Decimal, int]:
+    """Overall (exact total spent, number of expenses) for a user."""
+    total, count = db.session.execute(expense_totals_query(user_id)).one()
+    return total, int(count)
@@ -0,0 +1,241 @@
+"""
+Per-(user, category) amount statistics for anomaly scoring.
+
+Online: every inserted expense is merged into category_stats as running
+moments (count, mean, M2) with the Chan/Welford update, inside the same
+upsert, so scoring a new expense is one primary-key lookup and no history
+is rescanned. Updates and deletes recompute just the affected buckets.
+
+Batch: rescore_expenses() loads the whole expenses table (or one user)
+into NumPy arrays, recomputes moments plus median and MAD per group with
+sorts and bincounts, rewrites category_stats and returns every expense's
+z-score and robust (MAD) z-score.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import BigInteger, Float, event, func, inspect, literal, select, type_coerce
+
+from utils.extensions import db
+from utils.money import to_cents
+from utils.sql_compat import upsert_dialect
+from models.category_stats import CategoryStats
+from models.expense import Expense
+
+StatsKey = Tuple[int, str]  # (user_id, category)
+MAD_SCALE = 0.6745  # robust z = 0.6745 * (x - median) / MAD
+
+
+# ================== Scoring ================== #
+@dataclass(frozen=True)
+class AnomalyScore:
+    is_anomaly: bool
+    z_score: Optional[float]
+    robust_z: Optional[float]
+    history: int
+
+    def as_dict(self) -> Dict:
+        return {
+            "is_anomaly": self.is_anomaly,
+            "z_score": None if self.z_score is None else round(self.z_score, 2),
+            "robust_z": None if self.robust_z is None else round(self.robust_z, 2),
+            "history": self.history,
+        }
+
+
+def score_amount(stats: Optional[CategoryStats], cents: int, z_threshold: float,
+                 mad_threshold: float, min_history: int) -> AnomalyScore:
+    """Score one amount against prior history (the amount itself not included)."""
+    count = int(stats.count) if stats else 0
+    if count < max(min_history, 2):
+        return AnomalyScore(False, None, None, count)
+
+    std = (stats.m2 / (count - 1)) ** 0.5
+    z = (cents - stats.mean_cents) / std if std > 0 else None
+    robust = None
+    if stats.mad_cents:
+        robust = MAD_SCALE * (cents - stats.median_cents) / stats.mad_cents
+
+    flagged = (z is not None and abs(z) > z_threshold) or (robust is not None and abs(robust) > mad_threshold)
+    return AnomalyScore(flagged, z, robust, count)
+
+
+def score_expense(user_id: int, category: str, amount, config) -> AnomalyScore:
+    """Score a not-yet-inserted expense with one PK lookup on category_stats."""
+    stats = db.session.get(CategoryStats, (user_id, category))
+    return score_amount(
+        stats, to_cents(amount),
+        z_threshold=float(config.get("ANOMALY_Z_THRESHOLD", 3.0)),
+        mad_threshold=float(config.get("ANOMALY_MAD_THRESHOLD", 3.5)),
+        min_history=int(config.get("ANOMALY_MIN_HISTORY", 5)),
+    )
+
+
+# ================== Incremental Maintenance ================== #
+def batch_moments(cents: Iterable[int]) -> Tuple[int, float, float]:
+    """(count, mean, M2) of a batch, by Welford's single-pass update."""
+    count, mean, m2 = 0, 0.0, 0.0
+    for x in cents:
+        count += 1
+        delta = x - mean
+        mean += delta / count
+        m2 += delta * (x - mean)
+    return count, mean, m2
+
+
+def apply_stat_deltas(connection, deltas: Dict[StatsKey, Tuple[int, float, float]]) -> None:
+    """
+    Merge batch moments into category_stats with one upsert per bucket
+    (Chan et al. parallel update; SET expressions see the old row).
+    """
+    insert, _, _ = upsert_dialect(connection)
+    for (user_id, category), (count, mean, m2) in deltas.items():
+        if not count:
+            continue
+        stmt = insert(CategoryStats).values(
+            user_id=user_id, category=category, count=count, mean_cents=mean, m2=m2,
+        )
+        new = stmt.excluded
+        new_count = new["count"]
+        delta = new.mean_cents - CategoryStats.mean_cents
+        total = CategoryStats.count + new_count
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "category"],
+            set_={
+                "count": total,
+                "mean_cents": CategoryStats.mean_cents + delta * new_count / total,
+                "m2": CategoryStats.m2 + new.m2 + delta * delta * CategoryStats.count * new_count / total,
+            },
+        )
+        connection.execute(stmt)
+
+
+def recompute_stats(connection, keys: Iterable[StatsKey]) -> None:
+    """Recompute moments for buckets touched by an update or delete (median/MAD are kept)."""
+    cents = type_coerce(Expense.amount, BigInteger)
+    for user_id, category in keys:
+        where = (Expense.user_id == user_id, Expense.category == category)
+        count, mean = connection.execute(select(func.count(), func.avg(cents)).where(*where)).one()
+        if not count:
+            connection.execute(
+                CategoryStats.__table__.delete().where(
+                    CategoryStats.user_id == user_id, CategoryStats.category == category)
+            )
+            continue
+        deviation = cents - literal(float(mean), Float)
+        m2 = connection.execute(select(func.sum(deviation * deviation)).where(*where)).scalar()
+        connection.execute(
+            CategoryStats.__table__.update()
+            .where(CategoryStats.user_id == user_id, CategoryStats.category == category)
+            .values(count=count, mean_cents=float(mean), m2=float(m2 or 0.0))
+        )
+
+
+def _previous(obj, field):
+    history = inspect(obj).attrs[field].history
+    return history.deleted[0] if history.deleted else getattr(obj, field)
+
+
+def _after_flush(session, flush_context) -> None:
+    """Fold ORM expense inserts into category_stats; recompute buckets on update/delete."""
+    added: Dict[StatsKey, List[int]] = defaultdict(list)
+    stale = set()
+
+    for obj in session.new:
+        if isinstance(obj, Expense) and obj.amount is not None:
+            added[(obj.user_id, obj.category)].append(to_cents(obj.amount))
+
+    for obj in session.dirty:
+        if isinstance(obj, Expense) and session.is_modified(obj, include_collections=False):
+            stale.add((_previous(obj, "user_id"), _previous(obj, "category")))
+            stale.add((obj.user_id, obj.category))
+
+    for obj in session.deleted:
+        if isinstance(obj, Expense):
+            stale.add((_previous(obj, "user_id"), _previous(obj, "category")))
+
+    if not added and not stale:
+        return
+
+    connection = session.connection()
+    apply_stat_deltas(connection, {k: batch_moments(v) for k, v in added.items() if k not in stale})
+    recompute_stats(connection, stale)
+
+
+def register_stats_listeners() -> None:
+    """Attach the category_stats maintenance hook to the app session (idempotent)."""
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
+
+
+# ================== Batch Re-scoring ================== #
+def _group_median(groups: np.ndarray, values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Median of `values` per group (groups are 0..G-1, every group non-empty)."""
+    ordered = values[np.lexsort((values, groups))]
+    return (ordered[starts + (counts - 1) // 2] + ordered[starts + counts // 2]) / 2
+
+
+@dataclass(frozen=True)
+class RescoreResult:
+    expense_ids: np.ndarray
+    z_scores: np.ndarray   # NaN where the group has no spread or too little history
+    robust_z: np.ndarray   # NaN where MAD is 0
+    flagged: np.ndarray
+    buckets: int
+
+
+def rescore_expenses(user_id: Optional[int] = None, z_threshold: float = 3.0,
+                     mad_threshold: float = 3.5, min_history: int = 5) -> RescoreResult:
+    """
+    Recompute category_stats (moments, median, MAD) from the full table and
+    score every expense against its group, vectorized. Caller commits.
+    """
+    stmt = select(Expense.id, Expense.user_id, Expense.category, type_coerce(Expense.amount, BigInteger))
+    if user_id is not None:
+        stmt = stmt.where(Expense.user_id == user_id)
+    connection = db.session.connection()
+    rows = connection.execute(stmt).all()
+
+    delete = CategoryStats.__table__.delete()
+    if user_id is not None:
+        delete = delete.where(CategoryStats.user_id == user_id)
+    connection.execute(delete)
+
+    if not rows:
+        empty = np.empty(0)
+        return RescoreResult(empty.astype(np.int64), empty, empty, empty.astype(bool), 0)
+
+    ids, users, categories, cents = zip(*rows)
+    index: Dict[StatsKey, int] = {}
+    groups = np.fromiter((index.setdefault(k, len(index)) for k in zip(users, categories)),
+                         dtype=np.int64, count=len(rows))
+    values = np.asarray(cents, dtype=np.float64)
+
+    counts = np.bincount(groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    means = np.bincount(groups, weights=values) / counts
+    m2 = np.bincount(groups, weights=(values - means[groups]) ** 2)
+    medians = _group_median(groups, values, starts, counts)
+    mads = _group_median(groups, np.abs(values - medians[groups]), starts, counts)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = np.sqrt(m2 / np.maximum(counts - 1, 1))
+        z = np.where((counts[groups] >= max(min_history, 2)) & (std[groups] > 0),
+                     (values - means[groups]) / std[groups], np.nan)
+        robust = np.where(mads[groups] > 0, MAD_SCALE * (values - medians[groups]) / mads[groups], np.nan)
+    enough = counts[groups] >= min_history
+    flagged = enough & ((np.abs(np.nan_to_num(z)) > z_threshold) | (np.abs(np.nan_to_num(robust)) > mad_threshold))
+
+    now = datetime.utcnow()
+    connection.execute(CategoryStats.__table__.insert(), [
+        {
+            "user_id": uid, "category": category, "count": int(counts[g]),
+            "mean_cents": float(means[g]), "m2": float(m2[g]),
+            "median_cents": float(medians[g]), "mad_cents": float(mads[g]), "rescored_at": now,
+        }
+        for (uid, category), g in index.items()
+    ])
+    return RescoreResult(np.asarray(ids, dtype=np.int64), z, robust, flagged, len(index))
@@ -0,0 +1,259 @@
+"""
+Next-month spending forecast per category.
+
+The per-category monthly series (from expense_rollups) becomes one
+(categories × months) matrix and every model is fitted for all rows at
+once with NumPy:
+
+    mean      fewer than 3 months of history
+    linear    least-squares trend
+    holt      damped Holt exponential smoothing; (alpha, beta, phi) chosen
+              per row from a grid, all grid points run in one recursion
+    seasonal  holt on the deseasonalised series plus additive monthly
+              indices from a centred 12-month moving average (24+ months)
+
+With 6+ months of history each row keeps whichever candidate had the
+lowest error on the last few held-out months. A fitted model is a handful
+of arrays, cached per (user, data version, training cutoff), so repeat
+calls only evaluate it.
+
+Training uses complete calendar months only; months without expenses
+count as zero spend.
+"""
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.auth_cache import TTLCache
+from utils.data_version import get_data_version
+from utils.expense_queries import monthly_category_totals_query
+from utils.extensions import db
+
+SEASON = 12
+MIN_TREND_MONTHS = 3
+MIN_HOLDOUT_MONTHS = 6
+MIN_SEASONAL_MONTHS = 2 * SEASON
+MAX_HOLDOUT_MONTHS = 3
+
+MODELS = ("mean", "linear", "holt", "seasonal")
+MEAN, LINEAR, HOLT, SEASONAL = range(len(MODELS))
+
+# Holt parameter grid, shaped (G, 1) to broadcast against (G, categories)
+_ALPHA, _BETA, _PHI = (
+    grid.reshape(-1, 1)
+    for grid in np.meshgrid([0.1, 0.3, 0.5, 0.7, 0.9], [0.05, 0.15, 0.3], [0.8, 0.9, 0.98], indexing="ij")
+)
+_MA_KERNEL = np.r_[0.5, np.ones(SEASON - 1), 0.5] / SEASON  # centred 2×12 moving average
+
+forecast_cache = TTLCache(maxsize=1024, ttl=3600)  # (user id, version, cutoff) → FittedForecast
+
+
+# ================== Months ================== #
+def month_index(label: str) -> int:
+    """"YYYY-MM" → months since year 0."""
+    year, month = label.split("-")
+    return int(year) * 12 + int(month) - 1
+
+
+def month_label(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def current_month_index() -> int:
+    today = datetime.utcnow()
+    return today.year * 12 + today.month - 1
+
+
+# ================== Model Components ================== #
+@dataclass(frozen=True)
+class Components:
+    """Per-row forecast state: level + damped trend + seasonal index by calendar month."""
+    level: np.ndarray
+    trend: np.ndarray
+    phi: np.ndarray
+    seasonal: np.ndarray  # (rows, 12), column = calendar month 0..11
+
+    def predict(self, steps: int, calendar_month: int) -> np.ndarray:
+        """Forecast `steps` months after the last fitted month."""
+        return self.level + _damped_steps(self.phi, steps) * self.trend + self.seasonal[:, calendar_month]
+
+
+def _damped_steps(phi: np.ndarray, steps: int) -> np.ndarray:
+    """phi + phi² + … + phi^steps (= steps when phi is 1)."""
+    undamped = phi >= 1.0
+    safe = np.where(undamped, 0.5, phi)
+    return np.where(undamped, float(steps), safe * (1 - safe ** steps) / (1 - safe))
+
+
+def _components(level, trend=None, phi=None, seasonal=None) -> Components:
+    rows = len(level)
+    return Components(
+        level=level,
+        trend=np.zeros(rows) if trend is None else trend,
+        phi=np.ones(rows) if phi is None else phi,
+        seasonal=np.zeros((rows, SEASON)) if seasonal is None else seasonal,
+    )
+
+
+# ================== Fitting (all rows at once) ================== #
+def _fit_mean(series: np.ndarray, first_month: int) -> Components:
+    return _components(series.mean(axis=1))
+
+
+def _fit_linear(series: np.ndarray, first_month: int) -> Components:
+    t = np.arange(series.shape[1], dtype=np.float64)
+    centred = t - t.mean()
+    slope = (series - series.mean(axis=1, keepdims=True)) @ centred / (centred @ centred)
+    intercept = series.mean(axis=1) - slope * t.mean()
+    return _components(intercept + slope * t[-1], slope)
+
+
+def _fit_holt(series: np.ndarray, first_month: int) -> Components:
+    """Damped Holt for every (grid point, row) pair; keep each row's lowest one-step SSE."""
+    rows, months = series.shape
+    level = np.broadcast_to(series[:, 0], (len(_ALPHA), rows)).copy()
+    trend = np.broadcast_to(series[:, 1] - series[:, 0], (len(_ALPHA), rows)).copy()
+    sse = np.zeros_like(level)
+    for t in range(1, months):
+        expected = level + _PHI * trend
+        if t >= 2:  # the first step is fitted exactly by the initial trend
+            sse += (series[:, t] - expected) ** 2
+        new_level = _ALPHA * series[:, t] + (1 - _ALPHA) * expected
+        trend = _BETA * (new_level - level) + (1 - _BETA) * _PHI * trend
+        level = new_level
+
+    best = sse.argmin(axis=0)
+    picked = np.arange(rows)
+    return _components(level[best, picked], trend[best, picked], _PHI[best, 0])
+
+
+def _fit_seasonal(series: np.ndarray, first_month: int) -> Components:
+    """Classical additive decomposition, then Holt on the seasonally adjusted series."""
+    months = series.shape[1]
+    half = SEASON // 2
+    moving_average = sliding_window_view(series, len(_MA_KERNEL), axis=1) @ _MA_KERNEL
+    detrended = series[:, half:months - half] - moving_average
+    calendar = (first_month + np.arange(half, months - half)) % SEASON
+
+    # A window shorter than two seasons leaves some calendar months without
+    # an estimate; those keep a zero index
+    seasonal = np.zeros((len(series), SEASON))
+    observed = np.isin(np.arange(SEASON), calendar)
+    for m in np.flatnonzero(observed).tolist():
+        seasonal[:, m] = detrended[:, calendar == m].mean(axis=1)
+    seasonal[:, observed] -= seasonal[:, observed].mean(axis=1, keepdims=True)
+
+    adjusted = series - seasonal[:, (first_month + np.arange(months)) % SEASON]
+    return replace(_fit_holt(adjusted, first_month), seasonal=seasonal)
+
+
+_FITTERS = {MEAN: _fit_mean, LINEAR: _fit_linear, HOLT: _fit_holt, SEASONAL: _fit_seasonal}
+
+
+def _min_months(model: int) -> int:
+    return MIN_SEASONAL_MONTHS if model == SEASONAL else MIN_TREND_MONTHS if model in (LINEAR, HOLT) else 1
+
+
+def _select_models(series: np.ndarray, first_month: int) -> np.ndarray:
+    """Per-row model code, by mean absolute error on the last few held-out months."""
+    rows, months = series.shape
+    if months < MIN_TREND_MONTHS:
+        return np.full(rows, MEAN)
+    if months < MIN_HOLDOUT_MONTHS:
+        return np.full(rows, HOLT)
+
+    holdout = min(MAX_HOLDOUT_MONTHS, months // 4)
+    train, test = series[:, :months - holdout], series[:, months - holdout:]
+    last = first_month + train.shape[1] - 1
+    # Eligibility follows the full history the final model is fitted on; the
+    # training split is shorter, but from 19 months on every held-out month
+    # has a seasonal index estimated from it
+    candidates = [m for m in (LINEAR, HOLT, SEASONAL) if months >= _min_months(m)]
+
+    errors = []
+    for model in candidates:
+        fitted = _FITTERS[model](train, first_month)
+        predicted = np.stack(
+            [fitted.predict(h, (last + h) % SEASON) for h in range(1, holdout + 1)], axis=1
+        )
+        errors.append(np.abs(np.maximum(predicted, 0) - test).mean(axis=1))
+    return np.asarray(candidates)[np.argmin(np.vstack(errors), axis=0)]
+
+
+def fit_components(series: np.ndarray, first_month: int) -> Tuple[np.ndarray, Components]:
+    """Choose a model per row, fit each chosen model once over all rows, and merge."""
+    models = _select_models(series, first_month)
+    merged = _components(np.zeros(len(series)))
+    for model in np.unique(models).tolist():
+        fitted = _FITTERS[model](series, first_month)
+        rows = models == model
+        merged.level[rows] = fitted.level[rows]
+        merged.trend[rows] = fitted.trend[rows]
+        merged.phi[rows] = fitted.phi[rows]
+        merged.seasonal[rows] = fitted.seasonal[rows]
+    return models, merged
+
+
+# ================== Fitted Forecast ================== #
+@dataclass(frozen=True)
+class FittedForecast:
+    categories: Tuple[str, ...]
+    first_month: int
+    last_month: int  # last training month (index); -1 when there is no history
+    models: np.ndarray
+    components: Components
+
+    @property
+    def history_months(self) -> int:
+        return self.last_month - self.first_month + 1 if self.categories else 0
+
+    def predict(self, month: int) -> Dict[str, Tuple[int, str]]:
+        """category → (forecast cents, model name) for a month after the training data."""
+        if not self.categories:
+            return {}
+        cents = self.components.predict(month - self.last_month, month % SEASON)
+        cents = np.rint(np.maximum(cents, 0)).astype(np.int64)
+        return {
+            name: (value, MODELS[model])
+            for name, value, model in zip(self.categories, cents.tolist(), self.models.tolist())
+        }
+
+
+def fit_user_forecast(user_id: int, cutoff: int) -> FittedForecast:
+    """Fit on the user's complete months strictly before `cutoff` (a month index)."""
+    rows = db.session.connection().execute(
+        monthly_category_totals_query(user_id, before_month=month_label(cutoff))
+    ).all()
+    if not rows:
+        return FittedForecast((), cutoff, -1, np.empty(0, dtype=np.int64), _components(np.zeros(0)))
+
+    categories = sorted({category for _, category, _ in rows})
+    row_of = {name: i for i, name in enumerate(categories)}
+    first_month, last_month = month_index(rows[0][0]), cutoff - 1
+    series = np.zeros((len(categories), last_month - first_month + 1))
+    for label, category, cents in rows:
+        series[row_of[category], month_index(label) - first_month] += cents
+
+    models, components = fit_components(series, first_month)
+    return FittedForecast(tuple(categories), first_month, last_month, models, components)
+
+
+def get_user_forecast(user_id: int, cutoff: int) -> FittedForecast:
+    """Fitted model for the user's current data version (cached; one PK lookup on a hit)."""
+    key = (user_id, get_data_version(user_id), cutoff)
+    fitted = forecast_cache.get(key)
+    if fitted is None:
+        fitted = fit_user_forecast(user_id, cutoff)
+        forecast_cache.set(key, fitted)
+    return fitted
+
+
+def configure_forecast_cache(app) -> None:
+    """Size the fitted-model cache from config (FORECAST_CACHE_MAX_SIZE / FORECAST_CACHE_TTL)."""
+    forecast_cache.configure(
+        int(app.config.get("FORECAST_CACHE_MAX_SIZE", 1024)),
+        float(app.config.get("FORECAST_CACHE_TTL", 3600)),
+    )
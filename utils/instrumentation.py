@@ -0,0 +1,223 @@
+"""
+Per-request hot-path instrumentation.
+
+For every request we record the number of SQL statements, total DB time,
+time spent serializing JSON and total handler time. Each request emits a
+`Server-Timing` header and one structured log line, and feeds per-endpoint
+histograms rendered in Prometheus text format at GET /metrics.
+
+Metrics are per process: with several gunicorn workers, each scrape sees
+the worker that answered it.
+"""
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from flask import Flask, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+# ================== Metric Types ================== #
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by a label tuple."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._counts: Dict[Tuple, List[int]] = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        self._sums: Dict[Tuple, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        with self._lock:
+            self._counts[labels][bisect_left(self.buckets, value)] += 1
+            self._sums[labels] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, counts in sorted(self._counts.items()):
+                base = _format_labels(self.label_names, labels)
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+                cumulative += counts[-1]
+                lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {cumulative}')
+                lines.append(f"{self.name}_sum{{{base}}} {self._sums[labels]:.6f}")
+                lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by a label tuple."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[Tuple, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{{{_format_labels(self.label_names, labels)}}} {value:g}")
+        return lines
+
+
+def _format_labels(names, values) -> str:
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for v in values)
+    return ",".join(f'{n}="{v}"' for n, v in zip(names, escaped))
+
+
+def render_gauges(name: str, help_text: str, samples: Dict[Tuple[Tuple[str, str], ...], float]) -> List[str]:
+    """Render ad-hoc gauges, e.g. cache or pool counters collected at scrape time."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for labels, value in sorted(samples.items()):
+        rendered = ",".join(f'{k}="{v}"' for k, v in labels)
+        lines.append(f"{name}{{{rendered}}} {value:g}" if rendered else f"{name} {value:g}")
+    return lines
+
+
+# ================== Registry ================== #
+_LABELS = ("method", "endpoint")
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Total handler time per request.", _LABELS, LATENCY_BUCKETS)
+db_duration = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request.", _LABELS, LATENCY_BUCKETS)
+json_duration = Histogram(
+    "http_request_json_seconds", "Time spent serializing JSON per request.", _LABELS, LATENCY_BUCKETS)
+sql_statements = Histogram(
+    "http_request_sql_statements", "SQL statements executed per request.", _LABELS, QUERY_COUNT_BUCKETS)
+requests_total = Counter(
+    "http_requests_total", "Requests by status code.", _LABELS + ("status",))
+
+METRICS = [request_duration, db_duration, json_duration, sql_statements, requests_total]
+
+
+def register_metric(metric):
+    """Add a metric defined elsewhere to the /metrics output; returns it."""
+    METRICS.append(metric)
+    return metric
+
+
+def _current() -> Dict:
+    """Metrics dict for the active request, or None outside requests."""
+    if has_request_context():
+        return g.get("_request_metrics")
+    return None
+
+
+# ================== SQLAlchemy Hooks ================== #
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    metrics = _current()
+    if metrics is not None:
+        metrics["sql_count"] += 1
+        metrics["sql_time"] += elapsed
+
+
+# ================== JSON Timing ================== #
+class TimedJSONProvider(DefaultJSONProvider):
+    """Default provider that adds JSON encoding time to the request metrics."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            metrics = _current()
+            if metrics is not None:
+                metrics["json_time"] += time.perf_counter() - start
+
+
+# ================== Middleware ================== #
+def init_instrumentation(app: Flask) -> None:
+    """Install request hooks, the timed JSON provider and Server-Timing output."""
+    if not app.config.get("REQUEST_METRICS_ENABLED", True):
+        return
+
+    app.json = TimedJSONProvider(app)
+    request_logger = app.logger.getChild("requests")
+    log_requests = app.config.get("REQUEST_LOG_ENABLED", True)
+
+    @app.before_request
+    def _start_request_metrics():
+        g._request_metrics = {
+            "start": time.perf_counter(),
+            "sql_count": 0,
+            "sql_time": 0.0,
+            "json_time": 0.0,
+        }
+
+    @app.after_request
+    def _finish_request_metrics(response):
+        metrics = g.pop("_request_metrics", None)
+        if metrics is None:
+            return response
+
+        total = time.perf_counter() - metrics["start"]
+        endpoint = request.url_rule.rule if request.url_rule else "<unmatched>"
+        labels = (request.method, endpoint)
+
+        request_duration.observe(labels, total)
+        db_duration.observe(labels, metrics["sql_time"])
+        json_duration.observe(labels, metrics["json_time"])
+        sql_statements.observe(labels, metrics["sql_count"])
+        requests_total.inc(labels + (response.status_code,))
+
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={metrics["sql_time"] * 1000:.2f};desc="{metrics["sql_count"]} queries", '
+            f'json;dur={metrics["json_time"] * 1000:.2f}, '
+            f'app;dur={total * 1000:.2f}',
+        )
+
+        if log_requests:
+            request_logger.info(json.dumps({
+                "event": "request",
+                "method": request.method,
+                "endpoint": endpoint,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round(total * 1000, 3),
+                "sql_count": metrics["sql_count"],
+                "sql_ms": round(metrics["sql_time"] * 1000, 3),
+                "json_ms": round(metrics["json_time"] * 1000, 3),
+            }))
+        return response
+
+
+def render_metrics(extra_lines: List[str] = ()) -> str:
+    """All request metrics (plus any extra gauge lines) in Prometheus text format."""
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,448 @@
+"""
+Durable background jobs stored in the application database.
+
+Producers call enqueue() inside their own transaction, so a job exists
+exactly when the write that needs it commits. Workers (`python worker.py`)
+claim due jobs with one atomic statement:
+
+    UPDATE jobs SET status = 'running', attempts = attempts + 1, ...
+    WHERE id IN (SELECT id FROM jobs WHERE status = 'queued' AND run_at <= now
+                 ORDER BY run_at, id LIMIT n FOR UPDATE SKIP LOCKED)
+    RETURNING ...
+
+On PostgreSQL, SKIP LOCKED lets any number of workers claim disjoint jobs
+without blocking each other. SQLite has no row locks (FOR UPDATE is not
+rendered) but serialises writers on the database lock, so the same
+statement is still atomic there; workers just take turns.
+
+A claimed job holds a lease (`locked_until`, from the job's timeout) that
+its worker renews while the job is still running, so a job is never
+claimed twice while it runs; the lease only lapses when the worker dies
+or stops polling. Failures are retried with exponential backoff and
+jitter up to max_attempts; an expired lease counts as a failed attempt
+and is retried the same way, so a job cut short by a dead worker runs
+again (at-least-once). Each job row records queue wait and run time.
+"""
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+from flask import current_app
+from sqlalchemy import case, delete, func, select, update
+
+from utils.extensions import db
+from utils.sql_compat import upsert_dialect
+from models.job import Job
+
+DEFAULT_TIMEOUT = 300  # seconds a lease lasts without renewal
+DEFAULT_MAX_ATTEMPTS = 5
+
+
+# ================== Registry ================== #
+@dataclass(frozen=True)
+class JobSpec:
+    name: str
+    func: Callable
+    max_attempts: int
+    timeout: float
+    concurrency: Optional[int]  # max running at once per worker process (None = pool size)
+    on_failure: Optional[Callable] = None  # called with the payload once attempts run out
+
+
+JOBS: Dict[str, JobSpec] = {}
+
+
+def job(name: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS, timeout: float = DEFAULT_TIMEOUT,
+        concurrency: Optional[int] = None, on_failure: Optional[Callable] = None):
+    """
+    Register a function as a job handler. The worker calls func(**payload)
+    in an app context and commits db.session when it returns. When the job
+    fails for good, on_failure(**payload) runs in the same way.
+    """
+    def decorator(func):
+        JOBS[name] = JobSpec(name, func, max_attempts, timeout, concurrency, on_failure)
+        return func
+    return decorator
+
+
+# ================== Producing ================== #
+def enqueue(name: str, payload: Optional[Dict] = None, key: Optional[str] = None,
+            delay: float = 0, session=None) -> Optional[int]:
+    """
+    Add a job in the caller's transaction (it runs only if that commits).
+    With `key`, enqueueing is idempotent: if a job with that key exists,
+    nothing is added and None is returned. Safe to call from flush hooks.
+    """
+    connection = (session or db.session).connection()
+    spec = JOBS.get(name)
+    now = datetime.utcnow()
+    insert, _, _ = upsert_dialect(connection)
+    stmt = insert(Job).values(
+        name=name, payload=payload or {}, key=key, status="queued", attempts=0,
+        max_attempts=spec.max_attempts if spec else DEFAULT_MAX_ATTEMPTS,
+        run_at=now + timedelta(seconds=delay), created_at=now,
+    )
+    if key is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["key"])
+    return connection.execute(stmt.returning(Job.id)).scalar()
+
+
+# ================== Claiming ================== #
+@dataclass(frozen=True)
+class ClaimedJob:
+    id: int
+    name: str
+    payload: Dict
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    started_at: datetime
+
+
+def _claim_statement(worker_id: str, limit: int, names: List[str], now: datetime):
+    """UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED) RETURNING ..."""
+    due = (
+        select(Job.id)
+        .where(Job.status == "queued", Job.run_at <= now, Job.name.in_(names))
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    leases = {name: now + timedelta(seconds=JOBS[name].timeout) for name in names if name in JOBS}
+    default_lease = now + timedelta(seconds=DEFAULT_TIMEOUT)
+    return (
+        update(Job)
+        .where(Job.id.in_(due.scalar_subquery()), Job.status == "queued")
+        .values(
+            status="running",
+            attempts=Job.attempts + 1,
+            locked_by=worker_id,
+            locked_until=case(leases, value=Job.name, else_=default_lease) if leases else default_lease,
+            started_at=now,
+        )
+        .returning(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts, Job.run_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def claim_jobs(worker_id: str, limit: int, names) -> List[ClaimedJob]:
+    """Atomically move up to `limit` due jobs with these names to running. Caller commits."""
+    names = list(names)
+    if limit <= 0 or not names:
+        return []
+    now = datetime.utcnow()
+    rows = db.session.execute(_claim_statement(worker_id, limit, names, now)).all()
+    return sorted((ClaimedJob(*row, started_at=now) for row in rows), key=lambda j: (j.run_at, j.id))
+
+
+def renew_leases(worker_id: str, claimed: List[ClaimedJob], now: Optional[datetime] = None) -> int:
+    """Extend the leases of jobs this worker is still running (one UPDATE per name). Caller commits."""
+    now = now or datetime.utcnow()
+    ids_by_name: Dict[str, List[int]] = {}
+    for item in claimed:
+        ids_by_name.setdefault(item.name, []).append(item.id)
+    renewed = 0
+    for name, ids in ids_by_name.items():
+        timeout = JOBS[name].timeout if name in JOBS else DEFAULT_TIMEOUT
+        result = db.session.execute(
+            update(Job)
+            .where(Job.id.in_(ids), Job.status == "running", Job.locked_by == worker_id)
+            .values(locked_until=now + timedelta(seconds=timeout))
+            .execution_options(synchronize_session=False)
+        )
+        renewed += result.rowcount
+    return renewed
+
+
+def retry_delay(attempts: int, base: float, cap: float) -> float:
+    """Exponential backoff with ±25% jitter: base, 2·base, 4·base, … capped at `cap`."""
+    return min(base * 2 ** (attempts - 1), cap) * random.uniform(0.75, 1.25)
+
+
+def _retry_delay_for(config, attempts: int) -> float:
+    return retry_delay(
+        attempts,
+        float(config.get("JOB_RETRY_BASE_SECONDS", 10)),
+        float(config.get("JOB_RETRY_MAX_SECONDS", 3600)),
+    )
+
+
+def requeue_expired(now: Optional[datetime] = None) -> int:
+    """
+    Expired leases count as failed attempts: requeue with the usual backoff,
+    or fail (and finish, so purge_jobs frees the key) once out of attempts.
+    Caller commits.
+    """
+    now = now or datetime.utcnow()
+    expired = db.session.execute(
+        select(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts)
+        .where(Job.status == "running", Job.locked_until < now)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    requeued = 0
+    for job_id, name, payload, attempts, max_attempts in expired:
+        if attempts >= max_attempts:
+            outcome = {"status": "failed", "finished_at": now}
+        else:
+            outcome = {"status": "queued",
+                       "run_at": now + timedelta(seconds=_retry_delay_for(current_app.config, attempts))}
+        result = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "running", Job.attempts == attempts)
+            .values(locked_by=None, locked_until=None,
+                    last_error="lease expired (worker died or job timed out)", **outcome)
+            .execution_options(synchronize_session=False)
+        )
+        requeued += result.rowcount
+        if result.rowcount and outcome["status"] == "failed":
+            run_failure_hook(name, payload)
+    return requeued
+
+
+def run_failure_hook(name: str, payload: Optional[Dict]) -> None:
+    """Run a job's on_failure hook in a savepoint; its errors are logged, not raised. Caller commits."""
+    spec = JOBS.get(name)
+    if spec is None or spec.on_failure is None:
+        return
+    try:
+        with db.session.begin_nested():
+            spec.on_failure(**(payload or {}))
+    except Exception as e:
+        current_app.logger.exception("❌ on_failure hook of job %s failed: %s", name, e)
+
+
+def _finish(claimed: ClaimedJob, **values) -> bool:
+    """Record an outcome unless the lease was lost meanwhile (the job was requeued)."""
+    result = db.session.execute(
+        update(Job)
+        .where(Job.id == claimed.id, Job.status == "running", Job.attempts == claimed.attempts)
+        .values(locked_by=None, locked_until=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return bool(result.rowcount)
+
+
+def run_claimed(app, claimed: ClaimedJob) -> str:
+    """Run one claimed job in its own app context; returns done | retry | failed | lost."""
+    config = app.config
+    with app.app_context():
+        start = time.perf_counter()
+        try:
+            JOBS[claimed.name].func(**(claimed.payload or {}))
+            db.session.commit()
+            outcome, error = "done", None
+        except Exception as e:
+            db.session.rollback()
+            error = f"{type(e).__name__}: {e}"[:255]
+            outcome = "retry" if claimed.attempts < claimed.max_attempts else "failed"
+
+        timing = {
+            "wait_ms": (claimed.started_at - claimed.run_at).total_seconds() * 1000,
+            "run_ms": (time.perf_counter() - start) * 1000,
+            "finished_at": datetime.utcnow(),
+        }
+        if outcome == "retry":
+            delay = _retry_delay_for(config, claimed.attempts)
+            kept = _finish(claimed, status="queued", last_error=error,
+                           run_at=datetime.utcnow() + timedelta(seconds=delay), **timing)
+        else:
+            kept = _finish(claimed, status=outcome, last_error=error, **timing)
+            if kept and outcome == "failed":
+                run_failure_hook(claimed.name, claimed.payload)
+                db.session.commit()
+
+        if not kept:
+            app.logger.warning("⚠️ Job %s (%s) lost its lease; outcome not recorded", claimed.id, claimed.name)
+            return "lost"
+        if outcome == "done":
+            app.logger.info("✅ Job %s (%s) done in %.1f ms (waited %.1f ms)",
+                            claimed.id, claimed.name, timing["run_ms"], timing["wait_ms"])
+        elif outcome == "retry":
+            app.logger.warning("🔁 Job %s (%s) attempt %s/%s failed, retrying in %.0fs: %s",
+                               claimed.id, claimed.name, claimed.attempts, claimed.max_attempts, delay, error)
+        else:
+            app.logger.error("❌ Job %s (%s) failed after %s attempt(s): %s",
+                             claimed.id, claimed.name, claimed.attempts, error)
+        return outcome
+
+
+# ================== Worker ================== #
+class Worker:
+    """
+    Polls the jobs table and runs due jobs on a thread pool. `concurrency`
+    bounds jobs running in this process; a JobSpec's own `concurrency`
+    bounds that job name within it. Between polls the worker renews the
+    leases of its running jobs every third of their timeout. Run several
+    workers to scale out.
+    """
+
+    def __init__(self, app, concurrency: Optional[int] = None, poll_interval: Optional[float] = None,
+                 names=None):
+        self.app = app
+        self.concurrency = int(concurrency or app.config.get("JOB_WORKER_CONCURRENCY", 4))
+        self.poll_interval = float(poll_interval or app.config.get("JOB_POLL_INTERVAL", 1.0))
+        self.names = list(names) if names else None
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.counts = {"done": 0, "retry": 0, "failed": 0, "lost": 0}
+        self._running: Dict[str, int] = {}
+        self._in_progress: Dict[int, ClaimedJob] = {}
+        self._overdue: Set[int] = set()
+        self._next_heartbeat = float("inf")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _in_flight(self) -> int:
+        with self._lock:
+            return sum(self._running.values())
+
+    def _claim(self, free: int) -> List[ClaimedJob]:
+        """Claim up to `free` jobs; names with a concurrency limit only up to their spare room."""
+        with self._lock:
+            running = dict(self._running)
+        claimed: List[ClaimedJob] = []
+        unlimited = []
+        for name, spec in JOBS.items():
+            if self.names is not None and name not in self.names:
+                continue
+            if spec.concurrency is None:
+                unlimited.append(name)
+                continue
+            room = min(free - len(claimed), spec.concurrency - running.get(name, 0))
+            claimed += claim_jobs(self.worker_id, room, [name])
+        claimed += claim_jobs(self.worker_id, free - len(claimed), unlimited)
+        return claimed
+
+    def _run(self, claimed: ClaimedJob) -> None:
+        try:
+            outcome = run_claimed(self.app, claimed)
+        except Exception as e:  # bookkeeping failed (e.g. DB down); the lease will expire
+            self.app.logger.exception("❌ Worker could not record job %s: %s", claimed.id, e)
+            outcome = "lost"
+        with self._lock:
+            self._running[claimed.name] -= 1
+            self._in_progress.pop(claimed.id, None)
+            self._overdue.discard(claimed.id)
+            self.counts[outcome] += 1
+
+    def _schedule_heartbeat(self, claimed: List[ClaimedJob]) -> None:
+        """Renew before a third of the shortest lease among `claimed` has passed."""
+        if claimed:
+            soonest = time.monotonic() + min(self._timeout(item) for item in claimed) / 3
+            self._next_heartbeat = min(self._next_heartbeat, soonest)
+
+    @staticmethod
+    def _timeout(claimed: ClaimedJob) -> float:
+        spec = JOBS.get(claimed.name)
+        return spec.timeout if spec else DEFAULT_TIMEOUT
+
+    def heartbeat(self) -> int:
+        """Renew the leases of jobs still running here once due; returns leases renewed."""
+        with self._lock:
+            running = list(self._in_progress.values())
+        if not running:
+            self._next_heartbeat = float("inf")
+            return 0
+        if time.monotonic() < self._next_heartbeat:
+            return 0
+
+        now = datetime.utcnow()
+        with self.app.app_context():
+            renewed = renew_leases(self.worker_id, running, now)
+            db.session.commit()
+        self._next_heartbeat = float("inf")
+        self._schedule_heartbeat(running)
+
+        for item in running:
+            if item.id not in self._overdue and (now - item.started_at).total_seconds() > self._timeout(item):
+                self._overdue.add(item.id)
+                self.app.logger.warning("⏱️ Job %s (%s) is running past its %ss timeout",
+                                        item.id, item.name, self._timeout(item))
+        return renewed
+
+    def poll(self, pool: ThreadPoolExecutor) -> int:
+        """Requeue expired leases, claim what fits and submit it; returns jobs claimed."""
+        free = self.concurrency - self._in_flight()
+        if free <= 0:
+            return 0
+        with self.app.app_context():
+            requeue_expired()
+            claimed = self._claim(free)
+            db.session.commit()
+
+        for item in claimed:
+            with self._lock:
+                self._running[item.name] = self._running.get(item.name, 0) + 1
+                self._in_progress[item.id] = item
+            pool.submit(self._run, item)
+        self._schedule_heartbeat(claimed)
+        return len(claimed)
+
+    def run(self, burst: bool = False) -> Dict[str, int]:
+        """Work until stop() (or, with `burst`, until no job is due). Returns outcome counts."""
+        self.app.logger.info("👷 Job worker %s started (concurrency=%s, jobs=%s)",
+                             self.worker_id, self.concurrency, ", ".join(self.names or sorted(JOBS)))
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job") as pool:
+            while not self._stop.is_set():
+                try:
+                    self.heartbeat()
+                    started = self.poll(pool)
+                except Exception as e:
+                    self.app.logger.exception("❌ Job poll failed: %s", e)
+                    started = 0
+                if burst and not started and not self._in_flight():
+                    break
+                if not started:
+                    self._stop.wait(self.poll_interval)
+        self.app.logger.info("👷 Job worker %s stopped (%s)", self.worker_id,
+                             ", ".join(f"{k}={v}" for k, v in self.counts.items()))
+        return dict(self.counts)
+
+
+# ================== Maintenance & Metrics ================== #
+def queue_depth() -> Dict[str, int]:
+    """Jobs per status (one GROUP BY on the status index)."""
+    rows = db.session.execute(select(Job.status, func.count()).group_by(Job.status)).all()
+    return {status: count for status, count in rows}
+
+
+def job_stats(since: datetime) -> List[Dict]:
+    """Per-name outcome counts and timing for jobs finished since `since`."""
+    rows = db.session.execute(
+        select(
+            Job.name, Job.status, func.count(),
+            func.avg(Job.wait_ms), func.max(Job.wait_ms),
+            func.avg(Job.run_ms), func.max(Job.run_ms),
+            func.sum(Job.attempts),
+        )
+        .where(Job.finished_at >= since)
+        .group_by(Job.name, Job.status)
+        .order_by(Job.name, Job.status)
+    ).all()
+    return [
+        {
+            "name": name, "status": status, "count": count, "attempts": int(attempts or 0),
+            "avg_wait_ms": avg_wait, "max_wait_ms": max_wait, "avg_run_ms": avg_run, "max_run_ms": max_run,
+        }
+        for name, status, count, avg_wait, max_wait, avg_run, max_run, attempts in rows
+    ]
+
+
+def purge_jobs(older_than: datetime) -> int:
+    """Delete finished jobs (done or failed) older than a cutoff; frees their dedup keys. Caller commits."""
+    result = db.session.execute(
+        delete(Job)
+        .where(Job.status.in_(("done", "failed")), Job.finished_at < older_than)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
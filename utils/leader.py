@@ -0,0 +1,106 @@
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from functools import wraps
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from utils.extensions import db
+from models.scheduler_lock import SchedulerLock
+
+
+class LeaderElector:
+    """
+    Lease-based leader election over the scheduler_locks table.
+
+    Every candidate calls heartbeat() periodically. The holder renews its
+    lease; anyone else takes over only once the lease is older than `ttl`
+    seconds, so a dead leader is replaced within roughly one ttl.
+    Works on any SQL backend (plain conditional UPDATE + INSERT).
+    """
+
+    def __init__(self, app, name: str = "scheduler", ttl: int = 30):
+        self.app = app
+        self.name = name
+        self.ttl = ttl
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._leased_until = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_leader(self) -> bool:
+        """True while our last successful renewal is still within the lease."""
+        with self._lock:
+            return self._leased_until is not None and datetime.utcnow() < self._leased_until
+
+    def heartbeat(self) -> bool:
+        """Acquire or renew the lease. Returns True if this process is leader."""
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=self.ttl)
+        table = SchedulerLock.__table__
+
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as conn:
+                    renewed = conn.execute(
+                        table.update()
+                        .where(
+                            table.c.name == self.name,
+                            or_(table.c.holder == self.identity, table.c.heartbeat_at < stale_before),
+                        )
+                        .values(holder=self.identity, heartbeat_at=now)
+                    ).rowcount == 1
+
+                if not renewed:
+                    try:
+                        with db.engine.begin() as conn:
+                            conn.execute(
+                                table.insert().values(
+                                    name=self.name, holder=self.identity, heartbeat_at=now
+                                )
+                            )
+                        renewed = True
+                    except IntegrityError:
+                        renewed = False  # someone else holds a live lease
+        except Exception as e:
+            self.app.logger.warning("⚠️ Leader heartbeat failed (%s): %s", self.name, e)
+            renewed = False
+
+        with self._lock:
+            was_leader = self._leased_until is not None and now < self._leased_until
+            self._leased_until = now + timedelta(seconds=self.ttl) if renewed else None
+
+        if renewed and not was_leader:
+            self.app.logger.info("👑 %s became %s leader", self.identity, self.name)
+        elif was_leader and not renewed:
+            self.app.logger.warning("⚠️ %s lost %s leadership", self.identity, self.name)
+        return renewed
+
+    def release(self) -> None:
+        """Give up the lease immediately so another process can take over."""
+        with self._lock:
+            self._leased_until = None
+        try:
+            table = SchedulerLock.__table__
+            with self.app.app_context(), db.engine.begin() as conn:
+                conn.execute(
+                    table.update()
+                    .where(table.c.name == self.name, table.c.holder == self.identity)
+                    .values(heartbeat_at=datetime(1970, 1, 1))
+                )
+        except Exception as e:
+            self.app.logger.warning("⚠️ Failed to release %s lease: %s", self.name, e)
+
+
+def leader_only(elector: LeaderElector, func):
+    """Wrap a scheduled job so it runs only in the current leader process."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not elector.is_leader:
+            return None
+        return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,67 @@
+"""
+Money as integer minor units (cents).
+
+Amounts are stored in BIGINT columns as cents, so SUM/MIN/MAX in SQL and
+int64 arithmetic in NumPy are exact. Application code keeps working in
+currency units: the Money column type accepts int/float/Decimal/str on the
+way in and returns a 2-place Decimal on the way out. Convert to float only
+at the JSON edge.
+"""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal("0.01")
+
+
+# ================== Conversions ================== #
+def to_money(value) -> Optional[Decimal]:
+    """Round any numeric value to a 2-place Decimal (half-up). None passes through."""
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        amount = value
+    else:
+        # str() first so 0.1 becomes Decimal("0.1"), not its binary expansion
+        amount = Decimal(str(value))
+    if not amount.is_finite():
+        raise InvalidOperation(f"not a finite amount: {value!r}")
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def to_cents(value) -> Optional[int]:
+    """Currency units → integer cents."""
+    amount = to_money(value)
+    return None if amount is None else int(amount.scaleb(2))
+
+
+def from_cents(cents) -> Optional[Decimal]:
+    """Integer cents → 2-place Decimal."""
+    return None if cents is None else Decimal(int(cents)).scaleb(-2)
+
+
+def cents_array(values) -> np.ndarray:
+    """
+    Vector of amounts in currency units → int64 cents, rounding half away
+    from zero like to_cents(). Float noise (0.285 * 100 → 28.4999…) is
+    absorbed by rounding the scaled value to 4 places first.
+    """
+    scaled = np.round(np.asarray(values, dtype=np.float64) * 100, 4)
+    return (np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)).astype(np.int64)
+
+
+# ================== Column Type ================== #
+class Money(TypeDecorator):
+    """BIGINT cents in the database, Decimal currency units in Python."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return from_cents(value)
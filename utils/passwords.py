@@ -0,0 +1,149 @@
+"""
+Password hashing off the request thread.
+
+scrypt/pbkdf2 are CPU-bound and hold the GIL for tens of milliseconds, so
+hashing inline lets a login burst stall every other request on the worker.
+Here hashes are computed in a small process pool (PASSWORD_HASH_WORKERS,
+0 = inline) behind a bounded number of in-flight jobs
+(PASSWORD_HASH_MAX_PENDING); callers beyond that wait up to
+PASSWORD_HASH_TIMEOUT seconds and then get PasswordHasherBusy.
+
+The algorithm and cost come from PASSWORD_HASH_METHOD (any werkzeug
+method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000"); stored
+hashes made with other parameters are flagged by needs_rehash() and
+upgraded on the next successful login.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, Optional
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from utils.instrumentation import LATENCY_BUCKETS, Counter, Histogram, register_metric
+
+hash_duration = register_metric(Histogram(
+    "password_hash_seconds", "Wall time to hash or verify a password (including queueing).",
+    ("op",), LATENCY_BUCKETS))
+hash_rejected = register_metric(Counter(
+    "password_hash_rejected_total", "Hash jobs rejected because the pool stayed saturated.", ("op",)))
+login_attempts = register_metric(Counter(
+    "auth_login_total", "Login attempts by outcome.", ("outcome",)))
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Every hashing slot stayed busy for PASSWORD_HASH_TIMEOUT seconds."""
+
+
+class PasswordHasher:
+    """Bounded hashing service; one process pool per (gunicorn worker) process."""
+
+    def __init__(self):
+        self.method = "scrypt"
+        self.salt_length = 16
+        self.workers = 0
+        self.max_pending = 32
+        self.timeout = 10.0
+        self._canonical_method: Optional[str] = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._in_flight = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def canonical_method(self) -> str:
+        # werkzeug expands defaults ("scrypt" → "scrypt:32768:8:1"); compare on the expanded form
+        if self._canonical_method is None:
+            probe = generate_password_hash("probe", method=self.method, salt_length=1)
+            self._canonical_method = probe.split("$", 1)[0]
+        return self._canonical_method
+
+    def configure(self, method: str, salt_length: int, workers: int, max_pending: int, timeout: float) -> None:
+        self.shutdown()
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending)
+        self.timeout = timeout
+        self._canonical_method = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            # A pool inherited through fork (gunicorn --preload) is unusable in the child
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, op: str, func, *args):
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            hash_rejected.inc((op,))
+            raise PasswordHasherBusy(f"password {op} queue is full")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            if not self.workers:
+                return func(*args)
+            try:
+                return self._executor().submit(func, *args).result(timeout=self.timeout)
+            except FutureTimeout:
+                hash_rejected.inc((op,))
+                raise PasswordHasherBusy(f"password {op} timed out")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            hash_duration.observe((op,), time.perf_counter() - start)
+
+    def hash(self, password: str) -> str:
+        return self._run("hash", generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run("verify", check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return password_hash.split("$", 1)[0] != self.canonical_method
+
+    def stats(self) -> Dict:
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "method": self.canonical_method,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": in_flight,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and self._pool_pid == os.getpid():
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
+atexit.register(password_hasher.shutdown)
+
+
+def configure_password_hasher(app) -> None:
+    """Apply PASSWORD_HASH_* settings (the pool itself starts on first use)."""
+    password_hasher.configure(
+        method=app.config.get("PASSWORD_HASH_METHOD", "scrypt"),
+        salt_length=int(app.config.get("PASSWORD_SALT_LENGTH", 16)),
+        workers=int(app.config.get("PASSWORD_HASH_WORKERS", 2)),
+        max_pending=int(app.config.get("PASSWORD_HASH_MAX_PENDING", 32)),
+        timeout=float(app.config.get("PASSWORD_HASH_TIMEOUT", 10)),
+    )
+    app.logger.info(
+        "🔐 Password hashing: %s (workers=%s, max pending=%s)",
+        password_hasher.canonical_method, password_hasher.workers, password_hasher.max_pending,
+    )
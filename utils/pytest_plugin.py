@@ -0,0 +1,46 @@
+"""
+Pytest plugin exposing the SQL query budget.
+
+Load with `pytest -p utils.pytest_plugin` or `pytest_plugins = ["utils.pytest_plugin"]`
+in a conftest, then:
+
+    def test_trends(client, auth_headers, query_budget):
+        with query_budget(max_queries=6, max_repeats=2):
+            client.get("/trends/", headers=auth_headers)
+
+The block fails with QueryBudgetExceeded (an AssertionError) listing the
+offending statements when it runs more than `max_queries` statements, or
+the same normalized statement more than `max_repeats` times.
+
+    @pytest.mark.query_budget(max_queries=6)
+    def test_trends(client, auth_headers): ...
+
+applies the same budget to the whole test body; queries run by fixtures
+(setup and teardown) are not counted.
+"""
+import pytest
+
+from utils.query_inspector import QueryRecorder
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries=None, max_repeats=None): fail the test if it exceeds the query budget",
+    )
+
+
+@pytest.fixture
+def query_budget():
+    """Factory for QueryRecorder blocks; returns the recorder for further assertions."""
+    return QueryRecorder
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """Apply @pytest.mark.query_budget to the test body only (not fixture setup/teardown)."""
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+    with QueryRecorder(*marker.args, **marker.kwargs):
+        return (yield)
@@ -0,0 +1,184 @@
+"""
+Development-time SQL inspection.
+
+- N+1 detection: within one request, warn when the same normalized
+  statement runs more than SQL_N_PLUS_ONE_THRESHOLD times (typically a
+  lazy `user.expenses` / `user.salaries` load inside a loop).
+- Slow queries: log any statement slower than SQL_SLOW_QUERY_MS together
+  with its EXPLAIN plan.
+- QueryRecorder: context manager that enforces a query budget; exposed to
+  pytest as the `query_budget` fixture in utils/pytest_plugin.py.
+
+Enabled by SQL_INSPECT_ENABLED (defaults to the app's debug flag).
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.sql")
+
+_settings = {"enabled": False, "slow_ms": 200.0, "explain": True}
+_recorders: List["QueryRecorder"] = []
+_recorders_lock = threading.Lock()
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|%s|\?|:\w+|\$\d+")
+_IN_LIST = re.compile(r"\bIN \((?:\?, )*\?\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"(VALUES \(\?(?:, \?)*\))(?:, \(\?(?:, \?)*\))+", re.IGNORECASE)
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse literals, placeholders, IN-lists and multi-row VALUES so repeats compare equal."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING.sub("?", sql)
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (?)", sql)
+    sql = _VALUES_LIST.sub(r"\1", sql)
+    return sql
+
+
+# ================== Query Budget ================== #
+class QueryBudgetExceeded(AssertionError):
+    """Raised by QueryRecorder when a block issues too many statements."""
+
+
+class QueryRecorder:
+    """
+    Record the statements executed on this thread while active.
+
+        with QueryRecorder(max_queries=5, max_repeats=2) as rec:
+            client.get("/trends/")
+        rec.count, rec.repeats()
+
+    Raises QueryBudgetExceeded on exit when a limit is crossed.
+    """
+
+    def __init__(self, max_queries: Optional[int] = None, max_repeats: Optional[int] = None):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.statements: List[Tuple[str, float]] = []
+        self._thread = threading.get_ident()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeats(self) -> Counter:
+        return Counter(normalize_sql(s) for s, _ in self.statements)
+
+    def __enter__(self) -> "QueryRecorder":
+        self._thread = threading.get_ident()
+        with _recorders_lock:
+            _recorders.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        with _recorders_lock:
+            _recorders.remove(self)
+        if exc_type is None:
+            self.check()
+
+    def check(self) -> None:
+        problems = []
+        if self.max_queries is not None and self.count > self.max_queries:
+            problems.append(f"{self.count} queries executed (budget {self.max_queries})")
+        if self.max_repeats is not None:
+            for sql, n in self.repeats().most_common():
+                if n <= self.max_repeats:
+                    break
+                problems.append(f"{n}× (budget {self.max_repeats}): {sql}")
+        if problems:
+            raise QueryBudgetExceeded("Query budget exceeded:\n  " + "\n  ".join(problems))
+
+
+# ================== Engine Hooks ================== #
+def _explain(cursor, statement: str, parameters, dialect: str) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    raw = cursor.connection.cursor()  # raw DBAPI cursor: no recursion into these hooks
+    try:
+        raw.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(col) for col in row) for row in raw.fetchall())
+    finally:
+        raw.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _settings["enabled"] or _recorders:
+        conn.info.setdefault("_inspect_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_inspect_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    if _recorders:
+        me = threading.get_ident()
+        with _recorders_lock:
+            for recorder in _recorders:
+                if recorder._thread == me:
+                    recorder.statements.append((statement, elapsed))
+
+    if not _settings["enabled"]:
+        return
+
+    if has_request_context():
+        seen = g.setdefault("_sql_statements", Counter())
+        seen[normalize_sql(statement)] += 1
+
+    if elapsed * 1000 >= _settings["slow_ms"]:
+        plan = ""
+        if _settings["explain"] and not executemany:
+            try:
+                plan = _explain(cursor, statement, parameters, conn.dialect.name)
+            except Exception as e:
+                plan = f"(EXPLAIN failed: {e})"
+        logger.warning(
+            "🐢 Slow query (%.1f ms): %s\nparams=%r\n%s",
+            elapsed * 1000, _WHITESPACE.sub(" ", statement), parameters, plan,
+        )
+
+
+# ================== Flask Integration ================== #
+def init_query_inspector(app: Flask) -> None:
+    """Enable N+1 / slow-query reporting when SQL_INSPECT_ENABLED (default: app.debug)."""
+    enabled = app.config.get("SQL_INSPECT_ENABLED")
+    enabled = app.debug if enabled is None else str(enabled).lower() in ("1", "true", "yes")
+    if not enabled:
+        return
+
+    _settings.update(
+        enabled=True,
+        slow_ms=float(app.config.get("SQL_SLOW_QUERY_MS", 200)),
+        explain=bool(app.config.get("SQL_EXPLAIN_SLOW", True)),
+    )
+    threshold = int(app.config.get("SQL_N_PLUS_ONE_THRESHOLD", 10))
+
+    @app.after_request
+    def _report_repeated_queries(response):
+        seen = g.pop("_sql_statements", None)
+        for sql, n in (seen or Counter()).most_common():
+            if n <= threshold:
+                break
+            logger.warning(
+                "🔁 Possible N+1 in %s %s: %d× %s", request.method, request.path, n, sql
+            )
+        return response
+
+    app.logger.info(
+        "🔍 SQL inspector enabled (N+1 threshold=%s, slow query=%sms)",
+        threshold, _settings["slow_ms"],
+    )
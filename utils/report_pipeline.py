@@ -0,0 +1,257 @@
+import csv
+import io
+import queue
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import select
+
+from utils.extensions import db, mail
+from utils.job_queue import enqueue, job
+from utils.report_utils import REPORT_COLUMNS
+from models.user import User
+from models.expense import Expense
+from models.report_delivery import ReportDelivery
+
+REPORT_SENDER = "noreply@budgettracker.com"
+DONE_STATUSES = ("sent", "empty")
+
+
+# ================== Period Helpers ================== #
+def report_period(now: Optional[datetime] = None) -> str:
+    """The month a report run covers: the calendar month before `now`."""
+    now = now or datetime.utcnow()
+    if now.month == 1:
+        return f"{now.year - 1}-12"
+    return f"{now.year}-{now.month - 1:02d}"
+
+
+def _period_bounds(period: str) -> Tuple[datetime, datetime]:
+    start = datetime.strptime(period, "%Y-%m")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+# ================== Batch Queries ================== #
+def _pending_users(period: str, after_id: int, limit: int,
+                   user_ids: Optional[Sequence[int]] = None) -> List[Tuple[int, str]]:
+    """Next page of (id, email) that have no finished delivery for `period`."""
+    done = (
+        select(ReportDelivery.user_id)
+        .where(ReportDelivery.period == period, ReportDelivery.status.in_(DONE_STATUSES))
+    )
+    stmt = (
+        select(User.id, User.email)
+        .where(User.id > after_id, User.id.not_in(done))
+        .order_by(User.id)
+        .limit(limit)
+    )
+    if user_ids is not None:
+        stmt = stmt.where(User.id.in_(user_ids))
+    return [tuple(row) for row in db.session.execute(stmt)]
+
+
+def _fetch_month_rows(user_ids: Iterable[int], start: datetime, end: datetime) -> Dict[int, List[Tuple]]:
+    """One query for the whole batch, partitioned by user in Python."""
+    stmt = (
+        select(Expense.user_id, Expense.date, Expense.amount, Expense.category, Expense.description)
+        .where(Expense.user_id.in_(list(user_ids)), Expense.date >= start, Expense.date < end)
+        .order_by(Expense.user_id, Expense.date)
+    )
+    rows: Dict[int, List[Tuple]] = defaultdict(list)
+    for user_id, date, amount, category, description in db.session.execute(stmt):
+        rows[user_id].append(
+            (date.strftime("%Y-%m-%d"), float(amount), category, description or "")
+        )
+    return rows
+
+
+# ================== Rendering ================== #
+def render_csv(rows: Sequence[Tuple]) -> bytes:
+    """Render report rows to CSV bytes (pure; safe to run in a worker pool)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(REPORT_COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _build_message(email: str, period: str, attachment: bytes) -> Message:
+    label = datetime.strptime(period, "%Y-%m").strftime("%B %Y")
+    msg = Message(
+        subject=f"Monthly Report - {label}",
+        sender=REPORT_SENDER,
+        recipients=[email],
+    )
+    msg.body = (
+        f"Hello {email},\n\n"
+        f"Please find attached your expense report for {label}.\n\n"
+        f"- Budget Tracker Team"
+    )
+    msg.attach(f"expense_report_{period}.csv", "text/csv", attachment)
+    return msg
+
+
+# ================== Progress ================== #
+def _record(user_id: int, period: str, status: str, error: Optional[str] = None) -> None:
+    delivery = ReportDelivery.query.filter_by(user_id=user_id, period=period).first()
+    if delivery is None:
+        delivery = ReportDelivery(user_id=user_id, period=period, attempts=0)
+        db.session.add(delivery)
+    delivery.status = status
+    delivery.attempts = (delivery.attempts or 0) + 1
+    delivery.error = error[:255] if error else None
+    db.session.commit()
+
+
+# ================== Sending ================== #
+def _record_quietly(app, user_id: int, period: str, status: str, error: Optional[str] = None) -> bool:
+    """_record() for the sender threads: a bookkeeping error is logged, never raised."""
+    try:
+        _record(user_id, period, status, error)
+        return True
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error("❌ Could not record %s report for user %s: %s", status, user_id, e)
+        return False
+
+
+def _sender(app, outbox: "queue.Queue", counts: Dict[str, int], lock: threading.Lock) -> None:
+    """
+    Drain the outbox over a single reused SMTP connection.
+    A failed send drops the connection; the next message reconnects.
+    A message that went out is never recorded as failed (a retry would
+    send it twice), and bookkeeping errors never stop the thread.
+    """
+    with app.app_context():
+        stack = ExitStack()
+        connection = None
+        while True:
+            item = outbox.get()
+            if item is None:
+                break
+            user_id, email, period, msg = item
+            try:
+                if connection is None:
+                    connection = stack.enter_context(mail.connect())
+                connection.send(msg)
+            except Exception as e:
+                app.logger.error("❌ Failed to send report to %s: %s", email, e)
+                db.session.rollback()
+                _record_quietly(app, user_id, period, "failed", str(e))
+                with lock:
+                    counts["failed"] += 1
+                try:
+                    stack.close()
+                except Exception:
+                    pass
+                stack, connection = ExitStack(), None
+                continue
+
+            if not _record_quietly(app, user_id, period, "sent"):
+                app.logger.warning("⚠️ Report to %s was sent but not recorded; a rerun may resend it", email)
+            with lock:
+                counts["sent"] += 1
+        try:
+            stack.close()
+        except Exception as e:
+            app.logger.warning("⚠️ Error closing SMTP connection: %s", e)
+
+
+def run_monthly_reports(
+    app,
+    period: Optional[str] = None,
+    user_ids: Optional[Sequence[int]] = None,
+    batch_size: Optional[int] = None,
+    render_workers: Optional[int] = None,
+    smtp_connections: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Batched monthly report pipeline:
+      1. page through users without a finished delivery for `period`
+      2. load the month's expenses for the whole page in one query
+      3. render CSV attachments in a thread pool
+      4. send over `smtp_connections` pooled SMTP connections
+    Progress is recorded per user, so a crashed run can simply be re-run.
+    Must be called inside an app context.
+    """
+    period = period or report_period()
+    batch_size = batch_size or int(app.config.get("REPORT_BATCH_SIZE", 500))
+    render_workers = render_workers or int(app.config.get("REPORT_RENDER_WORKERS", 4))
+    smtp_connections = smtp_connections or int(app.config.get("REPORT_SMTP_CONNECTIONS", 2))
+    start, end = _period_bounds(period)
+
+    counts = {"sent": 0, "empty": 0, "failed": 0}
+    lock = threading.Lock()
+    outbox: "queue.Queue" = queue.Queue(maxsize=smtp_connections * 20)
+    senders = [
+        threading.Thread(target=_sender, args=(app, outbox, counts, lock), daemon=True)
+        for _ in range(smtp_connections)
+    ]
+    for thread in senders:
+        thread.start()
+
+    try:
+        with ThreadPoolExecutor(max_workers=render_workers) as pool:
+            after_id = 0
+            while True:
+                users = _pending_users(period, after_id, batch_size, user_ids)
+                if not users:
+                    break
+                after_id = users[-1][0]
+
+                rows_by_user = _fetch_month_rows((uid for uid, _ in users), start, end)
+                with_rows = [(uid, email) for uid, email in users if rows_by_user.get(uid)]
+
+                for uid, email in users:
+                    if not rows_by_user.get(uid):
+                        _record(uid, period, "empty")
+                        with lock:
+                            counts["empty"] += 1
+
+                attachments = pool.map(render_csv, (rows_by_user[uid] for uid, _ in with_rows))
+                for (uid, email), attachment in zip(with_rows, attachments):
+                    outbox.put((uid, email, period, _build_message(email, period, attachment)))
+    finally:
+        for _ in senders:
+            outbox.put(None)
+        for thread in senders:
+            thread.join()
+
+    return counts
+
+
+# ================== Jobs ================== #
+@job("reports.monthly", timeout=600)
+def plan_monthly_reports(period: Optional[str] = None, user_ids: Optional[Sequence[int]] = None) -> int:
+    """
+    Fan a report run out into one reports.batch job per page of pending
+    users, so pages are spread over workers and retried independently.
+    """
+    period = period or report_period()
+    batch_size = int(current_app.config.get("REPORT_BATCH_SIZE", 500))
+    after_id, batches = 0, 0
+    while users := _pending_users(period, after_id, batch_size, user_ids):
+        after_id = users[-1][0]
+        ids = [uid for uid, _ in users]
+        key = f"reports.batch:{period}:{ids[0]}-{ids[-1]}"
+        if enqueue("reports.batch", {"period": period, "user_ids": ids}, key=key) is not None:
+            batches += 1
+    current_app.logger.info("📅 Monthly reports for %s split into %s batch job(s)", period, batches)
+    return batches
+
+
+# One batch already renders and sends on its own pools, hence one per worker
+@job("reports.batch", timeout=1800, concurrency=1)
+def send_report_batch(period: str, user_ids: Sequence[int]) -> Dict[str, int]:
+    """Send one page of reports; any failed send fails the job so it is retried (sent users are skipped)."""
+    counts = run_monthly_reports(current_app._get_current_object(), period=period, user_ids=user_ids)
+    if counts["failed"]:
+        raise RuntimeError(f"{counts['failed']} of {len(user_ids)} report(s) failed")
+    return counts
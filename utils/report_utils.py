@@ -1,9 +1,21 @@
+import csv
 import io
+import json
+from typing import Iterator, Optional, Tuple
+
 import pandas as pd
-from flask import send_file
+from flask import Response, send_file, stream_with_context
+from sqlalchemy import select
+
 from utils.extensions import db
 from models.expense import Expense
 
+REPORT_COLUMNS = ["date", "amount", "category", "description"]
+STREAM_FORMATS = {
+    "csv": ("text/csv", "expense_report.csv"),
+    "ndjson": ("application/x-ndjson", "expense_report.ndjson"),
+}
+
 
 def generate_report(user_id, format="csv"):
     """
@@ -15,14 +27,14 @@ def generate_report(user_id, format="csv"):
     expenses = (
         db.session.query(Expense)
         .filter(Expense.user_id == user_id)
-        .order_by(Expense.expense_date.desc())
+        .order_by(Expense.date.desc())
         .all()
     )
 
     # Convert to DataFrame
     data = [
         {
-            "date": e.expense_date.strftime("%Y-%m-%d"),
+            "date": e.date.strftime("%Y-%m-%d") if e.date else "",
             "amount": float(e.amount),
             "category": e.category,
             "description": e.description or "",
@@ -59,4 +71,76 @@ def generate_report(user_id, format="csv"):
         )
 
     else:
-        return None, f"Unsupported format: {format}"
\ No newline at end of file
+        return None, f"Unsupported format: {format}"
+
+
+# ================== Streaming Export ================== #
+def iter_expense_rows(user_id, batch_size: int = 1000) -> Iterator[Tuple]:
+    """
+    Yield (date, amount, category, description) tuples newest-first.
+    Uses yield_per, which turns on server-side cursors where the driver
+    supports them, so only `batch_size` rows are held at a time.
+    """
+    stmt = (
+        select(Expense.date, Expense.amount, Expense.category, Expense.description)
+        .where(Expense.user_id == user_id)
+        .order_by(Expense.date.desc(), Expense.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+    for date, amount, category, description in db.session.execute(stmt):
+        yield (
+            date.strftime("%Y-%m-%d") if date else "",
+            float(amount),
+            category,
+            description or "",
+        )
+
+
+def _csv_chunks(rows: Iterator[Tuple], chunk_size: int) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(REPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows: Iterator[Tuple], chunk_size: int) -> Iterator[str]:
+    lines, size = [], 0
+    for row in rows:
+        line = json.dumps(dict(zip(REPORT_COLUMNS, row))) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(lines)
+            lines, size = [], 0
+    yield "".join(lines)
+
+
+def stream_report(
+    user_id,
+    format: str = "csv",
+    batch_size: int = 1000,
+    chunk_size: int = 64 * 1024,
+) -> Optional[Response]:
+    """
+    Stream a user's expenses as CSV or NDJSON without materializing the
+    report; memory stays flat regardless of history length.
+    Returns None for unsupported formats.
+    """
+    if format not in STREAM_FORMATS:
+        return None
+
+    mimetype, filename = STREAM_FORMATS[format]
+    rows = iter_expense_rows(user_id, batch_size=batch_size)
+    chunks = _csv_chunks(rows, chunk_size) if format == "csv" else _ndjson_chunks(rows, chunk_size)
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -0,0 +1,236 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+from utils.extensions import db
+
+
+# ================== Backends ================== #
+class MemoryLRUBackend:
+    """Per-process LRU bounded by total payload bytes."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._data[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                self._size -= len(self._data.pop(key))
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+class SQLiteBackend:
+    """
+    Shared cache in a local SQLite file, so every gunicorn worker on the
+    host sees the same entries. Evicts least-recently-used rows once the
+    stored payloads exceed `max_bytes`.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_accessed ON response_cache (accessed_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        conn = self._conn()
+        row = conn.execute("SELECT value FROM response_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO response_cache (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, value, len(value), time.time()),
+        )
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = conn.execute(
+                "SELECT key, size FROM response_cache ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if oldest is None:
+                break
+            conn.execute("DELETE FROM response_cache WHERE key = ?", (oldest[0],))
+            total -= oldest[1]
+            self.evictions += 1
+
+    def delete_prefix(self, prefix: str) -> None:
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        self._conn().execute(
+            "DELETE FROM response_cache WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",)
+        )
+
+    def usage(self) -> Dict[str, int]:
+        entries, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache"
+        ).fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+
+# ================== Facade ================== #
+class ResponseCache:
+    """
+    Cache of serialized read-endpoint payloads, keyed by user and data
+    version. Disabled (every lookup misses) until configured.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(user_id: int, etag: str) -> str:
+        return f"u{user_id}:{etag}"
+
+    def configure(self, backend) -> None:
+        self.backend = backend
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def get(self, user_id: int, etag: str) -> Optional[bytes]:
+        if self.backend is None:
+            return None
+        try:
+            value = self.backend.get(self.key(user_id, etag))
+        except sqlite3.Error:
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, user_id: int, etag: str, value: bytes) -> None:
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(self.key(user_id, etag), value)
+        except sqlite3.Error:
+            pass  # the cache is best-effort
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached payload for a user (entries are also unreachable once the version moves on)."""
+        if self.backend is None:
+            return
+        try:
+            self.backend.delete_prefix(f"u{user_id}:")
+        except sqlite3.Error:
+            pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        stats = {
+            "backend": self.backend.name if self.backend else "none",
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+            "evictions": self.backend.evictions if self.backend else 0,
+        }
+        if self.backend is not None:
+            try:
+                stats.update(self.backend.usage())
+            except sqlite3.Error:
+                pass
+        return stats
+
+
+response_cache = ResponseCache()
+
+
+# ================== Setup & Invalidation ================== #
+def _after_commit(session) -> None:
+    for user_id in session.info.pop("bumped_user_ids", ()):
+        response_cache.invalidate_user(user_id)
+
+
+def _after_rollback(session) -> None:
+    session.info.pop("bumped_user_ids", None)
+
+
+def configure_response_cache(app) -> None:
+    """
+    Pick the backend from RESPONSE_CACHE_BACKEND (memory | sqlite | none)
+    and hook invalidation onto committed writes.
+    """
+    backend_name = str(app.config.get("RESPONSE_CACHE_BACKEND", "memory")).lower()
+    max_bytes = int(app.config.get("RESPONSE_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+
+    if backend_name == "sqlite":
+        path = app.config.get("RESPONSE_CACHE_PATH") or os.path.join(
+            app.instance_path, "response_cache.sqlite3"
+        )
+        response_cache.configure(SQLiteBackend(path, max_bytes))
+    elif backend_name == "memory":
+        response_cache.configure(MemoryLRUBackend(max_bytes))
+    else:
+        response_cache.configure(None)
+
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
+
+    app.logger.info("🗄️ Response cache backend: %s", response_cache.stats()["backend"])
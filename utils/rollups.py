@@ -0,0 +1,186 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select
+
+from utils.extensions import db
+from utils.money import to_money
+from utils.expense_queries import year_month
+from utils.sql_compat import upsert_dialect
+from models.expense import Expense
+from models.expense_rollup import ExpenseRollup
+
+UNKNOWN_MONTH = "Unknown"
+DEFAULT_CATEGORY = "Miscellaneous"
+
+BucketKey = Tuple[int, str, str]  # (user_id, year_month, category)
+
+
+# ================== Bucket Helpers ================== #
+def bucket_key(user_id: int, date: Optional[datetime], category: Optional[str]) -> BucketKey:
+    """Map an expense's fields to its rollup bucket."""
+    month = date.strftime("%Y-%m") if date else UNKNOWN_MONTH
+    return user_id, month, category or DEFAULT_CATEGORY
+
+
+def _month_bounds(month: str) -> Tuple[datetime, datetime]:
+    start = datetime.strptime(month, "%Y-%m")
+    if start.month == 12:
+        return start, start.replace(year=start.year + 1, month=1)
+    return start, start.replace(month=start.month + 1)
+
+
+def _aggregate_select():
+    """GROUP BY (user, month, category) over raw expenses, in rollup column order."""
+    month = func.coalesce(year_month(Expense.date), UNKNOWN_MONTH)
+    category = func.coalesce(Expense.category, DEFAULT_CATEGORY)
+    return select(
+        Expense.user_id,
+        month,
+        category,
+        func.coalesce(func.sum(Expense.amount), 0),
+        func.count(Expense.id),
+        func.min(Expense.amount),
+        func.max(Expense.amount),
+    ).group_by(Expense.user_id, month, category)
+
+
+_ROLLUP_COLUMNS = [
+    "user_id", "year_month", "category",
+    "total_amount", "expense_count", "min_amount", "max_amount",
+]
+
+
+# ================== Incremental Maintenance ================== #
+def apply_rollup_deltas(connection, deltas: Dict[BucketKey, list]) -> None:
+    """
+    Upsert additive deltas into expense_rollups.
+    `deltas` maps bucket → [total, count, min, max] for newly inserted rows,
+    amounts as Decimal currency units (stored as exact cents).
+    """
+    insert, least, greatest = upsert_dialect(connection)
+    for (user_id, month, category), (total, count, low, high) in deltas.items():
+        stmt = insert(ExpenseRollup).values(
+            user_id=user_id,
+            year_month=month,
+            category=category,
+            total_amount=total,
+            expense_count=count,
+            min_amount=low,
+            max_amount=high,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "year_month", "category"],
+            set_={
+                "total_amount": ExpenseRollup.total_amount + stmt.excluded.total_amount,
+                "expense_count": ExpenseRollup.expense_count + stmt.excluded.expense_count,
+                "min_amount": least(ExpenseRollup.min_amount, stmt.excluded.min_amount),
+                "max_amount": greatest(ExpenseRollup.max_amount, stmt.excluded.max_amount),
+            },
+        )
+        connection.execute(stmt)
+
+
+def recompute_buckets(connection, keys: Iterable[BucketKey]) -> None:
+    """
+    Recompute buckets from raw rows. Used when an update or delete makes
+    min/max non-derivable; each bucket is a bounded (user_id, date) range scan.
+    """
+    for user_id, month, category in keys:
+        connection.execute(
+            ExpenseRollup.__table__.delete().where(
+                ExpenseRollup.user_id == user_id,
+                ExpenseRollup.year_month == month,
+                ExpenseRollup.category == category,
+            )
+        )
+
+        source = _aggregate_select().where(Expense.user_id == user_id)
+        if month == UNKNOWN_MONTH:
+            source = source.where(Expense.date.is_(None))
+        else:
+            start, end = _month_bounds(month)
+            source = source.where(Expense.date >= start, Expense.date < end)
+        if category == DEFAULT_CATEGORY:
+            source = source.where(func.coalesce(Expense.category, DEFAULT_CATEGORY) == category)
+        else:
+            source = source.where(Expense.category == category)
+
+        connection.execute(
+            ExpenseRollup.__table__.insert().from_select(_ROLLUP_COLUMNS, source)
+        )
+
+
+def rebuild_rollups(user_id: Optional[int] = None) -> int:
+    """
+    Backfill expense_rollups from the expenses table (all users or one).
+    Caller is responsible for committing. Returns the number of buckets written.
+    """
+    delete = ExpenseRollup.__table__.delete()
+    source = _aggregate_select()
+    if user_id is not None:
+        delete = delete.where(ExpenseRollup.user_id == user_id)
+        source = source.where(Expense.user_id == user_id)
+
+    db.session.execute(delete)
+    db.session.execute(ExpenseRollup.__table__.insert().from_select(_ROLLUP_COLUMNS, source))
+
+    query = db.session.query(func.count()).select_from(ExpenseRollup)
+    if user_id is not None:
+        query = query.filter(ExpenseRollup.user_id == user_id)
+    return query.scalar()
+
+
+# ================== Session Hooks ================== #
+_TRACKED_FIELDS = ("user_id", "date", "category", "amount")
+
+
+def _previous_values(obj) -> Dict:
+    """Pre-flush values of the fields that determine an expense's bucket."""
+    state = inspect(obj)
+    previous = {}
+    for field in _TRACKED_FIELDS:
+        history = state.attrs[field].history
+        previous[field] = history.deleted[0] if history.deleted else getattr(obj, field)
+    return previous
+
+
+def _after_flush(session, flush_context) -> None:
+    """Keep expense_rollups in step with ORM inserts, updates and deletes."""
+    deltas: Dict[BucketKey, list] = defaultdict(lambda: [Decimal(0), 0, None, None])
+    stale = set()
+
+    for obj in session.new:
+        if isinstance(obj, Expense):
+            amount = to_money(obj.amount or 0)
+            delta = deltas[bucket_key(obj.user_id, obj.date, obj.category)]
+            delta[0] += amount
+            delta[1] += 1
+            delta[2] = amount if delta[2] is None else min(delta[2], amount)
+            delta[3] = amount if delta[3] is None else max(delta[3], amount)
+
+    for obj in session.dirty:
+        if isinstance(obj, Expense) and session.is_modified(obj, include_collections=False):
+            old = _previous_values(obj)
+            stale.add(bucket_key(old["user_id"], old["date"], old["category"]))
+            stale.add(bucket_key(obj.user_id, obj.date, obj.category))
+
+    for obj in session.deleted:
+        if isinstance(obj, Expense):
+            old = _previous_values(obj)
+            stale.add(bucket_key(old["user_id"], old["date"], old["category"]))
+
+    if not deltas and not stale:
+        return
+
+    connection = session.connection()
+    apply_rollup_deltas(connection, {k: v for k, v in deltas.items() if k not in stale})
+    recompute_buckets(connection, stale)
+
+
+def register_rollup_listeners() -> None:
+    """Attach the rollup maintenance hook to the app session (idempotent)."""
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
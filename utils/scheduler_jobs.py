@@ -1,63 +1,33 @@
-from flask_mail import Message
-from datetime import datetime
+import atexit
 from typing import Optional
 
 from models.user import User
-from utils.report_utils import generate_report  # ✅ ensures report generation
+from utils.extensions import db
+from utils.job_queue import enqueue
+from utils.report_pipeline import report_period
+from utils.leader import LeaderElector, leader_only
 
 
 # ---------------- JOBS ---------------- #
-def monthly_report_job(app, single_user: Optional[User] = None) -> None:
+def monthly_report_job(app, single_user: Optional[User] = None, period: Optional[str] = None) -> Optional[int]:
     """
-    Send monthly expense reports via email (CSV by default).
-    Runs on the 1st day of each month at 8 AM (server time).
+    Queue last month's expense reports (CSV attachments by email).
+    Runs on the 1st day of each month at 8 AM (server time); the work
+    itself runs on the job workers (reports.monthly → reports.batch).
+    The job key makes a full run enqueue at most once per period.
     """
     with app.app_context():
-        app.logger.info("📅 Running monthly report job...")
+        period = period or report_period()
+        user_ids = [single_user.id] if single_user else None
+        key = None if single_user else f"reports.monthly:{period}"
+        job_id = enqueue("reports.monthly", {"period": period, "user_ids": user_ids}, key=key)
+        db.session.commit()
 
-        # Get users (all or single)
-        users = [single_user] if single_user else User.query.all()
-
-        for user in users:
-            try:
-                # ✅ Generate CSV report
-                response = generate_report(user.id, format="csv")
-                if not response:
-                    app.logger.warning("⚠️ No expenses found for %s", user.email)
-                    continue
-
-                # Extract CSV bytes from Flask response
-                report_data = (
-                    response.response[0]
-                    if isinstance(response.response, list)
-                    else response.response
-                )
-
-                from utils.extensions import mail  # lazy import avoids circular deps
-
-                msg = Message(
-                    subject=f"Monthly Report - {datetime.now().strftime('%B %Y')}",
-                    sender="noreply@budgettracker.com",
-                    recipients=[user.email],
-                )
-                msg.body = (
-                    f"Hello {user.email},\n\n"
-                    f"Please find attached your monthly expense report.\n\n"
-                    f"- Budget Tracker Team"
-                )
-                msg.attach(
-                    "expense_report.csv",
-                    "text/csv",
-                    report_data,
-                )
-
-                mail.send(msg)
-                app.logger.info("✅ Report sent to %s", user.email)
-
-            except Exception as e:
-                app.logger.error("❌ Failed to send report to %s: %s", user.email, e)
-
-        app.logger.info("📅 Monthly report job completed.")
+        if job_id is None:
+            app.logger.info("📅 Monthly reports for %s already queued", period)
+        else:
+            app.logger.info("📅 Monthly reports for %s queued (job %s)", period, job_id)
+        return job_id
 
 
 def sample_job(app) -> None:
@@ -67,14 +37,30 @@ def sample_job(app) -> None:
 
 
 # ---------------- JOB REGISTRATION ---------------- #
-def register_jobs(scheduler, app) -> None:
+def register_jobs(scheduler, app, elector: Optional[LeaderElector] = None) -> None:
     """
     Register scheduled jobs with Flask app context.
+    With an elector, jobs only execute in the process holding the
+    scheduler lease, and a heartbeat job keeps that lease alive.
     """
+    def guarded(func):
+        return leader_only(elector, func) if elector else func
+
+    if elector:
+        scheduler.add_job(
+            id="leader_heartbeat",
+            func=elector.heartbeat,
+            trigger="interval",
+            seconds=app.config.get("SCHEDULER_HEARTBEAT_SECONDS", 10),
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+
     # Debug sample job (every 10 seconds)
     scheduler.add_job(
         id="sample_job",
-        func=sample_job,
+        func=guarded(sample_job),
         trigger="interval",
         seconds=10,
         replace_existing=True,
@@ -84,11 +70,31 @@ def register_jobs(scheduler, app) -> None:
     # Monthly report job (1st of every month, 08:00 server time)
     scheduler.add_job(
         id="monthly_report",
-        func=monthly_report_job,
+        func=guarded(monthly_report_job),
         trigger="cron",
         day=1,
         hour=8,
         minute=0,
         replace_existing=True,
         args=[app],  # ✅ pass app context
-    )
\ No newline at end of file
+    )
+
+
+def start_scheduler(app, scheduler):
+    """
+    Attach a leader elector, register jobs and start `scheduler`.
+    Safe to call in every gunicorn worker: only the lease holder runs jobs.
+    """
+    elector = LeaderElector(
+        app, name="scheduler", ttl=app.config.get("SCHEDULER_LOCK_TTL", 30)
+    )
+    register_jobs(scheduler, app, elector=elector)
+    elector.heartbeat()  # try to take the lease right away
+
+    @atexit.register
+    def _shutdown():
+        elector.release()
+
+    app.extensions["leader_elector"] = elector
+    scheduler.start()
+    return scheduler
@@ -0,0 +1,15 @@
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def upsert_dialect(connection):
+    """
+    Return (insert, least, greatest) for ON CONFLICT upserts on the
+    connection's dialect. SQLite's multi-argument min()/max() are scalar.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert, func.least, func.greatest
+    if dialect == "sqlite":
+        return sqlite.insert, func.min, func.max
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
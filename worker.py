@@ -0,0 +1,45 @@
+"""
+Background job worker entry point.
+
+Claims and runs jobs from the `jobs` table (budget alert mails, monthly
+reports; see utils/job_queue.py). Run one or more copies next to the web
+service:
+
+    python worker.py
+
+JOB_WORKER_CONCURRENCY sets the threads per process. SIGTERM/SIGINT stop
+claiming new jobs and let running ones finish.
+"""
+import os
+import signal
+
+from app import create_app
+from config import DevelopmentConfig, TestingConfig, ProductionConfig
+from utils.job_queue import Worker
+
+
+def main() -> None:
+    env = os.getenv("APP_ENV", "development").lower()
+    config_class = {
+        "production": ProductionConfig,
+        "testing": TestingConfig,
+        "development": DevelopmentConfig,
+    }.get(env, DevelopmentConfig)
+
+    class WorkerConfig(config_class):
+        SCHEDULER_MODE = "off"  # scheduling stays with the web/scheduler processes
+
+    app = create_app(WorkerConfig)
+    worker = Worker(app)
+
+    def _stop(signum, frame):
+        app.logger.info("👋 Job worker shutting down gracefully...")
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()